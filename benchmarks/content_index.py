@@ -0,0 +1,145 @@
+"""
+Build time, update time and query latency of the PDF content index.
+
+Generates a corpus of scanned-looking PDFs ("scan-00042.pdf") whose only
+distinguishing feature is their text, indexes it from cold, and asks for
+each of a sample of documents by a few of its topic words, the way a user
+would ask for "the PDF about my tax receipts". Reports build throughput,
+the cost of a refresh when nothing or a little changed, how often the top
+result is the right document, and per-query latency.
+
+Usage:
+    python benchmarks/content_index.py [--documents 2000] [--workers 8] [--queries 500] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import build_topic_corpus
+from pkg.utils.tracing import percentile
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BM25 content index on a generated PDF corpus")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=2, help="Pages per document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes for the cold build")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--query-terms", type=int, default=2, help="Topic words per query")
+    parser.add_argument("--changed", type=int, default=20, help="Documents modified and added before the incremental refresh")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vox-bench-") as tmp:
+        workdir = Path(tmp)
+        os.environ["VOX_HOME"] = str(workdir / "state")
+        from pkg.tools.open.content_index import ContentIndex
+
+        corpus_s, corpus = _timed(build_topic_corpus, workdir / "docs", args.documents, args.pages, 3, args.seed)
+        corpus_bytes = sum(path.stat().st_size for path in corpus)
+        print(f"corpus: {args.documents} PDFs, {corpus_bytes / 1e6:.1f} MB, generated in {corpus_s:.1f}s")
+
+        search_dirs = [str(workdir / "docs")]
+        index = ContentIndex(search_dirs=search_dirs, workers=args.workers)
+        cold_s, _ = _timed(index.refresh)
+        stats = index.stats()
+
+        # Text extraction is cached, so rebuilding the index only re-tokenizes
+        shutil.rmtree(index.index_dir)
+        rebuilt = ContentIndex(search_dirs=search_dirs, workers=args.workers)
+        cached_s, _ = _timed(rebuilt.refresh)
+
+        noop_s, _ = _timed(index.refresh)
+
+        rng = random.Random(args.seed)
+        paths = sorted(corpus)
+        for path in rng.sample(paths, min(args.changed, len(paths))):
+            os.utime(path, ns=(time.time_ns(), time.time_ns()))
+        added = build_topic_corpus(workdir / "new", args.changed, args.pages, 3, args.seed + 1)
+        for path, topics in added.items():
+            target = workdir / "docs" / f"new-{path.name}"
+            shutil.move(str(path), target)
+            corpus[target] = topics
+        incremental_s, changes = _timed(index.refresh)
+
+        open_s, index = _timed(lambda: ContentIndex(search_dirs=search_dirs))
+
+        latencies = []
+        top1 = top5 = confident = confident_right = 0
+        sample = rng.sample(sorted(corpus), min(args.queries, len(corpus)))
+        for path in sample:
+            terms = rng.sample(corpus[path], min(args.query_terms, len(corpus[path])))
+            query = f"the pdf about {' '.join(terms)}"
+            elapsed, matches = _timed(index.search, query, 5)
+            latencies.append(elapsed * 1000)
+            ranked = [match for match, _ in matches]
+            top1 += bool(ranked) and ranked[0] == str(path)
+            top5 += str(path) in ranked
+            chosen = index.confident_match(matches)
+            confident += chosen is not None
+            confident_right += chosen == str(path)
+
+    results = {
+        "documents": args.documents,
+        "pages": args.pages,
+        "workers": args.workers,
+        "corpus_mb": round(corpus_bytes / 1e6, 2),
+        "index": {**stats, "mb": round(stats["bytes"] / 1e6, 2), "bytes_per_posting": round(stats["bytes"] / max(1, stats["postings"]), 2)},
+        "build_s": round(cold_s, 2),
+        "build_docs_per_s": round(args.documents / cold_s, 1),
+        "rebuild_from_text_cache_s": round(cached_s, 2),
+        "noop_refresh_ms": round(noop_s * 1000, 1),
+        "incremental_refresh_ms": round(incremental_s * 1000, 1),
+        "incremental_changes": changes,
+        "open_ms": round(open_s * 1000, 2),
+        "queries": len(sample),
+        "top1_accuracy": round(top1 / len(sample), 4),
+        "top5_recall": round(top5 / len(sample), 4),
+        "confident_rate": round(confident / len(sample), 4),
+        "confident_precision": round(confident_right / confident, 4) if confident else None,
+        "query_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+    }
+
+    print(
+        f"build: {results['build_s']}s ({results['build_docs_per_s']} docs/s with {args.workers} workers), "
+        f"{results['rebuild_from_text_cache_s']}s from the text cache"
+    )
+    print(
+        f"index: {stats['postings']} postings in {stats['segments']} segment(s), {results['index']['mb']} MB "
+        f"({results['index']['bytes_per_posting']} bytes/posting), opens in {results['open_ms']} ms"
+    )
+    print(
+        f"refresh: {results['noop_refresh_ms']} ms unchanged, {results['incremental_refresh_ms']} ms after "
+        f"{changes['updated']} modified and {changes['added']} added"
+    )
+    latency = results["query_ms"]
+    print(
+        f"queries: top-1 {results['top1_accuracy']:.1%}, top-5 {results['top5_recall']:.1%}, "
+        f"confident {results['confident_rate']:.1%} (precision {results['confident_precision']}), "
+        f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
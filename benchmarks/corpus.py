@@ -0,0 +1,119 @@
+"""
+Generated PDF corpus for the benchmarks.
+
+Writes small, valid, text-only PDFs directly, so no PDF library is needed to
+build the corpus and every run extracts the same text.
+"""
+import itertools
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.fakes import WORDS
+
+# name -> page count. "large" crosses the parallel extraction threshold.
+SIZES: Dict[str, int] = {
+    "small": 2,
+    "medium": 24,
+    "large": 120,
+}
+
+LINES_PER_PAGE = 40
+WORDS_PER_LINE = 12
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def page_text(rng: random.Random) -> List[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(WORDS_PER_LINE)) for _ in range(LINES_PER_PAGE)]
+
+def write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """Write a PDF with one Helvetica text page per list of lines."""
+    objects: List[bytes] = []
+    font_id = 3
+    first_page_id = 4
+    page_ids = [first_page_id + 2 * i for i in range(len(pages))]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for pid, lines in zip(page_ids, pages):
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+def build_corpus(directory: Path, copies: int = 1, seed: int = 0) -> Dict[str, Path]:
+    """Write the corpus into directory and return {document name: path}.
+
+    Documents are named like "quarterly-report-medium-1.pdf".
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    documents = {}
+    for size, num_pages in SIZES.items():
+        for copy in range(1, copies + 1):
+            name = f"quarterly-report-{size}-{copy}"
+            path = directory / f"{name}.pdf"
+            write_pdf(path, [page_text(rng) for _ in range(num_pages)])
+            documents[name] = path
+    return documents
+
+def pseudo_words(count: int, rng: random.Random) -> List[str]:
+    """Return count distinct made-up words, so topics don't collide with English."""
+    consonants, vowels = "bcdfghjklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < count:
+        syllables = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables)))
+    return sorted(words)
+
+def build_topic_corpus(
+    directory: Path,
+    documents: int,
+    pages: int = 2,
+    topics_per_document: int = 3,
+    seed: int = 0
+) -> Dict[Path, List[str]]:
+    """Write documents about distinct topics and return {path: topic words}.
+
+    Files are named like scans ("scan-00042.pdf"), so only their text tells
+    them apart. Body words follow a Zipf-like distribution over a shared
+    vocabulary; each document also repeats a few topic words, each of which
+    is shared by about topics_per_document documents, so a query needs
+    several of them to single a document out.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    vocabulary = pseudo_words(5000 + documents, rng)
+    body, topics = vocabulary[:5000], vocabulary[5000:]
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(body) + 1)))
+
+    corpus = {}
+    for number in range(documents):
+        chosen = rng.sample(topics, topics_per_document)
+        lines = []
+        for _ in range(pages * LINES_PER_PAGE):
+            line = rng.choices(body, cum_weights=cum_weights, k=WORDS_PER_LINE)
+            if rng.random() < 0.15:
+                line[rng.randrange(WORDS_PER_LINE)] = rng.choice(chosen)
+            lines.append(" ".join(line))
+        path = directory / f"scan-{number:05d}.pdf"
+        write_pdf(path, [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)])
+        corpus[path] = chosen
+    return corpus
@@ -0,0 +1,310 @@
+"""
+Local stand-ins for the OpenAI and Composio APIs used by the benchmarks.
+
+Both servers run on a background thread, bind to an ephemeral port on
+127.0.0.1 and sleep to simulate network latency and token generation, so
+pipelines can be measured end to end without calling (or paying for) the
+real services.
+"""
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+WORDS = (
+    "the quarterly results show steady growth in revenue while operating costs "
+    "remained flat across all regions and the outlook for next year is positive"
+).split()
+
+def filler(tokens: int) -> str:
+    """Return roughly tokens worth of plausible English text."""
+    # About 0.75 words per token
+    words = max(1, int(tokens * 0.75))
+    return " ".join(WORDS[i % len(WORDS)] for i in range(words)).capitalize() + "."
+
+class FakeServer:
+    """Threaded HTTP server with request counting, usable as a context manager."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with server._lock:
+                    server.requests[self.path] = server.requests.get(self.path, 0) + 1
+                status, content_type, payload, *extra = server.handle(self.path, self.headers, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                try:
+                    if isinstance(payload, bytes):
+                        self.send_header("Content-Length", str(len(payload)))
+                        self.end_headers()
+                        self.wfile.write(payload)
+                    else:
+                        # A generator of parts is sent as they are produced, chunk-encoded
+                        self.send_header("Transfer-Encoding", "chunked")
+                        self.end_headers()
+                        for part in payload:
+                            self.wfile.write(f"{len(part):X}\r\n".encode() + part + b"\r\n")
+                            self.wfile.flush()
+                        self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on this request (a timeout or a losing hedge)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle(self, path: str, headers: Any, body: bytes):
+        raise NotImplementedError
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def json_response(value: Any, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        return status, "application/json", json.dumps(value).encode(), headers or {}
+
+class FakeOpenAIServer(FakeServer):
+    """Serve /v1/chat/completions and /v1/audio/transcriptions.
+
+    Each call sleeps for latency seconds (time to first token) plus the
+    completion length divided by tokens_per_second. Transcriptions add upload
+    time for the request body at upload_bytes_per_second. Streamed chat
+    completions send their first word after latency and the rest at
+    tokens_per_second.
+
+    Faults are injected at random, seeded by seed: error_rate of requests fail
+    with a 500, rate_limit_rate with a 429 and a Retry-After header, and
+    stall_rate take an extra stall_seconds before answering. Setting down
+    answers every request with a 503.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        tokens_per_second: float = 500.0,
+        completion_tokens: int = 150,
+        upload_bytes_per_second: float = 2_000_000,
+        transcript: str = "Summarize the quarterly report PDF",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.05,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 2.0,
+        seed: Optional[int] = None
+    ):
+        super().__init__(latency)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.transcript = transcript
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.down = False
+        self.faults: Dict[str, int] = {"error": 0, "rate_limit": 0, "stall": 0, "down": 0}
+        self._random = random.Random(seed)
+
+    def _fault(self) -> Optional[str]:
+        with self._lock:
+            if self.down:
+                fault = "down"
+            else:
+                roll = self._random.random()
+                if roll < self.error_rate:
+                    fault = "error"
+                elif roll < self.error_rate + self.rate_limit_rate:
+                    fault = "rate_limit"
+                elif roll < self.error_rate + self.rate_limit_rate + self.stall_rate:
+                    fault = "stall"
+                else:
+                    return None
+            self.faults[fault] += 1
+            return fault
+
+    def _content(self, request: Dict[str, Any]) -> str:
+        messages = request.get("messages", [])
+        text = "\n".join(str(message.get("content", "")) for message in messages)
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            # The finder agent asks for a filename from the files in its context
+            names = re.findall(r"[\w.\- ]+?\.pdf", text)
+            return json.dumps({"filename": names[0].strip().strip("'\"") if names else "missing.pdf"})
+        tokens = min(self.completion_tokens, request.get("max_tokens") or self.completion_tokens)
+        return filler(tokens)
+
+    def _stream(self, request: Dict[str, Any], content: str, prompt_tokens: int, completion_tokens: int):
+        """Yield server-sent events for content, one word per event."""
+        def event(choices: List[Dict[str, Any]], usage: Optional[Dict[str, int]] = None) -> bytes:
+            chunk = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": choices,
+                "usage": usage
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode()
+
+        words = re.findall(r"\S+\s*", content)
+        delay = completion_tokens / self.tokens_per_second / max(1, len(words))
+        time.sleep(self.latency)
+        yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(delay)
+            yield event([{"index": 0, "delta": {"content": word}, "finish_reason": None}])
+        yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            yield event([], {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            })
+        yield b"data: [DONE]\n\n"
+
+    def handle(self, path: str, headers: Any, body: bytes):
+        fault = self._fault()
+        if fault == "down":
+            return self.json_response({"error": {"message": "Service unavailable", "type": "server_error"}}, status=503)
+        if fault == "error":
+            time.sleep(self.latency)
+            return self.json_response({"error": {"message": "Injected server error", "type": "server_error"}}, status=500)
+        if fault == "rate_limit":
+            return self.json_response(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+        if fault == "stall":
+            time.sleep(self.stall_seconds)
+
+        if path.endswith("/chat/completions"):
+            request = json.loads(body)
+            content = self._content(request)
+            prompt_tokens = len(body) // 4
+            completion_tokens = max(1, len(content) // 4)
+            if request.get("stream"):
+                return 200, "text/event-stream", self._stream(request, content, prompt_tokens, completion_tokens)
+            time.sleep(self.latency + completion_tokens / self.tokens_per_second)
+            return self.json_response({
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+        if path.endswith("/audio/transcriptions"):
+            time.sleep(self.latency + len(body) / self.upload_bytes_per_second)
+            return 200, "text/plain", self.transcript.encode()
+
+        return self.json_response({"error": {"message": f"Unknown path {path}"}}, status=404)
+
+class FakeComposioServer(FakeServer):
+    """Serve POST /actions/<ACTION> with Composio-shaped responses.
+
+    Every rate_limit_every-th send is rejected with a Slack ratelimited error,
+    so retry handling shows up in the results.
+    """
+
+    def __init__(self, latency: float = 0.03, channels: Optional[List[str]] = None, rate_limit_every: int = 0):
+        super().__init__(latency)
+        self.channels = channels or ["general", "random", "all-agenticflow", "engineering"]
+        self.rate_limit_every = rate_limit_every
+        self.sent = 0
+
+    def handle(self, path: str, headers: Any, body: bytes):
+        time.sleep(self.latency)
+        action = path.rsplit("/", 1)[-1]
+        if "LIST" in action:
+            return self.json_response({
+                "successfull": True,
+                "data": {"channels": [{"name": name, "id": f"C{i:08d}"} for i, name in enumerate(self.channels)]}
+            })
+
+        with self._lock:
+            self.sent += 1
+            limited = self.rate_limit_every and self.sent % self.rate_limit_every == 0
+        if limited:
+            return self.json_response({"successfull": False, "error": "ratelimited", "retry_after": 0.05})
+        return self.json_response({"successfull": True, "data": {"ok": True, "ts": f"{time.time():.6f}"}})
+
+class ComposioClient:
+    """Executor for SlackSendQueue and ChannelDirectory that calls a FakeComposioServer."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def __call__(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.execute_action(action=action, params=params)
+
+    def execute_action(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request = urllib.request.Request(
+            f"{self.url}/actions/{action}",
+            data=json.dumps(params).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+class FakeToolSet(ComposioClient):
+    """Drop-in for ComposioToolSet in SlackMessagerTool, backed by a FakeComposioServer."""
+
+    url = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(FakeToolSet.url)
+
+    def initiate_connection(self, *args, **kwargs):
+        class Connection:
+            connectedAccountId = "bench-account"
+        return Connection()
+
+    def get_tools(self, *args, **kwargs):
+        return []
@@ -0,0 +1,110 @@
+"""
+Cold-start import benchmark for the vox CLI.
+
+Each scenario runs in a fresh interpreter under `python -X importtime` and
+reports the total import time plus the slowest modules. Scenarios mirror what
+each subcommand loads before doing any work.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--top 10] [--output results.json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS: Dict[str, str] = {
+    # Loading the CLI app, which is what `vox --help` and every subcommand pay
+    "cli": "import pkg.interfaces.cli.main",
+    # `vox chat` also builds the kernel Agent before showing the menu
+    "chat": "import pkg.interfaces.cli.main; import pkg.kernel.agent",
+    # `vox talk` additionally loads the recorder, transcriber and speaker
+    "talk": (
+        "import pkg.interfaces.cli.main; import pkg.kernel.agent; "
+        "import pkg.voice.recorder, pkg.voice.transcriber, pkg.voice.speaker"
+    ),
+    # First use of each crew through the registry
+    "crew:pdf": "from pkg.kernel.registry import registry; registry.load('pdf')",
+    "crew:slack": "from pkg.kernel.registry import registry; registry.load('slack')",
+}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+def measure(code: str) -> Tuple[float, float, List[Tuple[str, int]], str]:
+    """Run code in a fresh interpreter and return (wall_ms, import_ms, modules, error)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    total_us = 0
+    modules = []
+    error = ""
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            total_us += int(self_us)
+            # Top-level imports have the smallest indent
+            if len(indent) == 1:
+                modules.append((name, int(cumulative_us)))
+        elif proc.returncode != 0 and line.strip():
+            error = line.strip()
+    return wall_ms, total_us / 1000, modules, error
+
+def run(runs: int, top: int) -> Dict[str, Dict]:
+    results = {}
+    for name, code in SCENARIOS.items():
+        walls, imports, error = [], [], ""
+        modules: Dict[str, List[int]] = {}
+        for _ in range(runs):
+            wall_ms, import_ms, mods, error = measure(code)
+            walls.append(wall_ms)
+            imports.append(import_ms)
+            for module, cumulative_us in mods:
+                modules.setdefault(module, []).append(cumulative_us)
+        slowest = sorted(
+            ((module, statistics.median(times) / 1000) for module, times in modules.items()),
+            key=lambda item: -item[1]
+        )[:top]
+        results[name] = {
+            "wall_ms": round(statistics.median(walls), 1),
+            "import_ms": round(statistics.median(imports), 1),
+            "slowest": [[module, round(ms, 1)] for module, ms in slowest],
+            "error": error,
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure vox cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.top)
+    for name, result in results.items():
+        status = f"  FAILED: {result['error']}" if result["error"] else ""
+        print(f"{name:12} wall {result['wall_ms']:8.1f} ms   imports {result['import_ms']:8.1f} ms{status}")
+        for module, ms in result["slowest"]:
+            print(f"    {ms:8.1f} ms  {module}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
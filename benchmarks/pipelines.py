@@ -0,0 +1,319 @@
+"""
+Offline end-to-end benchmarks for the vox pipelines.
+
+Chat completions, Whisper and Composio are served by local fakes with
+injected latency (see benchmarks/fakes.py), and PDFs come from a generated
+corpus, so runs are free, repeatable and need no API keys. Each scenario
+reports throughput, the latency distribution of its operations and peak
+Python heap use. Memory is measured with tracemalloc in one extra run, since
+tracing allocations slows PDF extraction severalfold; worker processes are
+not counted.
+
+Results are written as JSON and can be compared against an earlier run:
+
+    python benchmarks/pipelines.py --output before.json
+    python benchmarks/pipelines.py --compare before.json
+
+With --compare the script exits non-zero if any scenario got slower or lost
+throughput by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fakes import ComposioClient, FakeComposioServer, FakeOpenAIServer, FakeToolSet
+
+class Context:
+    """Servers, corpus and settings shared by the scenarios of one run."""
+
+    def __init__(self, args: argparse.Namespace, workdir: Path, openai_server: FakeOpenAIServer, composio_server: FakeComposioServer):
+        self.args = args
+        self.workdir = workdir
+        self.openai = openai_server
+        self.composio = composio_server
+        self.downloads = workdir / "Downloads"
+        self.documents = build_corpus(self.downloads, copies=args.copies)
+        self._states = 0
+
+    def fresh_state(self, name: str) -> None:
+        """Point VOX_HOME at an empty directory so caches and indexes start cold."""
+        self._states += 1
+        os.environ["VOX_HOME"] = str(self.workdir / "state" / f"{name.replace(':', '-')}-{self._states}")
+
+# A scenario returns (per-operation latencies in seconds, units processed)
+Samples = Tuple[List[float], int]
+
+def _timed(func: Callable, *args, **kwargs) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def pdf_read(ctx: Context) -> Samples:
+    from pkg.tools.open.pdf_reader import PAGE_BREAK, read_pdf
+
+    latencies, pages = [], 0
+    for path in ctx.documents.values():
+        elapsed, result = _timed(read_pdf, str(path))
+        if result["status"] != "success":
+            raise RuntimeError(result["error"])
+        latencies.append(elapsed)
+        pages += len(result["text"].split(PAGE_BREAK))
+    return latencies, pages
+
+def pdf_crew(ctx: Context) -> Samples:
+    from pkg.agents.open.crew_ai.pdf_summarizer.pdf_summarizer_crew import PDFCrew
+
+    crew = PDFCrew()
+    requests = [f"Summarize the {name.replace('-', ' ')} pdf" for name in ctx.documents]
+    latencies = []
+    for request in requests:
+        elapsed, response = _timed(crew.process_request, request)
+        if response.startswith(("Error", "Failed")):
+            raise RuntimeError(response)
+        latencies.append(elapsed)
+    return latencies, len(requests)
+
+def warm_caches(ctx: Context) -> None:
+    """Run every PDF request once so text, summaries and the index are cached on disk."""
+    pdf_crew(ctx)
+
+def summarize_long(ctx: Context) -> Samples:
+    from pkg.tools.open.pdf_reader import read_pdf
+    from pkg.tools.open.summarize import summarize_long_text
+
+    largest = max(ctx.documents.values(), key=lambda path: path.stat().st_size)
+    text = read_pdf(str(largest))["text"]
+    elapsed, result = _timed(summarize_long_text, text)
+    if result["status"] != "success":
+        raise RuntimeError(result["error"])
+    return [elapsed], 1
+
+def agent_pdf(ctx: Context) -> Samples:
+    from pkg.kernel.agent import Agent
+
+    agent = Agent()
+    latencies = []
+    for name in ctx.documents:
+        request = f"Summarize the {name.replace('-', ' ')} pdf"
+        elapsed, _ = _timed(agent.process_request, {"choice": "1", "request": request})
+        latencies.append(elapsed)
+    return latencies, len(latencies)
+
+def slack_queue(ctx: Context) -> Samples:
+    from pkg.tools.open.slack_queue import SlackSendQueue
+
+    channels = ctx.composio.channels
+    messages = [(channels[i % len(channels)], f"Benchmark message {i}") for i in range(ctx.args.messages)]
+
+    async def send() -> List[float]:
+        queue = SlackSendQueue(ComposioClient(ctx.composio.url), channel_rate=20.0, burst=5, coalesce=False)
+        start = time.perf_counter()
+        latencies = []
+        futures = []
+        for channel, text in messages:
+            future = queue.submit(channel, text)
+            future.add_done_callback(lambda _: latencies.append(time.perf_counter() - start))
+            futures.append(future)
+        await asyncio.gather(*futures)
+        return latencies
+
+    return asyncio.run(send()), len(messages)
+
+def slack_crew(ctx: Context) -> Samples:
+    from pkg.tools.open import slack_messager
+    from pkg.agents.open.crew_ai.slack_messager.slack_messager_crew import SlackCrew
+
+    FakeToolSet.url = ctx.composio.url
+    slack_messager.ComposioToolSet = FakeToolSet
+    crew = SlackCrew()
+    crew.slack_tool.channels.refresh()
+    latencies = []
+    for i in range(ctx.args.messages // 10 or 1):
+        elapsed, response = _timed(crew.process_request, f"Send a Slack message to #general: hello {i}")
+        if not response.startswith("Message sent"):
+            raise RuntimeError(response)
+        latencies.append(elapsed)
+    return latencies, len(latencies)
+
+def whisper(ctx: Context) -> Samples:
+    from pkg.utils import openai_client
+
+    # Roughly five seconds of 16 kHz FLAC
+    audio = os.urandom(80_000)
+    latencies = []
+    for _ in range(10):
+        elapsed, _ = _timed(
+            openai_client.transcription,
+            model="whisper-1",
+            file=("recording.flac", audio, "audio/flac"),
+            response_format="text"
+        )
+        latencies.append(elapsed)
+    return latencies, len(latencies)
+
+# name -> (scenario, unit counted for throughput, untimed setup run first)
+SCENARIOS: Dict[str, Tuple[Callable[[Context], Samples], str, Optional[Callable[[Context], None]]]] = {
+    "pdf:read": (pdf_read, "pages", None),
+    "pdf:crew:cold": (pdf_crew, "requests", None),
+    "pdf:crew:warm": (pdf_crew, "requests", warm_caches),
+    "pdf:summarize_long": (summarize_long, "documents", None),
+    "agent:pdf": (agent_pdf, "requests", None),
+    "slack:queue": (slack_queue, "messages", None),
+    "slack:crew": (slack_crew, "requests", None),
+    "whisper": (whisper, "requests", None),
+}
+
+def run_scenario(ctx: Context, name: str) -> Dict:
+    from pkg.utils.tracing import percentile
+
+    func, unit, setup = SCENARIOS[name]
+    latencies: List[float] = []
+    units = 0
+    wall = 0.0
+    peak = 0
+    error = ""
+    for run in range(ctx.args.runs + (1 if ctx.args.memory else 0)):
+        traced = run == ctx.args.runs
+        ctx.fresh_state(name)
+        try:
+            if setup is not None:
+                setup(ctx)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            run_latencies, run_units = func(ctx)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+        finally:
+            if traced and tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        if not traced:
+            wall += time.perf_counter() - start
+            latencies += run_latencies
+            units += run_units
+
+    result = {
+        "unit": unit,
+        "ops": len(latencies),
+        "units": units,
+        "wall_s": round(wall, 3),
+        "throughput": round(units / wall, 2) if wall and not error else 0.0,
+        "latency_ms": {},
+        "peak_mb": round(peak / 1024 / 1024, 2) if ctx.args.memory else None,
+        "error": error,
+    }
+    if latencies:
+        ms = [latency * 1000 for latency in latencies]
+        result["latency_ms"] = {
+            "mean": round(sum(ms) / len(ms), 2),
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+        }
+    return result
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print the change against baseline and return the scenarios that regressed."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or result["error"] or before["error"] or not before["latency_ms"]:
+            continue
+        p50_change = result["latency_ms"]["p50"] / before["latency_ms"]["p50"] - 1 if before["latency_ms"]["p50"] else 0.0
+        throughput_change = result["throughput"] / before["throughput"] - 1 if before["throughput"] else 0.0
+        regressed = p50_change > tolerance or throughput_change < -tolerance
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:20} p50 {p50_change:+7.1%}   throughput {throughput_change:+7.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def _commit() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vox pipelines against local fake APIs")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions of each scenario")
+    parser.add_argument("--copies", type=int, default=1, help="Copies of each document size in the corpus")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the extra run that measures peak memory")
+    parser.add_argument("--messages", type=int, default=100, help="Slack messages per queue run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake OpenAI time to first token, in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Fake OpenAI generation speed")
+    parser.add_argument("--composio-latency", type=float, default=0.03, help="Fake Composio latency, in seconds")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Rate limit every Nth Slack send (0 to disable)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Compare against results from an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed fractional slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    logging.getLogger("vox").addHandler(logging.NullHandler())
+    logging.getLogger("vox").propagate = False
+
+    with tempfile.TemporaryDirectory(prefix="vox-bench-") as tmp, \
+            FakeOpenAIServer(args.latency, args.tokens_per_second) as openai_server, \
+            FakeComposioServer(args.composio_latency, rate_limit_every=args.rate_limit_every) as composio_server:
+        workdir = Path(tmp)
+        # The PDF crew searches ~/Downloads, so give it the corpus instead
+        os.environ["HOME"] = str(workdir)
+        os.environ["VOX_TRACE"] = "0"
+
+        from pkg.utils import openai_client
+        openai_client.configure(api_key="benchmark", base_url=f"{openai_server.url}/v1")
+
+        ctx = Context(args, workdir, openai_server, composio_server)
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            result = results[name] = run_scenario(ctx, name)
+            if result["error"]:
+                print(f"{name:20} FAILED: {result['error']}")
+                continue
+            latency = result["latency_ms"]
+            peak = f"{result['peak_mb']:7.2f} MB" if result["peak_mb"] is not None else "      -"
+            print(
+                f"{name:20} {result['throughput']:9.2f} {result['unit']}/s   "
+                f"p50 {latency['p50']:9.1f} ms   p95 {latency['p95']:9.1f} ms   "
+                f"p99 {latency['p99']:9.1f} ms   peak {peak}"
+            )
+
+    report = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('commit') or args.compare}:")
+        changed = sorted(
+            key for key, value in report["config"].items()
+            if key not in ("scenario", "runs", "memory") and baseline.get("config", {}).get(key) != value
+        )
+        if changed:
+            print(f"Warning: settings differ from the baseline ({', '.join(changed)}), results may not be comparable")
+        if compare(results, baseline["results"], args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Fault-injection benchmark for the retry, hedging and circuit-breaker layer.
+
+Sends chat completions through pkg.utils.openai_client to a local fake
+OpenAI server that fails, rate limits and stalls a share of requests, once
+per retry policy, and reports how many calls succeeded, their latency and
+how many requests reached the server. A second pass takes the server down
+to show the circuit breaker failing fast, then brings it back.
+
+Usage:
+    python benchmarks/resilience.py [--requests 200] [--concurrency 8] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.fakes import FakeOpenAIServer
+from pkg.utils import openai_client
+from pkg.utils.resilience import CircuitOpenError, NO_RETRY, RetryPolicy, breaker
+from pkg.utils.tracing import percentile
+
+def policies(args: argparse.Namespace) -> Dict[str, RetryPolicy]:
+    retry = dict(attempts=4, base_delay=0.05, max_delay=1.0, deadline=10.0)
+    return {
+        "none": NO_RETRY,
+        "retry": RetryPolicy(**retry),
+        "retry+timeout": RetryPolicy(**retry, attempt_timeout=args.stall_seconds / 2),
+        "retry+hedge": RetryPolicy(**retry, hedge_percentile=args.hedge_percentile),
+    }
+
+def server(args: argparse.Namespace) -> FakeOpenAIServer:
+    return FakeOpenAIServer(
+        latency=args.latency,
+        completion_tokens=20,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        seed=args.seed
+    )
+
+async def _send(model: str, policy: RetryPolicy, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await openai_client.achat_completion(
+                    policy=policy,
+                    model=model,
+                    messages=[{"role": "user", "content": f"Request {i}"}],
+                    max_tokens=20
+                )
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return latencies, errors
+
+def run_policy(args: argparse.Namespace, name: str, policy: RetryPolicy) -> Dict:
+    with server(args) as fake:
+        openai_client.configure(base_url=f"{fake.url}/v1", api_key="bench")
+        start = time.perf_counter()
+        latencies, errors = openai_client.run(_send(f"bench-{name}", policy, args.requests, args.concurrency))
+        wall = time.perf_counter() - start
+        sent = sum(fake.requests.values())
+        faults = dict(fake.faults)
+
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "success_rate": round(len(latencies) / args.requests, 4),
+        "errors": errors,
+        "requests_sent": sent,
+        "amplification": round(sent / args.requests, 3),
+        "faults": faults,
+        "wall_s": round(wall, 3),
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 1),
+            "p95": round(percentile(ms, 95), 1),
+            "p99": round(percentile(ms, 99), 1),
+        } if ms else {},
+    }
+
+def run_outage(args: argparse.Namespace) -> Dict:
+    """Take the server down for a run of calls, then bring it back after the breaker cool-down."""
+    model = "bench-outage"
+    circuit = breaker(f"chat:{model}")
+    circuit.reset_timeout = args.reset_timeout
+    policy = RetryPolicy(attempts=3, base_delay=0.05, max_delay=0.2, deadline=5.0)
+
+    def call() -> str:
+        try:
+            openai_client.chat_completion(policy=policy, model=model, messages=[{"role": "user", "content": "ping"}], max_tokens=5)
+            return "ok"
+        except CircuitOpenError:
+            return "fast_fail"
+        except Exception:
+            return "error"
+
+    with FakeOpenAIServer(latency=args.latency, completion_tokens=5) as fake:
+        openai_client.configure(base_url=f"{fake.url}/v1", api_key="bench")
+        fake.down = True
+        outcomes: Dict[str, List[float]] = {"ok": [], "error": [], "fast_fail": []}
+        for _ in range(args.outage_calls):
+            start = time.perf_counter()
+            outcome = call()
+            outcomes[outcome].append((time.perf_counter() - start) * 1000)
+        reached_while_down = fake.faults["down"]
+        state_while_down = circuit.state
+
+        fake.down = False
+        time.sleep(args.reset_timeout)
+        start = time.perf_counter()
+        recovered = call() == "ok"
+        recovery_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "calls": args.outage_calls,
+        "requests_reached_server": reached_while_down,
+        "failed_after_retries": len(outcomes["error"]),
+        "failed_fast": len(outcomes["fast_fail"]),
+        # Medians, since the call that trips the breaker has already spent time on retries
+        "fast_fail_ms": round(percentile(outcomes["fast_fail"], 50), 3) if outcomes["fast_fail"] else None,
+        "slow_fail_ms": round(percentile(outcomes["error"], 50), 1) if outcomes["error"] else None,
+        "state_while_down": state_while_down,
+        "recovered": recovered,
+        "recovery_ms": round(recovery_ms, 1),
+        "state_after": circuit.state,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retry policies against a fault-injecting fake OpenAI server")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per policy")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake time to first token, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05, help="Share of requests answered with a 429")
+    parser.add_argument("--stall-rate", type=float, default=0.03, help="Share of requests that stall")
+    parser.add_argument("--stall-seconds", type=float, default=1.0)
+    parser.add_argument("--hedge-percentile", type=float, default=90)
+    parser.add_argument("--outage-calls", type=int, default=20)
+    parser.add_argument("--reset-timeout", type=float, default=1.0, help="Breaker cool-down for the outage pass")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Log retries, hedges and breaker transitions")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format="%(message)s")
+    os.environ.setdefault("VOX_TRACE", "0")
+
+    results = {"policies": {}, "outage": None}
+    print(f"{'policy':15} {'success':>8} {'sent':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}   errors")
+    for name, policy in policies(args).items():
+        result = run_policy(args, name, policy)
+        results["policies"][name] = result
+        latency = result["latency_ms"]
+        print(
+            f"{name:15} {result['success_rate']:>8.1%} {result['requests_sent']:>6} "
+            f"{latency.get('p50', 0):>8.1f} {latency.get('p95', 0):>8.1f} {latency.get('p99', 0):>8.1f}   "
+            f"{result['errors'] or '-'}"
+        )
+
+    outage = run_outage(args)
+    results["outage"] = outage
+    print(
+        f"\noutage: {outage['calls']} calls, {outage['requests_reached_server']} reached the server, "
+        f"{outage['failed_fast']} failed fast (median {outage['fast_fail_ms']} ms) vs "
+        f"{outage['failed_after_retries']} after retries (median {outage['slow_fail_ms']} ms)"
+    )
+    print(f"recovery: {'ok' if outage['recovered'] else 'FAILED'} in {outage['recovery_ms']} ms, breaker {outage['state_after']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
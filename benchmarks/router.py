@@ -0,0 +1,105 @@
+"""
+Accuracy and latency benchmark for the kernel intent router.
+
+Runs the local model (no LLM escalation) over a labeled set of held-out
+utterances and reports routing accuracy, slot accuracy, how often the
+router would escalate, and per-request latency.
+
+Usage:
+    python benchmarks/router.py [--data benchmarks/data/utterances.jsonl] [--repeat 200] [--output results.json]
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pkg.kernel.router import CONFIDENCE_THRESHOLD, IntentRouter
+from pkg.utils.tracing import percentile
+
+def load(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the intent router on labeled utterances")
+    parser.add_argument("--data", default=str(ROOT / "benchmarks" / "data" / "utterances.jsonl"))
+    parser.add_argument("--repeat", type=int, default=200, help="Timed passes over the data set")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--verbose", action="store_true", help="List misrouted utterances and wrong slots")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    utterances = load(Path(args.data))
+
+    start = time.perf_counter()
+    router = IntentRouter(threshold=args.threshold, escalate=False)
+    train_ms = (time.perf_counter() - start) * 1000
+
+    correct = 0
+    escalated = 0
+    escalated_wrong = 0
+    slots_checked = 0
+    slots_correct = 0
+    confusion = Counter()
+    for item in utterances:
+        route = router.classify(item["text"])
+        confusion[(item["crew"], route.crew)] += 1
+        low = route.confidence < args.threshold
+        escalated += low
+        if route.crew == item["crew"]:
+            correct += 1
+        else:
+            escalated_wrong += low
+            if args.verbose:
+                print(f"misrouted: {item['text']!r} -> {route}")
+        for key, expected in item["slots"].items():
+            slots_checked += 1
+            actual = route.slots.get(key)
+            if actual is not None and actual.lower() == expected.lower():
+                slots_correct += 1
+            elif args.verbose:
+                print(f"slot {key}: {item['text']!r} -> {actual!r}, expected {expected!r}")
+
+    timings = []
+    for _ in range(args.repeat):
+        for item in utterances:
+            start = time.perf_counter()
+            router.classify(item["text"])
+            timings.append((time.perf_counter() - start) * 1e6)
+
+    wrong = len(utterances) - correct
+    results = {
+        "utterances": len(utterances),
+        "accuracy": round(correct / len(utterances), 4),
+        # Errors the LLM would get a chance to fix, since they fall below the threshold
+        "errors_escalated": f"{escalated_wrong}/{wrong}",
+        "escalation_rate": round(escalated / len(utterances), 4),
+        "slot_accuracy": round(slots_correct / slots_checked, 4) if slots_checked else None,
+        "train_ms": round(train_ms, 2),
+        "latency_us": {
+            "p50": round(percentile(timings, 50), 1),
+            "p95": round(percentile(timings, 95), 1),
+            "p99": round(percentile(timings, 99), 1),
+        },
+        "confusion": {f"{expected}->{actual}": count for (expected, actual), count in sorted(confusion.items(), key=str)},
+    }
+
+    print(f"accuracy        {results['accuracy']:.1%} ({correct}/{len(utterances)}), misroutes escalated {results['errors_escalated']}")
+    print(f"escalation rate {results['escalation_rate']:.1%} at threshold {args.threshold}")
+    if slots_checked:
+        print(f"slot accuracy   {results['slot_accuracy']:.1%} ({slots_correct}/{slots_checked})")
+    print(f"training        {train_ms:.2f} ms")
+    latency = results["latency_us"]
+    print(f"latency         p50 {latency['p50']:.1f} us   p95 {latency['p95']:.1f} us   p99 {latency['p99']:.1f} us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
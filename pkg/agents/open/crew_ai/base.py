@@ -1,14 +1,23 @@
 """
 Base agent class for specialized agents.
 """
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import logging
-import json
-import openai
+from pkg.utils import openai_client
+from pkg.utils.logging import LazyJSON
+from pkg.utils.resilience import RetryPolicy
+from pkg.utils.tokens import MESSAGE_OVERHEAD, compact_context, count_message_tokens, count_tokens, truncate_tokens
+from pkg.utils.tracing import record_stream, record_usage, span
 
 # Get logger
 logger = logging.getLogger("vox")
 
+# Default prompt budget per call, in tokens
+DEFAULT_TOKEN_BUDGET = 8000
+
+# Context is never squeezed below this, even if the task is long
+MIN_CONTEXT_TOKENS = 256
+
 class BaseAgent:
     def __init__(
         self,
@@ -17,12 +26,20 @@ class BaseAgent:
         goal: str,
         backstory: str,
         model: str = "gpt-4o",
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         self.name = name
         self.role = role
         self.goal = goal
         self.backstory = backstory
         self.model = model
+        # Prompt tokens allowed per call; context is compacted to fit
+        self.token_budget = token_budget
+        # Retries, deadline and hedging for this agent's calls; None uses the client default
+        self.retry_policy = retry_policy
+        # Token usage of the most recent call
+        self.last_usage: Dict[str, Optional[int]] = {}
         
         logger.info(f"Initializing agent: {self.name}")
         logger.debug(
@@ -31,29 +48,41 @@ class BaseAgent:
             f"Role: {self.role}\n"
             f"Goal: {self.goal}\n"
             f"Backstory: {self.backstory}\n"
-            f"Model: {self.model}"
+            f"Model: {self.model}\n"
+            f"Token budget: {self.token_budget}\n"
+            f"Retry policy: {self.retry_policy or openai_client.default_policy()}"
         )
 
     def execute_task(self, task: str, context: Optional[Dict] = None, output_format: Optional[str] = None) -> Dict:
         """Execute a specific task with given context."""
+        return openai_client.run(self.aexecute_task(task, context, output_format))
+
+    async def aexecute_task(self, task: str, context: Optional[Dict] = None, output_format: Optional[str] = None) -> Dict:
+        """Execute a specific task with given context without blocking the event loop."""
         logger.info(f"Agent {self.name} executing task: {task[:100]}...")
         
         messages = self._build_messages(task, context)
-        logger.debug(f"Agent {self.name} messages: {json.dumps(messages, indent=2)}")
+        logger.debug("Agent %s messages: %s", self.name, LazyJSON(messages))
+        estimated = count_message_tokens(messages, self.model)
 
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                response_format={"type": "json_object"} if output_format == "json" else None
-            )
+            with span(f"agent.{self.name}", model=self.model, estimated_prompt_tokens=estimated) as stage:
+                response = await openai_client.achat_completion(
+                    policy=self.retry_policy,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    response_format={"type": "json_object"} if output_format == "json" else None
+                )
+                record_usage(stage, response)
             
-            logger.debug(f"Agent {self.name} response: {json.dumps(response.choices[0].message.content[:500], indent=2)}")
+            logger.debug("Agent %s response: %s", self.name, LazyJSON(response.choices[0].message.content))
+            usage = self._record_usage(estimated, response)
             
             return {
                 "status": "success",
-                "output": response.choices[0].message.content
+                "output": response.choices[0].message.content,
+                "usage": usage
             }
             
         except Exception as e:
@@ -63,8 +92,60 @@ class BaseAgent:
                 "error": str(e)
             }
     
+    def _open_stream(self, task: str, context: Optional[Dict]) -> Tuple[openai_client.ChatStream, int]:
+        logger.info(f"Agent {self.name} streaming task: {task[:100]}...")
+        messages = self._build_messages(task, context)
+        logger.debug("Agent %s messages: %s", self.name, LazyJSON(messages))
+        stream = openai_client.stream_chat_completion(
+            policy=self.retry_policy,
+            model=self.model,
+            messages=messages,
+            temperature=0.7
+        )
+        return stream, count_message_tokens(messages, self.model)
+
+    def _finish_stream(self, estimated: int, stream: openai_client.ChatStream) -> None:
+        self._record_usage(estimated, stream)
+        logger.info(f"Agent {self.name} stream: {stream.describe()}")
+
+    def stream_task(self, task: str, context: Optional[Dict] = None) -> Iterator[str]:
+        """Execute a task, yielding the response text as it is generated.
+
+        Unlike execute_task, errors are raised rather than returned.
+        """
+        stream, estimated = self._open_stream(task, context)
+        with span(f"agent.{self.name}", model=self.model, estimated_prompt_tokens=estimated, stream=True) as stage:
+            yield from stream
+            record_stream(stage, stream)
+        self._finish_stream(estimated, stream)
+
+    async def astream_task(self, task: str, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Async variant of stream_task."""
+        stream, estimated = self._open_stream(task, context)
+        with span(f"agent.{self.name}", model=self.model, estimated_prompt_tokens=estimated, stream=True) as stage:
+            async for text in stream:
+                yield text
+            record_stream(stage, stream)
+        self._finish_stream(estimated, stream)
+
+    def _record_usage(self, estimated: int, response) -> Dict[str, Optional[int]]:
+        """Store and log the token usage of a call."""
+        usage = getattr(response, "usage", None)
+        self.last_usage = {
+            "estimated_prompt_tokens": estimated,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "budget": self.token_budget
+        }
+        logger.info(
+            f"Agent {self.name} tokens: prompt {self.last_usage['prompt_tokens']} "
+            f"(estimated {estimated}, budget {self.token_budget}), "
+            f"completion {self.last_usage['completion_tokens']}"
+        )
+        return self.last_usage
+
     def _build_messages(self, task: str, context: Optional[Dict] = None) -> List[Dict]:
-        """Build message list for the agent."""
+        """Build message list for the agent, compacting context to the token budget."""
         logger.debug(f"Building messages for agent {self.name}")
         
         messages = [
@@ -79,8 +160,23 @@ class BaseAgent:
             }
         ]
         
+        used = count_message_tokens(messages, self.model)
+        task_tokens = count_tokens(task, self.model)
+        if context:
+            task_limit = max(MIN_CONTEXT_TOKENS, self.token_budget - used - MIN_CONTEXT_TOKENS)
+        else:
+            task_limit = max(MIN_CONTEXT_TOKENS, self.token_budget - used)
+        if task_tokens > task_limit:
+            logger.warning(f"Agent {self.name} task truncated from {task_tokens} to {task_limit} tokens")
+            task = truncate_tokens(task, task_limit, self.model)
+            task_tokens = task_limit
+
         if context:
             logger.debug(f"Adding context to messages for agent {self.name}")
+            context_budget = max(MIN_CONTEXT_TOKENS, self.token_budget - used - task_tokens - 3 * MESSAGE_OVERHEAD)
+            context, compacted = compact_context(context, context_budget, query=task, model=self.model)
+            if compacted:
+                logger.info(f"Agent {self.name} context compacted to {context_budget} tokens")
             messages.append({
                 "role": "system",
                 "content": f"Context: {str(context)}"
@@ -1,17 +1,48 @@
 """
 Crew management for coordinating multiple agents.
 """
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
+import asyncio
 import logging
 import os
 import json
 from pkg.agents.open.crew_ai.pdf_summarizer.specialized_agents import ReaderAgent, SummarizerAgent, CoordinatorAgent, FinderAgent
+from pkg.tools.open.content_index import ContentIndex
+from pkg.tools.open.file_index import FilenameIndex
+from pkg.utils.logging import LazyJSON
 
 # Get logger
 logger = logging.getLogger("vox")
 
+DOWNLOADS_DIR = "~/Downloads"
+
+# Number of fuzzy matches offered to the finder agent when the index is unsure
+FINDER_CANDIDATES = 20
+
 class PDFCrew:
-    def __init__(self):
+    # process_request accepts on_chunk to stream the summary as it is generated
+    streaming = True
+
+    def __init__(self, plan: bool = False, pipelined: bool = True, index_content: bool = False):
+        """Create the crew.
+
+        plan: ask the coordinator for a plan before answering. Its output is
+            only checked for success, and requests now arrive already routed
+            by the kernel's intent router, so it is off by default.
+        pipelined: run the plan concurrently with finding the document, and
+            start reading the PDF as soon as its filename is known.
+        index_content: keep the content index of Downloads current on a
+            background thread. Off by default, since only the long-lived
+            daemon should pay for extracting every PDF; without it the index
+            is only queried, and picks up what the daemon indexed.
+        """
+        self.plan = plan
+        self.pipelined = pipelined
+        self.file_index = FilenameIndex(search_dirs=[DOWNLOADS_DIR])
+        # Finds documents by what they contain ("the PDF about my tax receipts")
+        self.content_index = ContentIndex(search_dirs=[DOWNLOADS_DIR])
+        if index_content:
+            self.content_index.start()
         self.coordinator = CoordinatorAgent()
         self.agents = {
             "finder": FinderAgent(),
@@ -19,68 +50,182 @@ class PDFCrew:
             "summarizer": SummarizerAgent()
         }
         logger.debug(f"Crew initialized with agents: {list(self.agents.keys())}")
-    
-    def process_request(self, request: str) -> str:
+
+    def process_request(
+        self,
+        request: str,
+        file_hint: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        path: Optional[str] = None,
+        history: Optional[List[Dict]] = None,
+        entities: Optional[Dict[str, str]] = None
+    ) -> str:
         """Process a request using the appropriate agents."""
+        return asyncio.run(self.aprocess_request(request, file_hint, on_chunk, path, history, entities))
+
+    async def _plan(self, request: str) -> Dict:
+        plan = await self.coordinator.aexecute_task(
+            task=f"Plan how to handle this request: {request}",
+            context={"available_agents": list(self.agents.keys())}
+        )
+        logger.debug("Coordinator plan: %s", LazyJSON(plan))
+        return plan
+
+    async def _find(self, request: str, history: Optional[List[Dict]] = None) -> Dict:
+        """Resolve the request to a path, asking the finder agent only if the local indexes are unsure."""
+        matches = await asyncio.to_thread(self.file_index.search, request, FINDER_CANDIDATES)
+        path = FilenameIndex.confident_match(matches)
+        if path:
+            logger.info(f"Filename index matched {path}")
+            return {"status": "success", "path": path}
+
+        content_matches = await asyncio.to_thread(self.content_index.search, request, FINDER_CANDIDATES)
+        path = ContentIndex.confident_match(content_matches)
+        if path:
+            logger.info(f"Content index matched {path}")
+            return {"status": "success", "path": path}
+
+        if matches or content_matches:
+            # Filename candidates first, then documents whose text matched
+            available_files = list(dict.fromkeys(os.path.basename(match) for match, _ in matches + content_matches))
+            logger.debug("Low confidence matches: filenames %s, content %s", LazyJSON(matches), LazyJSON(content_matches))
+        else:
+            available_files = await asyncio.to_thread(os.listdir, os.path.expanduser(DOWNLOADS_DIR))
+        logger.debug("Available files in Downloads: %s", LazyJSON(available_files))
+
+        context = {"files_in_downloads": available_files}
+        if history:
+            # Earlier requests and the documents they resolved to help with "the report from before"
+            context["previous_requests"] = history
+        finder_result = await self.agents["finder"].aexecute_task(
+            task=f"Find and return the full path to a document based on approximate name: {request}. Output a JSON object with a single key 'filename' and the value being just the filename of the document without any path prefix.",
+            context=context,
+            output_format="json"
+        )
+
+        logger.debug("Finder result:")
+        logger.debug("%s", LazyJSON(finder_result))
+        if finder_result["status"] != "success":
+            return finder_result
+        filename = json.loads(finder_result["output"])["filename"]
+        return {"status": "success", "path": os.path.expanduser(DOWNLOADS_DIR) + "/" + filename}
+
+    async def _check_plan(self, plan_task: Optional[asyncio.Task]) -> Optional[str]:
+        """Wait for the coordinator plan and return an error message if it failed."""
+        if plan_task is None:
+            return None
+        plan = await plan_task
+        if plan["status"] != "success":
+            return f"Failed to create plan: {plan.get('error', 'unknown error')}"
+        return None
+
+    async def _stream_summary(self, text: str, on_chunk: Callable[[str], None]) -> str:
+        """Summarize text, passing each piece to on_chunk as it arrives, and return the whole summary."""
+        pieces = []
+        async for piece in self.agents["summarizer"].astream_summary(text):
+            pieces.append(piece)
+            on_chunk(piece)
+        return "".join(pieces).strip()
+
+    async def aprocess_request(
+        self,
+        request: str,
+        file_hint: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        path: Optional[str] = None,
+        history: Optional[List[Dict]] = None,
+        entities: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Process a request, overlapping independent agent calls.
+
+        file_hint names the document (e.g. from the router's slot
+        extraction); requests with a hint are not required to mention "pdf".
+        With on_chunk, the summary is streamed to it as it is generated and
+        the whole summary is still returned; other replies are only returned.
+        path is a document already resolved, e.g. from conversation memory,
+        and skips finding it if it still exists. history lists earlier
+        requests for the finder agent. The path used is stored in entities.
+        """
+        plan_task = None
+        read_task = None
         try:
             logger.info(f"Processing request: {request}")
-            
+
             # Let coordinator analyze the request
-            plan = self.coordinator.execute_task(
-                task=f"Plan how to handle this request: {request}",
-                context={"available_agents": list(self.agents.keys())}
-            )
-            logger.debug(f"Coordinator plan: {json.dumps(plan, indent=2)}")
-            
-            if plan["status"] != "success":
-                return f"Failed to create plan: {plan.get('error', 'unknown error')}"
-            
+            if self.plan:
+                plan_task = asyncio.create_task(self._plan(request))
+                if not self.pipelined:
+                    error_msg = await self._check_plan(plan_task)
+                    if error_msg:
+                        return error_msg
+
             # Execute the plan using appropriate agents
-            if "pdf" in request.lower():
+            if path or file_hint or "pdf" in request.lower():
                 logger.info("Processing PDF-related request")
-                # First find the document
-                available_files = os.listdir(os.path.expanduser("~/Downloads"))
-                logger.debug(f"Available files in Downloads: {available_files}")
-                
-                finder_result = self.agents["finder"].execute_task(
-                    task=f"Find and return the full path to a document based on approximate name: {request}. Output a JSON object with a single key 'filename' and the value being just the filename of the document without any path prefix.",
-                    context={"available_files": f"Here are all the files in the Downloads directory: {available_files}"},
-                    output_format="json"
-                )
-                
-                logger.debug("Finder result:")
-                logger.debug(f"{json.dumps(finder_result, indent=2)}")
-                
+                # First find the document, unless it is already known
+                if path and os.path.isfile(path):
+                    logger.info(f"Using remembered document {path}")
+                    finder_result = {"status": "success", "path": path}
+                else:
+                    finder_result = await self._find(file_hint or request, history)
+
+                if finder_result["status"] == "success":
+                    path = finder_result["path"]
+                    if entities is not None:
+                        entities["path"] = path
+                    # Start reading while the plan may still be in flight
+                    logger.info(f"Reading PDF from: {path}")
+                    read_task = asyncio.create_task(
+                        asyncio.to_thread(self.agents["reader"].read_document, path)
+                    )
+
+                error_msg = await self._check_plan(plan_task)
+                if error_msg:
+                    return error_msg
+
                 if finder_result["status"] != "success":
                     error_msg = f"Failed to find document: {finder_result.get('error')}"
                     logger.error(error_msg)
                     return error_msg
-                
+
                 # Use reader agent
-                path = os.path.expanduser("~/Downloads") + "/" + json.loads(finder_result["output"])["filename"]
-                logger.info(f"Reading PDF from: {path}")
-                
-                reader_result = self.agents["reader"].read_document(path)
+                reader_result = await read_task
                 logger.debug("Reader result:")
-                logger.debug(f"{json.dumps(reader_result, indent=2)}")
-                
+                logger.debug("%s", LazyJSON(reader_result))
+
                 if reader_result["status"] == "success":
                     # Then summarizer agent
                     logger.info("Summarizing PDF content")
-                    summary_result = self.agents["summarizer"].summarize(reader_result["text"])
+                    if on_chunk is not None:
+                        summary = await self._stream_summary(reader_result["text"], on_chunk)
+                        return summary or "Failed to summarize document: the model returned no text"
+                    summary_result = await self.agents["summarizer"].asummarize(reader_result["text"])
                     logger.debug("Summarizer result:")
-                    logger.debug(f"{json.dumps(summary_result, indent=2)}")
-                    
-                    return summary_result.get("summary", "Failed to summarize document")
-                
+                    logger.debug("%s", LazyJSON(summary_result))
+
+                    if summary_result.get("status") != "success" or not summary_result.get("summary", "").strip():
+                        error_msg = f"Failed to summarize document: {summary_result.get('error', 'the model returned no text')}"
+                        logger.error(error_msg)
+                        return error_msg
+                    return summary_result["summary"]
+
                 error_msg = f"Failed to read document: {reader_result.get('error')}"
                 logger.error(error_msg)
                 return error_msg
-            
+
+            error_msg = await self._check_plan(plan_task)
+            if error_msg:
+                return error_msg
+
             logger.warning(f"Unknown request type: {request}")
             return "I'm sorry, I can only handle PDF summarization requests for PDFs in your ~/Downloads folder for now."
-            
+
         except Exception as e:
             error_msg = f"Error processing request: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return error_msg 
\ No newline at end of file
+            return error_msg
+
+        finally:
+            for task in (plan_task, read_task):
+                if task is not None and not task.done():
+                    task.cancel()
@@ -1,47 +1,90 @@
 """
 Specialized agents for different tasks.
 """
+import asyncio
 from pkg.agents.open.crew_ai.base import BaseAgent
-from pkg.tools.open.summarize import summarize_text
+from pkg.tools.open.summarize import asummarize_text, asummarize_long_text, astream_summary, LONG_TEXT_TOKENS, DEFAULT_CONCURRENCY
 from pkg.tools.open.pdf_reader import read_pdf
-from typing import Dict
+from pkg.tools.open.pdf_cache import PDFTextCache
+from pkg.tools.open.summary_cache import SummaryCache
+from pkg.utils import openai_client
+from pkg.utils.resilience import RetryPolicy
+from pkg.utils.tokens import count_tokens
+from typing import AsyncIterator, Dict, Optional
 from pprint import pprint
 
+# The finder only needs the most relevant filenames, so keep its prompts small
+FINDER_TOKEN_BUDGET = 2000
+
+# Finding a file is a short call on the interactive path: fail within seconds,
+# and hedge the slow tail since a duplicate costs a few hundred tokens
+FINDER_RETRY_POLICY = RetryPolicy(attempts=3, base_delay=0.25, deadline=20.0, attempt_timeout=8.0, hedge_percentile=95)
+
 class FinderAgent(BaseAgent):
     def __init__(self):
         super().__init__(
             name="Finder",
             role="Document Finder",
             goal="Finds the full path to a document based on approximate name",
-            backstory="Expert at finding documents from approximate names."
+            backstory="Expert at finding documents from approximate names.",
+            token_budget=FINDER_TOKEN_BUDGET,
+            retry_policy=FINDER_RETRY_POLICY
         )
 
 class ReaderAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, cache: Optional[PDFTextCache] = None, use_cache: bool = True):
         super().__init__(
             name="Reader",
             role="Document Analysis Specialist",
             goal="Extract and understand content from documents",
             backstory="Expert at reading and processing various document formats"
         )
+        self.cache = cache if cache is not None else (PDFTextCache() if use_cache else None)
         
     def read_document(self, filepath: str) -> Dict:
-        """Read and process a document."""
+        """Read and process a document, reusing cached text when unchanged."""
+        if self.cache is not None:
+            return self.cache.read(filepath)
         result = read_pdf(filepath)
         return result
 
 class SummarizerAgent(BaseAgent):
-    def __init__(self):
+    def __init__(
+        self,
+        long_text_tokens: int = LONG_TEXT_TOKENS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache: Optional[SummaryCache] = None,
+        use_cache: bool = True
+    ):
         super().__init__(
             name="Summarizer",
             role="Content Summarization Expert",
             goal="Create concise, accurate summaries",
             backstory="Specialized in distilling complex information into clear summaries"
         )
+        self.long_text_tokens = long_text_tokens
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else (SummaryCache() if use_cache else None)
         
     def summarize(self, text: str) -> Dict:
-        """Summarize given text."""
-        return summarize_text(text)
+        """Summarize given text, using map-reduce for long documents."""
+        return openai_client.run(self.asummarize(text))
+
+    async def asummarize(self, text: str) -> Dict:
+        """Summarize given text without blocking the event loop."""
+        if await asyncio.to_thread(count_tokens, text) > self.long_text_tokens:
+            return await asummarize_long_text(text, concurrency=self.concurrency, cache=self.cache)
+        return await asummarize_text(text)
+
+    async def astream_summary(self, text: str) -> AsyncIterator[str]:
+        """Summarize given text, yielding the summary as it is generated."""
+        async for piece in astream_summary(
+            text,
+            long_text_tokens=self.long_text_tokens,
+            concurrency=self.concurrency,
+            cache=self.cache
+        ):
+            yield piece
 
 class CoordinatorAgent(BaseAgent):
     def __init__(self):
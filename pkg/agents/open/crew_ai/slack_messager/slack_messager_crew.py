@@ -2,10 +2,11 @@
 Crew management for Slack messaging coordination.
 """
 import os
-import json
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 from pkg.tools.open.slack_messager import SlackMessagerTool
+from pkg.utils.logging import LazyJSON
 
 logger = logging.getLogger("vox")
 
@@ -15,35 +16,69 @@ class SlackCrew:
         logger.debug("Initializing SlackCrew")
         self.slack_tool = SlackMessagerTool(api_key=os.getenv('COMPOSIO_API_KEY'))
         logger.debug("SlackCrew initialization complete")
+
+    def health_check(self) -> bool:
+        """Report whether the Slack connection set up at construction is still active."""
+        return self.slack_tool.connection_active()
     
-    def process_request(self, request: str) -> str:
-        """Process a Slack message request."""
+    def process_request(self, request: str, channel: Optional[str] = None, message: Optional[str] = None) -> str:
+        """Process a Slack message request.
+
+        The kernel passes the channel and message its router extracted;
+        without them they are parsed from the request, which should read
+        "Send a Slack message to #channel: message".
+        """
         try:
             logger.info(f"Processing Slack request: {request}")
             
             # Parse the message request
             try:
-                channel_part = request.split("to #")[1].split(":")[0].strip()
-                message_part = request.split(":")[1].strip()
+                if channel and message:
+                    channel_part, message_part = channel, message
+                else:
+                    # Only the first colon ends the channel; the message may contain more
+                    channel_part = request.split("to #", 1)[1].split(":", 1)[0].strip()
+                    message_part = request.split(":", 1)[1].strip()
                 
                 message_data = {
                     "channel": channel_part,
                     "message": message_part
                 }
-                logger.debug(f"Parsed message data: {json.dumps(message_data, indent=2)}")
+                logger.debug("Parsed message data: %s", LazyJSON(message_data))
                 
             except Exception as e:
                 error_msg = "Invalid message format. Please use: Send a Slack message to #channel: message"
                 logger.error(f"Message parsing failed: {str(e)}")
                 return error_msg
             
+            # Validate the channel against the local directory, fixing small typos
+            directory = self.slack_tool.channels
+            if directory.loaded:
+                corrected = directory.correct(message_data["channel"])
+                if corrected is None and directory.is_stale():
+                    # The channel may have been created since the last refresh
+                    try:
+                        directory.refresh()
+                        corrected = directory.correct(message_data["channel"])
+                    except Exception as e:
+                        # Let Slack resolve the name rather than reject it on old data
+                        logger.warning(f"Slack channel directory refresh failed: {str(e)}")
+                        corrected = message_data["channel"].lstrip("#")
+                if corrected is None:
+                    suggestions = directory.suggest(message_data["channel"])
+                    hint = f" Did you mean {', '.join('#' + name for name in suggestions)}?" if suggestions else ""
+                    return f"Unknown Slack channel #{message_data['channel'].lstrip('#')}.{hint}"
+                if corrected != message_data["channel"].lstrip("#"):
+                    logger.info(f"Corrected channel #{message_data['channel']} to #{corrected}")
+                message_data["channel"] = corrected
+
             # Execute the messaging task
             logger.debug("Attempting to send message via SlackTool")
             result = self.slack_tool.send_message(
                 channel=message_data["channel"],
                 text=message_data["message"]
             )
-            logger.debug(f"Slack tool result: {json.dumps(result, indent=2)}")
+            logger.debug("Slack tool result: %s", LazyJSON(result))
             
             return f"Message sent to #{message_data['channel']}"
             
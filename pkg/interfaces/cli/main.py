@@ -3,22 +3,20 @@ CLI interface for Vox Agent OS.
 """
 import asyncio
 import os
-import subprocess
 import logging
-from typing import Optional
+from typing import Callable, Optional, Tuple
 from pathlib import Path
 
 import typer
-import openai
 from rich.console import Console
 from rich.prompt import Prompt
 from dotenv import load_dotenv, find_dotenv
 
 from pkg.utils.logging import setup_logger
-from pkg.voice.recorder import VoiceRecorder
-from pkg.voice.transcriber import WhisperTranscriber
-from pkg.voice.speaker import speak
-from pkg.kernel.agent import Agent
+
+# Voice, OpenAI and crew modules are imported inside the commands that use
+# them, so `vox --help` and text-only commands start without loading audio
+# drivers or the OpenAI SDK.
 
 # Initialize logger
 logger = setup_logger()
@@ -52,13 +50,38 @@ def setup_environment():
     return api_key
 
 def text_to_speech(text: str):
-    """Use macOS say command for TTS."""
-    subprocess.run(["say", text])
+    """Speak text with the system TTS engine, sentence by sentence."""
+    from pkg.voice.speaker import speak
+
+    speak(text)
+
+def stream_reply(run: Callable[[Callable[[str], None]], str], speech=None) -> Tuple[str, bool]:
+    """Call run(on_chunk), printing the reply as it streams in and feeding it to speech.
+
+    Returns the reply and whether it was fully streamed. Replies that don't
+    stream (Slack confirmations, errors) are left for the caller to show.
+    """
+    pieces = []
+
+    def on_chunk(chunk: str) -> None:
+        if not pieces:
+            console.print("\n[bold purple]Agent[/bold purple]: ", end="")
+        pieces.append(chunk)
+        console.print(chunk, end="", markup=False, highlight=False)
+        if speech is not None:
+            speech.feed(chunk)
+
+    response = run(on_chunk)
+    if pieces:
+        console.print("\n")
+    return response, bool(pieces) and response.strip() == "".join(pieces).strip()
 
 app = typer.Typer(help="Vox Agent OS - Voice-first agent interface")
 
 def handle_api_error(e: Exception):
     """Handle common API errors with user-friendly messages."""
+    import openai
+
     if isinstance(e, openai.AuthenticationError):
         console.print(
             "\n[bold red]Authentication Error[/bold red]\n"
@@ -77,45 +100,69 @@ def handle_api_error(e: Exception):
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
 
 @app.command()
-def talk(duration: Optional[float] = typer.Option(None)):
+def talk(
+    duration: Optional[float] = typer.Option(None),
+    audio_format: str = typer.Option("flac", help="Upload format: flac, ogg (Opus) or wav"),
+    local: bool = typer.Option(False, "--local", help="Run in this process even if a vox daemon is running")
+):
     """Record voice command and execute it."""
+    from pkg.voice.recorder import VoiceRecorder
+    from pkg.voice.speaker import SpeechPipeline
+    from pkg.kernel.daemon import DaemonClient
+
     logger.info("Starting voice command session")
     
+    # A running daemon already has the agent, crews and API clients warm
+    client = None if local else DaemonClient.connect()
     try:
-        api_key = setup_environment()
-        
-        # Initialize agent
-        agent = Agent()
+        if client is None:
+            from pkg.voice.transcriber import WhisperTranscriber
+            from pkg.kernel.agent import Agent
+
+            api_key = setup_environment()
+            
+            # Initialize agent, building crews while the user is speaking
+            agent = Agent()
+            agent.prewarm()
+        else:
+            logger.info(f"Using vox daemon at {client.path}")
         
         # Record audio
         recorder = VoiceRecorder()
         console.print("[bold yellow]🎤 Recording...[/bold yellow] Press Ctrl+C to stop")
         recorder.record(duration)
-        audio_path = recorder.save()
+
+        # Hand the audio over in memory; fall back to a temporary WAV file
+        audio_path = None
+        try:
+            audio = recorder.encode(audio_format)
+        except Exception as e:
+            logger.warning(f"In-memory encoding failed, using a temporary file: {str(e)}")
+            audio = audio_path = recorder.save()
         
         try:
             # Transcribe
-            transcriber = WhisperTranscriber(api_key=api_key)
             console.print("[bold yellow]🎯 Transcribing audio...[/bold yellow]")
-            text = transcriber.transcribe(audio_path)
+            if client is not None:
+                if audio_path is None:
+                    text = client.transcribe(audio.data, audio.format, audio.mime_type)
+                else:
+                    text = client.transcribe(audio_path.read_bytes(), "wav", "audio/wav")
+            else:
+                transcriber = WhisperTranscriber(api_key=api_key)
+                text = transcriber.transcribe(audio)
             console.print(f"[bold green]✓ Transcribed:[/bold green] {text}")
             
-            # Determine command type from transcribed text
-            command_type = None
-            if "summarize" in text.lower() and "pdf" in text.lower():
-                command_type = "1"
-            elif "send" in text.lower() and "slack" in text.lower():
-                command_type = "2"
-            
-            # Process with agent
-            response = agent.process_request(text, command_type)
-            
-            # Output response
-            console.print(f"\n[bold purple]Agent[/bold purple]: {response}\n")
-            speak(response)
+            # Route to a crew with the local intent router, speaking the reply as it streams in
+            handle = client.handle if client is not None else agent.handle
+            with SpeechPipeline() as speech:
+                response, streamed = stream_reply(lambda on_chunk: handle(text, on_chunk=on_chunk), speech)
+                if not streamed:
+                    console.print(f"\n[bold purple]Agent[/bold purple]: {response}\n")
+                    speech.feed(response)
             
         finally:
-            if audio_path.exists():
+            if audio_path is not None and audio_path.exists():
                 audio_path.unlink()
     
     except Exception as e:
@@ -123,13 +170,54 @@ def talk(duration: Optional[float] = typer.Option(None)):
         handle_api_error(e)
         raise typer.Exit(1)
 
+    finally:
+        if client is not None:
+            client.close()
+
+def chat_with_daemon(client, use_defaults: bool = False):
+    """Run a chat session against a running daemon, which routes free-form requests."""
+    console.print("[bold blue]Vox Agent OS[/bold blue] - Text interface (daemon)")
+    console.print("Type 'exit' to quit\n")
+
+    with client:
+        while True:
+            if use_defaults:
+                text = "Send a Slack message to #all-agenticflow: Hello, how are you?"
+            else:
+                text = Prompt.ask("[bold green]You[/bold green]").strip()
+            if text.lower() in ("exit", "quit"):
+                console.print("[yellow]Goodbye![/yellow]")
+                break
+            if not text:
+                continue
+            try:
+                response, streamed = stream_reply(lambda on_chunk: client.handle(text, on_chunk=on_chunk))
+                if not streamed:
+                    console.print(f"\n[bold purple]Agent[/bold purple]: {response}\n")
+            except Exception as e:
+                console.print(f"[bold red]Error:[/bold red] {str(e)}")
+            if use_defaults:
+                break
+
 @app.command()
 def chat(
     model: str = typer.Option("gpt-4", help="Language model to use"),
     memory: Optional[str] = typer.Option(None, help="Path to memory file"),
-    use_defaults: bool = typer.Option(False, help="Use defaults")
+    use_defaults: bool = typer.Option(False, help="Use defaults"),
+    local: bool = typer.Option(False, "--local", help="Run in this process even if a vox daemon is running")
 ):
     """Start an interactive text chat session with the agent."""
+    from pkg.kernel.daemon import DaemonClient
+
+    client = None if local else DaemonClient.connect()
+    if client is not None:
+        logger.info(f"Using vox daemon at {client.path}")
+        chat_with_daemon(client, use_defaults)
+        return
+
+    import openai
+    from pkg.kernel.agent import Agent
+
     # Setup environment and API key
     api_key = setup_environment()
     openai.api_key = api_key
@@ -137,6 +225,7 @@ def chat(
     add_initial_logs_divider()
     
     agent = Agent(model=model, memory_path=memory)
+    agent.prewarm()
     
     console.print("[bold blue]Vox Agent OS[/bold blue] - Text interface")
     console.print("Type 'exit' to quit\n")
@@ -152,12 +241,13 @@ def chat(
     while True:
         try:
             # Show menu and get user choice
-            response = agent.process_request(defaults = defaults)
+            response, streamed = stream_reply(lambda on_chunk: agent.process_request(defaults=defaults, on_chunk=on_chunk))
             if response == "Goodbye!":
                 console.print("[yellow]Goodbye![/yellow]")
                 break
                 
-            console.print(f"\n[bold purple]Agent[/bold purple]: {response}\n")
+            if not streamed:
+                console.print(f"\n[bold purple]Agent[/bold purple]: {response}\n")
             break
             
         except Exception as e:
@@ -165,5 +255,106 @@ def chat(
             print(e)
             break
 
+@app.command()
+def batch(
+    input_file: Optional[Path] = typer.Argument(None, help="JSONL file of requests; reads stdin if omitted or '-'"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write JSONL results here instead of stdout"),
+    concurrency: int = typer.Option(8, help="Requests processed at once"),
+    checkpoint: Optional[Path] = typer.Option(None, help="Checkpoint file (default: <output>.checkpoint)"),
+    resume: bool = typer.Option(False, "--resume", help="Skip requests the checkpoint lists as done")
+):
+    """Process a file of requests concurrently, streaming results as JSON lines."""
+    import sys
+    import time
+    from pkg.kernel.agent import Agent
+    from pkg.kernel.batch import BatchRunner
+
+    setup_environment()
+    add_initial_logs_divider()
+
+    if checkpoint is None and output is not None:
+        checkpoint = output.with_name(output.name + ".checkpoint")
+    if resume and checkpoint is None:
+        console.print("[bold red]--resume needs --output or --checkpoint[/bold red]")
+        raise typer.Exit(1)
+
+    status = Console(stderr=True)
+    source = sys.stdin if input_file is None or str(input_file) == "-" else open(input_file)
+    sink = open(output, "a" if resume else "w") if output is not None else sys.stdout
+    started = time.perf_counter()
+    try:
+        # Batch requests are independent, so they neither use nor fill conversation memory
+        runner = BatchRunner(Agent(use_memory=False), concurrency=concurrency, checkpoint=checkpoint)
+        if checkpoint is not None and not resume and checkpoint.exists():
+            checkpoint.unlink()
+        results = runner.run(source, sink, resume=resume)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    elapsed = time.perf_counter() - started
+    processed = results["succeeded"] + results["failed"] + results["needs_input"]
+    status.print(
+        f"[bold green]✓[/bold green] {results['succeeded']} succeeded, {results['failed']} failed, "
+        f"{results['needs_input']} need more input, {results['skipped']} skipped "
+        f"in {elapsed:.1f}s ({processed / elapsed:.2f} requests/s)"
+    )
+    if results["failed"] or results["needs_input"]:
+        raise typer.Exit(1)
+
+@app.command()
+def serve(
+    socket_path: Optional[Path] = typer.Option(None, "--socket", help="Unix socket to listen on (default: ~/.vox/run/vox.sock)")
+):
+    """Run the vox daemon, keeping the agent, crews and API clients warm for chat and talk."""
+    from pkg.kernel.daemon import VoxDaemon
+
+    setup_environment()
+    add_initial_logs_divider()
+
+    daemon = VoxDaemon(path=socket_path)
+    console.print(f"[bold blue]vox daemon[/bold blue] listening on {daemon.path} (Ctrl+C to stop)")
+    try:
+        daemon.run()
+    except RuntimeError as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(1)
+
+@app.command()
+def stats(
+    sessions: int = typer.Option(20, help="Number of most recent sessions to include (0 for all)"),
+    stage: Optional[str] = typer.Option(None, help="Only show stages starting with this prefix")
+):
+    """Show per-stage latency percentiles from recorded traces."""
+    from rich.table import Table
+    from pkg.utils import tracing
+
+    spans = tracing.read_spans(sessions=sessions or None)
+    if stage:
+        spans = [record for record in spans if record["name"].startswith(stage)]
+    if not spans:
+        console.print(f"[yellow]No traces recorded yet in {tracing.trace_path()}[/yellow]")
+        return
+
+    table = Table(title=f"Stage latency over {len({record['session'] for record in spans})} session(s)")
+    table.add_column("Stage")
+    for column in ("Count", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "TTFT p50 ms", "Tokens/s", "Tokens"):
+        table.add_column(column, justify="right")
+    for name, row in tracing.summarize(spans).items():
+        table.add_row(
+            name,
+            str(row["count"]),
+            f"{row['mean_ms']:.1f}",
+            f"{row['p50_ms']:.1f}",
+            f"{row['p95_ms']:.1f}",
+            f"{row['p99_ms']:.1f}",
+            f"{row['ttft_p50_ms']:.1f}" if row["ttft_p50_ms"] is not None else "",
+            f"{row['tokens_per_second']:.1f}" if row["tokens_per_second"] is not None else "",
+            str(row["tokens"] or "")
+        )
+    console.print(table)
+
 if __name__ == "__main__":
     app() 
\ No newline at end of file
@@ -1,27 +1,209 @@
 """
 Core Agent class that orchestrates multi-agent execution.
 """
+import asyncio
 import logging
-from typing import Optional, Tuple
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from rich.console import Console
 from rich.prompt import Prompt
-from pkg.agents.open.crew_ai.pdf_summarizer.pdf_summarizer_crew import PDFCrew
-from pkg.agents.open.crew_ai.slack_messager.slack_messager_crew import SlackCrew
-from pkg.agents.licensed.crew_ai.soc2_auditor.soc2_auditor_crew import SOC2AuditorCrew
+from pkg.kernel.memory import REFERENCE_WORDS, ConversationMemory, refers_back
+from pkg.kernel.pool import CrewPool
+from pkg.kernel.registry import CrewRegistry, registry as default_registry
+from pkg.kernel.router import PDF_INTENT_WORDS, IntentRouter, Route, extract_slots
+from pkg.tools.open.file_index import tokenize
+from pkg.utils.logging import LazyJSON
 from pprint import pprint
 
 logger = logging.getLogger("vox")
 console = Console()
 
+# Crews report failures as text rather than raising, starting with one of these
+ERROR_PREFIXES = ("Error ", "Failed ", "Invalid ", "Unknown Slack channel", "I'm sorry")
+
+# Statuses of a dispatched request. A request that needs input was understood
+# but is missing something, like the Slack channel, so it was not run
+SUCCESS = "success"
+ERROR = "error"
+NEEDS_INPUT = "needs_input"
+
+# Replies of crews that caught an exception of their own, which may have left
+# them broken; other failures are about the request, so the crew is kept
+CREW_ERROR_PREFIX = "Error "
+
+def is_error_reply(response: Any) -> bool:
+    """Whether a crew reply reports a failure: an error message or nothing at all."""
+    text = str(response or "")
+    return not text.strip() or text.startswith(ERROR_PREFIXES)
+
+# Past requests offered to crews as context
+RECALL_LIMIT = 3
+
 class Agent:
     def __init__(
         self,
         model: str = "gpt-4",
-        memory_path: Optional[str] = None
+        memory_path: Optional[str] = None,
+        registry: Optional[CrewRegistry] = None,
+        use_memory: bool = True
     ):
         self.model = model
+        # Past requests and the documents and channels they resolved to, so
+        # follow-ups like "summarize the same PDF again" skip finding it
+        self.memory = ConversationMemory(memory_path) if use_memory else None
+        # Crews are imported on first use, so commands that never touch
+        # Slack or licensed modules don't pay for (or fail on) their imports
+        self.registry = registry or default_registry
+        self.crews = CrewPool(self.registry)
+        self.router = IntentRouter(self.registry)
         logger.debug(f"Initialized Agent with model: {model}")
 
+    def prewarm(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Build crews before the first request so it doesn't pay their setup cost.
+
+        Defaults to the PDF and Slack crews, skipping any whose modules are
+        not installed.
+        """
+        if names is None:
+            names = [name for name in ("pdf", "slack") if self.registry.is_available(name)]
+        return self.crews.warm(names, background=background)
+
+    def handle(self, text: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Route free-form text (typed or transcribed) to a crew and return its response.
+
+        Crews that stream also pass their response to on_chunk piece by piece
+        as it is generated.
+        """
+        try:
+            route = self.router.route(text)
+            logger.info(f"Routed request: {route}")
+            return self.dispatch(route, text, on_chunk)
+        except Exception as e:
+            error_msg = f"Error processing request: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return error_msg
+
+    def prepare(self, route: Route, text: str) -> Tuple[Optional[str], str, Dict[str, Any]]:
+        """Build the crew call for a route as (crew, request, kwargs).
+
+        If the request cannot run, crew is None and request is the reply to
+        give instead. References to earlier requests are resolved from memory
+        and written back to route.slots.
+        """
+        if route.crew is None:
+            options = "; ".join(self.registry.describe(name) for name in self.router.crews)
+            return None, f"Sorry, I can't help with that yet. I can: {options}.", {}
+
+        if route.crew == "slack":
+            channel = route.slots.get("channel")
+            message = route.slots.get("message")
+            # "post it to the same channel"
+            if self.memory is not None and (channel in REFERENCE_WORDS or (not channel and "same" in text.lower())):
+                channel = self.memory.last_entity("channel")
+                route.slots["channel"] = channel
+            if not channel:
+                return None, "Which Slack channel should I send that to?", {}
+            if not message:
+                return None, f"What should the message to #{channel} say?", {}
+            # The crew gets the slots as well, so it never has to parse them back out
+            return "slack", f"Send a Slack message to #{channel}: {message}", {"channel": channel, "message": message}
+        if route.crew == "pdf":
+            hint = route.slots.get("file_hint")
+            kwargs = {"file_hint": hint, "entities": {}}
+            if self.memory is not None:
+                last_path = self.memory.last_entity("path")
+                # Without a hint, check the request itself: "summarize it"
+                reference = hint or " ".join(w for w in tokenize(text) if w not in PDF_INTENT_WORDS)
+                if last_path and refers_back(reference):
+                    logger.info(f"Request refers back to {last_path}")
+                    kwargs["path"] = last_path
+                kwargs["history"] = [
+                    {"request": entry["request"], **entry["entities"]}
+                    for entry in self.memory.recall(hint or text, RECALL_LIMIT, crew="pdf")
+                ]
+            return "pdf", text, kwargs
+        return route.crew, text, {}
+
+    def remember(self, route: Route, text: str, kwargs: Dict[str, Any], response: str) -> None:
+        """Record a handled request with the entities it resolved."""
+        if self.memory is None or route.crew is None:
+            return
+        entities = dict(kwargs.get("entities") or {})
+        if route.crew == "slack":
+            entities["channel"] = route.slots.get("channel")
+        status = "error" if is_error_reply(response) else "success"
+        try:
+            self.memory.add(text, route.crew, entities, str(response), status)
+        except Exception as e:
+            logger.warning(f"Failed to record request in memory: {str(e)}")
+
+    def _discard(self, crew: str) -> None:
+        """Drop a crew that failed, so the next request gets a freshly built one."""
+        logger.warning(f"Crew {crew} failed, rebuilding it for the next request")
+        self.crews.invalidate(crew)
+
+    def _check_reply(self, crew: str, response: Any) -> None:
+        if str(response).startswith(CREW_ERROR_PREFIX):
+            self._discard(crew)
+
+    @staticmethod
+    def _stream_to(instance: Any, kwargs: Dict[str, Any], on_chunk: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+        if on_chunk is not None and getattr(instance, "streaming", False):
+            return {**kwargs, "on_chunk": on_chunk}
+        return kwargs
+
+    def dispatch(self, route: Route, text: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Run a routed request on its crew, building the request from the extracted slots."""
+        crew, request, kwargs = self.prepare(route, text)
+        if crew is None:
+            return request
+        instance = self.crews.get(crew)
+        try:
+            response = instance.process_request(request, **self._stream_to(instance, kwargs, on_chunk))
+        except Exception:
+            self._discard(crew)
+            raise
+        self._check_reply(crew, response)
+        logger.debug("Generated response: %s", LazyJSON(response))
+        self.remember(route, text, kwargs, response)
+        return response
+
+    async def adispatch(self, route: Route, text: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Run a routed request without blocking the event loop.
+
+        Crews with an aprocess_request method run on the caller's loop; others
+        run on a worker thread.
+        """
+        _, response = await self.adispatch_status(route, text, on_chunk)
+        return response
+
+    async def adispatch_status(
+        self,
+        route: Route,
+        text: str,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, str]:
+        """Like adispatch, but return (status, reply) with status SUCCESS, ERROR or NEEDS_INPUT."""
+        # Memory reads and writes take a file lock and may reopen the index
+        crew, request, kwargs = await asyncio.to_thread(self.prepare, route, text)
+        if crew is None:
+            # Unroutable requests can't be fixed by asking again; the rest lack a slot
+            return (ERROR if route.crew is None else NEEDS_INPUT), request
+        instance = await asyncio.to_thread(self.crews.get, crew)
+        kwargs = self._stream_to(instance, kwargs, on_chunk)
+        try:
+            if hasattr(instance, "aprocess_request"):
+                response = await instance.aprocess_request(request, **kwargs)
+            else:
+                response = await asyncio.to_thread(instance.process_request, request, **kwargs)
+        except Exception:
+            self._discard(crew)
+            raise
+        self._check_reply(crew, response)
+        logger.debug("Generated response: %s", LazyJSON(response))
+        await asyncio.to_thread(self.remember, route, text, kwargs, response)
+        return (ERROR if is_error_reply(response) else SUCCESS), response
+
     def show_menu(self) -> str:
         """Display menu and get user choice"""
         console.print("\n[bold blue]Available Commands:[/bold blue]")
@@ -37,16 +219,29 @@ class Agent:
         if choice == "1":
             return Prompt.ask("[bold yellow]Enter the name of the PDF to summarize[/bold yellow]")
         elif choice == "2":
-            channel = Prompt.ask("[bold yellow]Enter Slack channel[/bold yellow] (with #)")
-            message = Prompt.ask("[bold yellow]Enter your message[/bold yellow]")
+            channel, message = self.get_slack_input()
             return f"Send a Slack message to {channel}: {message}"
         return ""
 
-    def process_request(self, defaults: dict = {}) -> str:
-        """Process a request using the appropriate crew."""
+    def get_slack_input(self) -> Tuple[str, str]:
+        """Ask for the channel and message of a Slack request"""
+        channel = Prompt.ask("[bold yellow]Enter Slack channel[/bold yellow] (with #)")
+        message = Prompt.ask("[bold yellow]Enter your message[/bold yellow]")
+        return channel, message
+
+    @staticmethod
+    def _slack_slots(channel: str, message: str) -> Dict[str, str]:
+        # The menu asks for each field, so take them as given rather than
+        # parsing them back out; the "#" is optional
+        slots = {"channel": channel.strip().lstrip("#").strip().lower(), "message": message.strip()}
+        return {name: value for name, value in slots.items() if value}
+
+    def process_request(self, defaults: dict = {}, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Process a request using the appropriate crew, streaming PDF summaries to on_chunk."""
         try:
             # Check for defaults
             request = ""
+            channel = message = ""
             if defaults:
                 request = defaults.get("request", "")
                 choice = defaults.get("choice", "")
@@ -65,22 +260,24 @@ class Agent:
                     return "Goodbye!"
                 
                 # Get input based on choice
-                request = self.get_command_input(choice)
+                if choice == "2":
+                    channel, message = self.get_slack_input()
+                    request = f"Send a Slack message to {channel}: {message}"
+                else:
+                    request = self.get_command_input(choice)
             
             if not request:
                 return "Invalid input"
 
             # Route to appropriate crew
             if choice == "1":
-                self.pdf_crew = PDFCrew()
-                response = self.pdf_crew.process_request(request)
+                response = self.dispatch(Route("pdf", 1.0, extract_slots("pdf", request), "menu"), request, on_chunk)
             elif choice == "2":
-                self.slack_crew = SlackCrew()
-                response = self.slack_crew.process_request(request)
+                response = self.dispatch(Route("slack", 1.0, self._slack_slots(channel, message), "menu"), request)
             else:
                 response = "Invalid command type"
 
-            logger.debug(f"Generated response: {response}")
+            logger.debug("Generated response: %s", LazyJSON(response))
             return response
             
         except Exception as e:
@@ -0,0 +1,139 @@
+"""
+Batch processing of request files through the kernel Agent.
+"""
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, TextIO
+
+from pkg.kernel.agent import SUCCESS, Agent
+from pkg.kernel.router import Route, extract_slots
+
+logger = logging.getLogger("vox")
+
+DEFAULT_CONCURRENCY = 8
+
+def load_checkpoint(path: Path) -> Set[str]:
+    """Return the IDs of requests a previous run completed successfully."""
+    done = set()
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    done.add(line)
+    except FileNotFoundError:
+        pass
+    return done
+
+def parse_line(line: str, number: int) -> Dict[str, Any]:
+    """Parse one input line into a request dict with at least "id" and "request".
+
+    Lines are JSON objects like {"id": "q3", "request": "summarize the q3 report pdf"},
+    optionally with "crew" to skip routing. A bare JSON string is also accepted.
+    """
+    item = json.loads(line)
+    if isinstance(item, str):
+        item = {"request": item}
+    if not isinstance(item, dict) or not isinstance(item.get("request"), str):
+        raise ValueError('expected an object with a "request" string')
+    item["id"] = str(item.get("id", number))
+    return item
+
+class BatchRunner:
+    """Run requests through the agent on a bounded pool of async workers.
+
+    Results are written as JSON lines in completion order, each flushed as
+    soon as it is ready. The IDs of successful requests are appended to the
+    checkpoint file, if one is given, and skipped when a run is resumed.
+    Requests the agent answered with a question instead of running them
+    ("Which Slack channel...?") get status "needs_input" and are retried.
+    """
+
+    def __init__(self, agent: Agent, concurrency: int = DEFAULT_CONCURRENCY, checkpoint: Optional[Path] = None):
+        self.agent = agent
+        self.concurrency = max(1, concurrency)
+        self.checkpoint = checkpoint
+        self.stats = {"succeeded": 0, "failed": 0, "needs_input": 0, "skipped": 0}
+
+    async def _process(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"id": item["id"], "request": item["request"]}
+        try:
+            if item.get("crew"):
+                route = Route(item["crew"], 1.0, extract_slots(item["crew"], item["request"]), "input")
+            else:
+                route = await self.agent.router.aroute(item["request"])
+            result["crew"] = route.crew
+            status, response = await self.agent.adispatch_status(route, item["request"])
+            if status == SUCCESS:
+                result.update(status=status, response=response)
+            else:
+                result.update(status=status, error=response or "Empty response")
+        except Exception as e:
+            logger.error(f"Batch request {item['id']} failed: {str(e)}", exc_info=True)
+            result.update(status="error", error=str(e))
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def _write(self, result: Dict[str, Any], output: TextIO, checkpoint: Optional[TextIO]) -> None:
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if result["status"] == "success":
+            self.stats["succeeded"] += 1
+            if checkpoint is not None:
+                checkpoint.write(result["id"] + "\n")
+                checkpoint.flush()
+        elif result["status"] == "needs_input":
+            self.stats["needs_input"] += 1
+        else:
+            self.stats["failed"] += 1
+
+    async def arun(self, source: TextIO, output: TextIO, resume: bool = False) -> Dict[str, int]:
+        """Process every request in source, writing results to output."""
+        done = load_checkpoint(self.checkpoint) if resume and self.checkpoint else set()
+        checkpoint = open(self.checkpoint, "a") if self.checkpoint else None
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                self._write(await self._process(item), output, checkpoint)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            number = 0
+            while True:
+                line = await asyncio.to_thread(source.readline)
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    item = parse_line(line, number)
+                except ValueError as e:
+                    self._write({"id": str(number), "status": "error", "error": f"Invalid input line: {str(e)}"}, output, checkpoint)
+                    continue
+                if item["id"] in done:
+                    self.stats["skipped"] += 1
+                    continue
+                await queue.put(item)
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            if checkpoint is not None:
+                checkpoint.close()
+        return self.stats
+
+    def run(self, source: TextIO, output: TextIO, resume: bool = False) -> Dict[str, int]:
+        """Blocking variant of arun."""
+        return asyncio.run(self.arun(source, output, resume))
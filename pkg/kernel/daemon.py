@@ -0,0 +1,267 @@
+"""
+Resident vox daemon serving the kernel Agent over a Unix domain socket.
+
+The protocol is one JSON object per line in each direction. Requests look
+like {"id": 1, "method": "handle", "text": "..."} and each gets a response
+with the same id and either "result" or "error". Methods:
+
+    ping                         daemon status
+    route       text             classify a request without running it
+    handle      text, stream     route and run a request, returning the reply
+    transcribe  audio, format    transcribe base64 audio with the warm client
+    shutdown                     stop the daemon
+
+With "stream": true, handle first sends {"id": 1, "chunk": "..."} lines as
+the reply is generated. Requests on different connections run concurrently.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+# Largest request line accepted, big enough for a base64-encoded recording
+MAX_MESSAGE_BYTES = 32 * 1024 * 1024
+
+CONNECT_TIMEOUT = 0.5
+
+# Time in-flight requests get to finish when the daemon stops
+SHUTDOWN_GRACE = 10.0
+
+def socket_path() -> Path:
+    """Return the daemon socket path, overridable with VOX_SOCKET."""
+    override = os.getenv("VOX_SOCKET")
+    if override:
+        return Path(override)
+    # Only the owner may reach the socket, whatever the umask was when the directory was made
+    run_dir = state_dir("run")
+    os.chmod(run_dir, 0o700)
+    return run_dir / "vox.sock"
+
+class DaemonError(Exception):
+    """Raised by DaemonClient when the daemon reports an error."""
+
+class VoxDaemon:
+    """Keep the Agent, its crews and the OpenAI client warm between requests."""
+
+    def __init__(self, agent=None, path: Optional[Path] = None):
+        from pkg.kernel.agent import Agent
+
+        self.agent = agent or Agent()
+        self.path = Path(path or socket_path())
+        self.started = time.time()
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._indexer = None
+
+    def _claim_socket(self) -> None:
+        """Remove a stale socket, refusing to start if another daemon answers on it."""
+        if not self.path.exists():
+            return
+        if DaemonClient.running(self.path):
+            raise RuntimeError(f"A vox daemon is already running on {self.path}")
+        self.path.unlink()
+
+    async def _call(self, request: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]) -> Any:
+        method = request.get("method")
+        if method == "ping":
+            return {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 1),
+                "requests": self.requests,
+                "crews": self.agent.router.crews,
+            }
+        if method == "route":
+            route = await self.agent.router.aroute(request["text"])
+            return {"crew": route.crew, "confidence": route.confidence, "slots": route.slots, "source": route.source}
+        if method == "handle":
+            route = await self.agent.router.aroute(request["text"])
+            logger.info(f"Routed request: {route}")
+            on_chunk = None
+            if request.get("stream"):
+                on_chunk = lambda chunk: emit({"id": request.get("id"), "chunk": chunk})
+            return await self.agent.adispatch(route, request["text"], on_chunk)
+        if method == "transcribe":
+            from pkg.utils import openai_client
+
+            audio = base64.b64decode(request["audio"])
+            audio_format = request.get("format", "wav")
+            return await openai_client.atranscription(
+                model="whisper-1",
+                file=(f"recording.{audio_format}", audio, request.get("mime_type", f"audio/{audio_format}")),
+                response_format="text"
+            )
+        if method == "shutdown":
+            self._stopping.set()
+            return "stopping"
+        raise ValueError(f"Unknown method: {method!r}")
+
+    async def _respond(self, line: bytes, emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        request: Dict[str, Any] = {}
+        try:
+            request = json.loads(line)
+            self.requests += 1
+            return {"id": request.get("id"), "result": await self._call(request, emit)}
+        except Exception as e:
+            logger.error(f"Daemon request failed: {str(e)}", exc_info=True)
+            return {"id": request.get("id") if isinstance(request, dict) else None, "error": str(e)}
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        loop = asyncio.get_running_loop()
+
+        def emit(message: Dict[str, Any]) -> None:
+            data = json.dumps(message).encode() + b"\n"
+            # Crews may stream from a worker thread; writes on the loop keep their order
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if on_loop:
+                writer.write(data)
+            else:
+                loop.call_soon_threadsafe(writer.write, data)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line, emit)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Daemon client disconnected: {str(e)}")
+        finally:
+            self._clients.pop(task, None)
+            writer.close()
+
+    async def serve(self) -> None:
+        """Serve until shutdown is requested or the process is signalled."""
+        self._claim_socket()
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        # Signals can only be handled on the main thread; embedded daemons stop via shutdown
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, self._stopping.set)
+
+        # Build crews and the HTTP connection pool before the first request
+        self.agent.prewarm()
+        from pkg.utils import openai_client
+        await asyncio.to_thread(openai_client.get_client)
+        # Only the daemon keeps the PDF content index current; other processes just query it
+        if "pdf" in self.agent.router.crews:
+            from pkg.agents.open.crew_ai.pdf_summarizer.pdf_summarizer_crew import DOWNLOADS_DIR
+            from pkg.tools.open.content_index import ContentIndex
+
+            # Extraction runs in a worker process so it never holds the GIL requests need
+            self._indexer = ContentIndex(search_dirs=[DOWNLOADS_DIR], isolate=True)
+            self._indexer.start()
+
+        # Bind with a restrictive umask so the socket is never reachable by other users, even briefly
+        umask = os.umask(0o077)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=str(self.path), limit=MAX_MESSAGE_BYTES)
+        finally:
+            os.umask(umask)
+        logger.info(f"vox daemon listening on {self.path}")
+        try:
+            await self._stopping.wait()
+        finally:
+            self._server.close()
+            if self._indexer is not None:
+                self._indexer.stop(wait=False)
+            # Closing the transports ends idle connections; busy ones finish their request
+            for writer in list(self._clients.values()):
+                writer.transport.close()
+            if self._clients:
+                await asyncio.wait(list(self._clients), timeout=SHUTDOWN_GRACE)
+            await self._server.wait_closed()
+            if self.path.exists():
+                self.path.unlink()
+            logger.info("vox daemon stopped")
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+class DaemonClient:
+    """Blocking client for a running VoxDaemon, reusing one connection."""
+
+    def __init__(self, path: Optional[Path] = None, timeout: Optional[float] = None):
+        self.path = Path(path or socket_path())
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(CONNECT_TIMEOUT)
+        self._socket.connect(str(self.path))
+        self._socket.settimeout(timeout)
+        self._file = self._socket.makefile("rb")
+        self._next_id = 0
+
+    @staticmethod
+    def running(path: Optional[Path] = None) -> bool:
+        """Check whether a daemon is accepting connections."""
+        try:
+            DaemonClient(path).close()
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def connect(cls, path: Optional[Path] = None) -> Optional["DaemonClient"]:
+        """Return a connected client, or None if no daemon is running."""
+        path = Path(path or socket_path())
+        if not path.exists():
+            return None
+        try:
+            return cls(path)
+        except OSError:
+            return None
+
+    def call(self, method: str, on_chunk: Optional[Callable[[str], None]] = None, **params) -> Any:
+        """Call a daemon method, passing any streamed chunks to on_chunk."""
+        self._next_id += 1
+        request = {"id": self._next_id, "method": method, **params}
+        self._socket.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError("vox daemon closed the connection")
+            response = json.loads(line)
+            if "chunk" not in response:
+                break
+            if on_chunk is not None:
+                on_chunk(response["chunk"])
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def handle(self, text: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        if on_chunk is None:
+            return self.call("handle", text=text)
+        return self.call("handle", on_chunk=on_chunk, text=text, stream=True)
+
+    def transcribe(self, data: bytes, format: str, mime_type: str) -> str:
+        return self.call("transcribe", audio=base64.b64encode(data).decode("ascii"), format=format, mime_type=mime_type)
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,341 @@
+"""
+Persistent conversation memory for the kernel Agent.
+
+Each request is appended as a JSON line to a log, together with the crew
+that handled it, the entities it resolved (document path, Slack channel) and
+a snippet of the result. Next to the log, a memory-mapped NumPy matrix holds
+a hashed bag-of-words vector per entry and a second one the entry's byte
+offset in the log, so recall is one matrix-vector product over at most
+max_entries rows plus a seek per returned entry, and never parses the log.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from pkg.tools.open.file_index import STOPWORDS, tokenize
+from pkg.utils.files import atomic_path, atomic_write, write_json
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+# Width of the hashed bag-of-words vectors
+VECTOR_DIM = 256
+
+# Entries kept before compaction, and the share of them compaction keeps
+DEFAULT_MAX_ENTRIES = 10000
+COMPACT_RATIO = 0.75
+
+# Characters of each result stored in the log
+RESULT_CHARS = 500
+
+# Recalled entries must be at least this similar to the query
+MIN_SIMILARITY = 0.2
+
+# Bonus for the newest entry, falling linearly to nothing for the oldest
+RECENCY_WEIGHT = 0.05
+
+# Words that point back at an earlier request instead of naming something new
+REFERENCE_WORDS = {
+    "same", "again", "last", "previous", "earlier", "before", "one", "it", "that",
+    "this", "there", "above", "just",
+}
+
+def refers_back(text: Optional[str]) -> bool:
+    """Whether text is only a reference to something mentioned before, like "the same one again"."""
+    words = [w for w in tokenize(text or "") if w in REFERENCE_WORDS or w not in STOPWORDS]
+    # Text that names nothing at all ("a pdf") is not a reference either
+    return bool(words) and all(w in REFERENCE_WORDS for w in words)
+
+def embed(text: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """Hash the words and word pairs of text into a unit vector.
+
+    Each feature adds or subtracts one in a bucket picked by its CRC32, so
+    collisions cancel out on average rather than accumulating.
+    """
+    words = [w for w in tokenize(text) if w not in STOPWORDS]
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _entry_text(entry: Dict[str, Any]) -> str:
+    """The text an entry is indexed by: its request and the names of its entities."""
+    entities = entry.get("entities") or {}
+    names = [os.path.basename(str(value)) for value in entities.values()]
+    return " ".join([entry.get("request", ""), *names])
+
+class ConversationMemory:
+    """Append-only log of past requests with a memory-mapped vector index.
+
+    Files, for a log at conversation.jsonl:
+        conversation.jsonl          one JSON entry per line
+        conversation.vectors.npy    float32 (capacity, dim) entry vectors
+        conversation.offsets.npy    int64 (capacity,) byte offset of each entry
+        conversation.meta.json      entry count, indexed log size and latest entities
+
+    Capacity is max_entries + 1; once it is exceeded the oldest entries and
+    repeats are compacted away. The index is rebuilt from the log whenever
+    the two disagree, so the log is the only file that matters.
+
+    Several processes (the daemon, local chat and talk sessions) may share
+    the files. Every read and write holds an flock on conversation.lock and
+    first catches up with whatever the others appended or compacted.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES, dim: int = VECTOR_DIM):
+        self.path = Path(path or state_dir("memory") / "conversation.jsonl").expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.dim = dim
+        self.vectors_path = self.path.with_suffix(".vectors.npy")
+        self.offsets_path = self.path.with_suffix(".offsets.npy")
+        self.meta_path = self.path.with_suffix(".meta.json")
+        self.lock_path = self.path.with_suffix(".lock")
+        self._lock = threading.Lock()
+        self.count = 0
+        self._log_bytes = 0
+        # Bumped on every rebuild, so other processes notice a compaction
+        self._generation = 0
+        self._overflow = False
+        self.entities: Dict[str, str] = {}
+        self._vectors = self._offsets = None
+        with self._locked():
+            pass
+
+    @property
+    def capacity(self) -> int:
+        return self.max_entries + 1
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the thread and file locks, with the in-memory state caught up with the files."""
+        with self._lock, open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._sync()
+            yield
+
+    def _sync(self) -> None:
+        """Reopen the index if another process changed the files since this one last did."""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            current = (
+                self._vectors is not None
+                and (meta["count"], meta["log_bytes"], meta["generation"]) == (self.count, self._log_bytes, self._generation)
+                and self.path.stat().st_size == self._log_bytes
+            )
+        except (OSError, ValueError, KeyError):
+            current = False
+        if not current:
+            self._open()
+
+    def _open(self) -> None:
+        self._vectors = self._offsets = None
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self._vectors = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+            self._offsets = np.lib.format.open_memmap(self.offsets_path, mode="r+")
+            log_size = self.path.stat().st_size
+            if (
+                self._vectors.shape != (self.capacity, self.dim)
+                or self._offsets.shape != (self.capacity,)
+                or meta["log_bytes"] > log_size
+            ):
+                raise ValueError("memory index does not match its log")
+            self.count = meta["count"]
+            self._log_bytes = meta["log_bytes"]
+            self._generation = meta["generation"]
+            self.entities = meta.get("entities", {})
+            if log_size > self._log_bytes:
+                # Entries appended after the index was last saved
+                self._index_log(self._log_bytes)
+                self._save_meta()
+        except (OSError, ValueError, KeyError) as e:
+            if self.path.exists():
+                logger.info(f"Rebuilding conversation memory index: {str(e)}")
+            self._rebuild()
+        if self._overflow or self.count > self.max_entries:
+            # The log holds more entries than fit, e.g. after max_entries was lowered
+            self._compact()
+            self._save_meta()
+
+    def _create_index(self) -> None:
+        # New files are renamed into place rather than truncating the old
+        # ones, which other processes may still have mapped
+        self._vectors = self._offsets = None
+        arrays = []
+        for path, dtype, shape in (
+            (self.vectors_path, np.float32, (self.capacity, self.dim)),
+            (self.offsets_path, np.int64, (self.capacity,)),
+        ):
+            with atomic_path(path, suffix=".npy") as tmp_path:
+                arrays.append(np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape))
+        self._vectors, self._offsets = arrays
+
+    def _rebuild(self) -> None:
+        self._create_index()
+        self.count = 0
+        self._log_bytes = 0
+        self._generation += 1
+        self._overflow = False
+        self.entities = {}
+        if self.path.exists():
+            self._index_log(0)
+        self._save_meta()
+
+    def _index_log(self, start: int) -> None:
+        """Index the log entries from byte offset start to the end."""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if entry is not None:
+                    if self.count < self.capacity:
+                        self._add_row(offset, entry)
+                    else:
+                        self._overflow = True
+                offset += len(line)
+        self._log_bytes = offset
+
+    def _add_row(self, offset: int, entry: Dict[str, Any]) -> None:
+        self._vectors[self.count] = embed(_entry_text(entry), self.dim)
+        self._offsets[self.count] = offset
+        self.count += 1
+        if entry.get("status") == "success":
+            self.entities.update(entry.get("entities") or {})
+
+    def _save_meta(self) -> None:
+        meta = {
+            "count": self.count,
+            "log_bytes": self._log_bytes,
+            "generation": self._generation,
+            "dim": self.dim,
+            "entities": self.entities,
+        }
+        write_json(self.meta_path, meta)
+
+    def add(
+        self,
+        request: str,
+        crew: Optional[str] = None,
+        entities: Optional[Dict[str, str]] = None,
+        result: str = "",
+        status: str = "success"
+    ) -> Dict[str, Any]:
+        """Append an entry, compacting the memory if it is full."""
+        entry = {
+            "time": round(time.time(), 3),
+            "request": request,
+            "crew": crew,
+            "entities": {k: v for k, v in (entities or {}).items() if v},
+            "result": result[:RESULT_CHARS],
+            "status": status,
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._locked():
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            self._add_row(offset, entry)
+            self._log_bytes = offset + len(line)
+            if self.count > self.max_entries or self._overflow:
+                self._compact()
+            self._save_meta()
+        return entry
+
+    def last_entity(self, kind: str) -> Optional[str]:
+        """The most recent successfully used entity of a kind, e.g. "path" or "channel"."""
+        with self._locked():
+            return self.entities.get(kind)
+
+    def _read_entry(self, f, offset: int) -> Optional[Dict[str, Any]]:
+        f.seek(offset)
+        try:
+            return json.loads(f.readline())
+        except ValueError:
+            return None
+
+    def recall(self, query: str, k: int = 3, crew: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return up to k past entries most similar to query, best first, each with its "score"."""
+        vector = embed(query, self.dim)
+        if not vector.any():
+            return []
+        # Held while reading entries too, so a compaction can't move them in between
+        with self._locked():
+            n = self.count
+            if not n:
+                return []
+            scores = self._vectors[:n] @ vector
+            scores += RECENCY_WEIGHT * np.arange(1, n + 1, dtype=np.float32) / n
+            # Take extra candidates so filtering by crew can still fill k
+            take = min(n, k * 4 if crew else k)
+            best = np.argpartition(-scores, take - 1)[:take]
+            best = best[np.argsort(-scores[best])]
+            offsets = self._offsets[best].tolist()
+
+            results = []
+            with open(self.path, "rb") as f:
+                for index, offset in zip(best.tolist(), offsets):
+                    if scores[index] < MIN_SIMILARITY:
+                        break
+                    entry = self._read_entry(f, offset)
+                    if entry is None or (crew and entry.get("crew") != crew):
+                        continue
+                    entry["score"] = round(float(scores[index]), 3)
+                    results.append(entry)
+                    if len(results) == k:
+                        break
+            return results
+
+    def _compact(self) -> None:
+        """Rewrite the log with the newest entries, dropping repeats, and rebuild the index."""
+        keep = max(1, int(self.max_entries * COMPACT_RATIO))
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+
+        kept: List[bytes] = []
+        seen = set()
+        for line in reversed(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            key = (entry.get("request", "").lower(), json.dumps(entry.get("entities"), sort_keys=True))
+            if key in seen:
+                continue
+            seen.add(key)
+            kept.append(line)
+            if len(kept) == keep:
+                break
+        kept.reverse()
+
+        with atomic_write(self.path, "wb") as f:
+            f.writelines(kept)
+
+        entities = self.entities
+        self._rebuild()
+        # Keep entities whose entries were compacted away
+        self.entities = {**entities, **self.entities}
+        logger.info(f"Compacted conversation memory from {len(lines)} to {len(kept)} entries")
+
+    def clear(self) -> None:
+        """Forget everything."""
+        with self._locked():
+            self.path.write_bytes(b"")
+            self._rebuild()
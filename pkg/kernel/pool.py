@@ -0,0 +1,82 @@
+"""
+Pool of long-lived crew instances owned by the kernel.
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from pkg.kernel.registry import CrewRegistry
+
+logger = logging.getLogger("vox")
+
+class CrewPool:
+    """Build each crew once and hand out the same instance for later requests.
+
+    Crews that define a health_check() method are checked before being handed
+    out and rebuilt if the check fails or raises.
+    """
+
+    def __init__(self, registry: CrewRegistry):
+        self.registry = registry
+        self._crews: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _healthy(name: str, crew: Any) -> bool:
+        check = getattr(crew, "health_check", None)
+        if check is None:
+            return True
+        try:
+            return bool(check())
+        except Exception as e:
+            logger.warning(f"Health check for crew {name} raised: {str(e)}")
+            return False
+
+    def get(self, name: str) -> Any:
+        """Return a healthy instance of the named crew, building it if needed."""
+        # Holding the per-crew lock means a request arriving while the crew
+        # is pre-warming waits for that build instead of starting another
+        with self._lock(name):
+            crew = self._crews.get(name)
+            if crew is not None:
+                if self._healthy(name, crew):
+                    return crew
+                logger.warning(f"Crew {name} failed its health check, rebuilding")
+                self._crews.pop(name, None)
+
+            logger.info(f"Building crew {name}")
+            crew = self.registry.create(name)
+            self._crews[name] = crew
+            return crew
+
+    def invalidate(self, name: str) -> None:
+        """Drop the cached instance so the next request rebuilds it."""
+        with self._lock(name):
+            self._crews.pop(name, None)
+
+    def warm(self, names: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """Build the named crews ahead of the first request.
+
+        Failures are logged and left for get() to retry. With background set
+        the crews are built on a daemon thread, which is returned.
+        """
+        names = list(names)
+
+        def build():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logger.warning(f"Failed to pre-warm crew {name}: {str(e)}")
+
+        if not background:
+            build()
+            return None
+        thread = threading.Thread(target=build, name="vox-crew-warmup", daemon=True)
+        thread.start()
+        return thread
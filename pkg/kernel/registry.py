@@ -0,0 +1,128 @@
+"""
+Registry of crews that imports each crew only when it is first used.
+"""
+import importlib
+import importlib.util
+import logging
+import threading
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger("vox")
+
+class CrewRegistry:
+    """Map crew names to "module:Class" targets and import them on demand.
+
+    Crews pull in heavy or optional dependencies (Composio, licensed modules),
+    so nothing is imported until a crew is actually requested.
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._descriptions: Dict[str, str] = {}
+        self._examples: Dict[str, List[str]] = {}
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: str, description: str = "", examples: Iterable[str] = ()) -> None:
+        """Register a crew class by import path, e.g. "pkg.x.y:MyCrew".
+
+        examples are requests the crew handles, used to train the intent
+        router. Crews without examples are never routed to automatically.
+        """
+        if ":" not in target:
+            raise ValueError(f"Crew target must look like 'module:Class', got {target!r}")
+        self._targets[name] = target
+        self._descriptions[name] = description
+        self._examples[name] = list(examples)
+        self._classes.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._targets)
+
+    def describe(self, name: str) -> str:
+        return self._descriptions.get(name, "")
+
+    def examples(self, name: str) -> List[str]:
+        return list(self._examples.get(name, []))
+
+    def is_available(self, name: str) -> bool:
+        """Check whether a crew's module can be found, without importing it."""
+        module_name = self._targets[name].split(":")[0]
+        try:
+            return importlib.util.find_spec(module_name) is not None
+        except ModuleNotFoundError:
+            return False
+
+    def load(self, name: str) -> type:
+        """Import and return the crew class registered under name."""
+        with self._lock:
+            if name in self._classes:
+                return self._classes[name]
+            if name not in self._targets:
+                raise KeyError(f"Unknown crew: {name}")
+
+            module_name, class_name = self._targets[name].split(":")
+            logger.debug(f"Importing crew {name} from {module_name}")
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise ImportError(f"Crew '{name}' is not available: {str(e)}") from e
+            crew_class = getattr(module, class_name)
+            self._classes[name] = crew_class
+            return crew_class
+
+    def create(self, name: str, **kwargs) -> Any:
+        """Import the crew registered under name and instantiate it."""
+        return self.load(name)(**kwargs)
+
+registry = CrewRegistry()
+registry.register(
+    "pdf",
+    "pkg.agents.open.crew_ai.pdf_summarizer.pdf_summarizer_crew:PDFCrew",
+    "Summarize a PDF",
+    examples=[
+        "summarize the pdf",
+        "summarize the quarterly report pdf",
+        "summarise the invoice from my downloads",
+        "give me a summary of the document",
+        "what does the research paper say",
+        "read the contract and summarize it",
+        "tldr of the whitepaper",
+        "can you summarize my bank statement",
+        "sum up the annual report",
+        "what are the key points of the report",
+        "brief me on the lecture notes",
+        "condense the article into a few points",
+        "give me an overview of the slides document",
+        "what is this paper about",
+        "summary of the meeting minutes pdf",
+        "read me the main findings of the study",
+    ]
+)
+registry.register(
+    "slack",
+    "pkg.agents.open.crew_ai.slack_messager.slack_messager_crew:SlackCrew",
+    "Send a message to Slack",
+    examples=[
+        "send a slack message to general",
+        "send a message to #random saying hello",
+        "post in the random channel",
+        "tell the engineering channel the build is green",
+        "message #general that the standup is moved",
+        "slack the team that I am running late",
+        "post an update to the marketing channel",
+        "let everyone in general know the meeting moved",
+        "notify the channel that the deploy finished",
+        "drop a note in #random",
+        "ping the design channel about the review",
+        "share in slack that lunch is here",
+        "send hello to #all-agenticflow",
+        "write to the support channel that the outage is over",
+        "announce on slack that the release is out",
+    ]
+)
+registry.register(
+    "soc2",
+    "pkg.agents.licensed.crew_ai.soc2_auditor.soc2_auditor_crew:SOC2AuditorCrew",
+    "Run a SOC 2 audit"
+)
@@ -0,0 +1,246 @@
+"""
+Local intent router that maps requests to registered crews.
+"""
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pkg.kernel.registry import CrewRegistry, registry as default_registry
+from pkg.tools.open.file_index import STOPWORDS, tokenize
+
+logger = logging.getLogger("vox")
+
+# Label for requests no crew handles
+NONE = "none"
+
+# Requests below this posterior are sent to the LLM, if escalation is enabled
+CONFIDENCE_THRESHOLD = 0.8
+
+ESCALATION_MODEL = "gpt-4o-mini"
+
+# Escalation only refines the local guess, so don't keep the user waiting on it
+ESCALATION_TIMEOUT = 3.0
+
+# Out-of-scope requests, so that anything unlike every crew has somewhere to go
+NONE_EXAMPLES = [
+    "what is the weather like today",
+    "tell me a joke",
+    "set a timer for ten minutes",
+    "hello how are you",
+    "what time is it",
+    "play some music",
+    "turn off the lights",
+    "remind me to call mom tomorrow",
+    "what is the capital of france",
+    "open my calendar",
+    "how many days until christmas",
+    "thank you",
+    "book a table for two tonight",
+    "translate good morning into spanish",
+    "never mind that is all",
+    "cancel",
+    "stop listening",
+    "search the web for news",
+    "who is the president",
+    "increase the screen brightness",
+]
+
+# Words that say what to do with a document rather than which one it is
+PDF_INTENT_WORDS = {
+    "summarise", "summarize", "summary", "tldr", "sum", "up", "give", "overview", "brief",
+    "key", "points", "main", "findings", "gist", "condense", "into", "few", "say", "says", "does",
+    "read", "and", "are", "be", "was", "quick", "short", "down", "downloads", "folder", "some", "get",
+}
+
+QUOTED = re.compile(r"[\"“']([^\"”']{2,})[\"”']")
+PDF_NAME = re.compile(r"([\w.\-]+\.pdf)\b", re.IGNORECASE)
+CHANNEL_PATTERNS = [
+    re.compile(r"#\s?([\w-]+)"),
+    re.compile(r"\bhashtag\s+([\w-]+)", re.IGNORECASE),
+    re.compile(r"\b(?:the|in|to|on|into)\s+(?:the\s+)?([\w-]+)\s+channel\b", re.IGNORECASE),
+    re.compile(r"\bchannel\s+(?:called\s+|named\s+)?([\w-]+)", re.IGNORECASE),
+    re.compile(r"\b(?:in|to)\s+([\w-]+)\s+(?:that|saying)\b", re.IGNORECASE),
+]
+MESSAGE_PATTERNS = [
+    re.compile(r":\s*(.+)$"),
+    re.compile(r"\b(?:saying|that says|to say|that)\s+(.+)$", re.IGNORECASE),
+]
+
+def features(text: str) -> List[str]:
+    """Unigram and bigram features of a request."""
+    words = re.findall(r"#|[a-z0-9]+", text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class NaiveBayes:
+    """Multinomial naive Bayes over word and bigram counts, with add-alpha smoothing."""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.log_prior: Dict[str, float] = {}
+        self.log_likelihood: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+        self.vocabulary: set = set()
+
+    def fit(self, examples: Dict[str, List[str]]) -> "NaiveBayes":
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for label, texts in examples.items():
+            for text in texts:
+                counts[label].update(features(text))
+        self.vocabulary = set().union(*counts.values())
+        total_examples = sum(len(texts) for texts in examples.values())
+        size = len(self.vocabulary)
+        for label, counter in counts.items():
+            total = sum(counter.values()) + self.alpha * size
+            self.log_prior[label] = math.log(len(examples[label]) / total_examples)
+            self.log_likelihood[label] = {f: math.log((n + self.alpha) / total) for f, n in counter.items()}
+            self.log_unseen[label] = math.log(self.alpha / total)
+        return self
+
+    def predict(self, text: str) -> List[Tuple[str, float]]:
+        """Return (label, probability) pairs, most likely first.
+
+        Features never seen in training carry no evidence and are ignored,
+        so a request made only of unknown words gets the priors.
+        """
+        known = [f for f in features(text) if f in self.vocabulary]
+        scores = {}
+        for label, prior in self.log_prior.items():
+            likelihood = self.log_likelihood[label]
+            unseen = self.log_unseen[label]
+            scores[label] = prior + sum(likelihood.get(f, unseen) for f in known)
+        top = max(scores.values())
+        exp = {label: math.exp(score - top) for label, score in scores.items()}
+        norm = sum(exp.values())
+        return sorted(((label, value / norm) for label, value in exp.items()), key=lambda item: -item[1])
+
+class Route:
+    """The crew chosen for a request, how sure the router is, and extracted slots."""
+
+    def __init__(self, crew: Optional[str], confidence: float, slots: Dict[str, str], source: str):
+        self.crew = crew
+        self.confidence = confidence
+        self.slots = slots
+        # "model" for the local classifier, "llm" after escalation
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"Route(crew={self.crew!r}, confidence={self.confidence:.2f}, slots={self.slots}, source={self.source!r})"
+
+def extract_slots(crew: str, text: str) -> Dict[str, str]:
+    """Pull crew arguments out of a request: channel and message for Slack, a file hint for PDFs."""
+    slots: Dict[str, str] = {}
+    if crew == "slack":
+        for pattern in CHANNEL_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                slots["channel"] = match.group(1).lower()
+                channel_end = match.end()
+                break
+        for pattern in MESSAGE_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                slots["message"] = match.group(1).strip()
+                break
+        else:
+            # "tell the design channel the review is at noon"
+            if "channel" in slots:
+                rest = text[channel_end:].strip(" ,")
+                if len(rest.split()) >= 2:
+                    slots["message"] = rest
+    elif crew == "pdf":
+        match = QUOTED.search(text) or PDF_NAME.search(text)
+        if match:
+            hint = match.group(1).strip()
+        else:
+            words = [w for w in tokenize(text) if w not in STOPWORDS and w not in PDF_INTENT_WORDS]
+            hint = " ".join(words)
+        if hint:
+            slots["file_hint"] = hint
+    return slots
+
+class IntentRouter:
+    """Classify requests into registered crews without a network round-trip.
+
+    A naive Bayes model is trained on the examples each crew registers, plus a
+    set of out-of-scope requests. Training takes a few milliseconds and
+    classifying a request well under one. Requests the model is unsure of are
+    escalated to a small LLM when escalate is set.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[CrewRegistry] = None,
+        threshold: float = CONFIDENCE_THRESHOLD,
+        escalate: bool = True,
+        model: str = ESCALATION_MODEL
+    ):
+        self.registry = registry or default_registry
+        self.threshold = threshold
+        self.escalate = escalate
+        self.model = model
+        self.crews = [name for name in self.registry.names() if self.registry.examples(name) and self.registry.is_available(name)]
+        examples = {name: self.registry.examples(name) for name in self.crews}
+        examples[NONE] = NONE_EXAMPLES
+        self.classifier = NaiveBayes().fit(examples)
+        logger.debug(f"Intent router trained for crews: {self.crews}")
+
+    def classify(self, text: str) -> Route:
+        """Route text with the local model only."""
+        label, confidence = self.classifier.predict(text)[0]
+        crew = None if label == NONE else label
+        slots = extract_slots(crew, text) if crew else {}
+        return Route(crew, confidence, slots, "model")
+
+    def route(self, text: str) -> Route:
+        """Route text, asking the LLM if the local model is unsure."""
+        route = self.classify(text)
+        if route.confidence >= self.threshold or not self.escalate:
+            return route
+        # Imported here so routing confident requests never loads the OpenAI SDK
+        from pkg.utils import openai_client
+
+        return openai_client.run(self._escalate(text, route))
+
+    async def aroute(self, text: str) -> Route:
+        """Route text without blocking the event loop."""
+        route = self.classify(text)
+        if route.confidence >= self.threshold or not self.escalate:
+            return route
+        return await self._escalate(text, route)
+
+    async def _escalate(self, text: str, guess: Route) -> Route:
+        logger.info(f"Intent router unsure ({guess.crew}, {guess.confidence:.2f}), asking {self.model}")
+        from pkg.utils import openai_client
+        from pkg.utils.resilience import RetryPolicy
+
+        options = "\n".join(f"- {name}: {self.registry.describe(name)}" for name in self.crews)
+        try:
+            response = await openai_client.achat_completion(
+                policy=RetryPolicy(attempts=1, deadline=ESCALATION_TIMEOUT),
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "Choose which assistant should handle the user's request.\n"
+                            f"{options}\n- {NONE}: none of the above\n"
+                            'Reply with a JSON object like {"crew": "<name>"}.'
+                        )
+                    },
+                    {"role": "user", "content": text}
+                ],
+                temperature=0,
+                max_tokens=20,
+                response_format={"type": "json_object"}
+            )
+            crew = json.loads(response.choices[0].message.content).get("crew")
+        except Exception as e:
+            logger.warning(f"Intent escalation failed, keeping local guess: {str(e)}")
+            return guess
+
+        if crew not in self.crews:
+            crew = None
+        return Route(crew, 1.0, extract_slots(crew, text) if crew else {}, "llm")
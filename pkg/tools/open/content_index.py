@@ -0,0 +1,489 @@
+"""
+BM25 index over the text of PDFs in the search directories.
+"""
+import fcntl
+import json
+import logging
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pkg.tools.open.file_index import DEFAULT_SEARCH_DIRS, STOPWORDS
+from pkg.tools.open.pdf_cache import PDFTextCache
+from pkg.tools.open.pdf_reader import read_pdf
+from pkg.utils import ranking
+from pkg.utils.files import write_json
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+# Bumped whenever terms are split differently, to rebuild indexes made by older versions
+INDEX_VERSION = 2
+
+# BM25 term frequency saturation and document length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Terms are stored as fixed-width UTF-8 bytes; longer tokens are mostly extraction noise
+MAX_TERM_BYTES = 32
+TERM_DTYPE = f"S{MAX_TERM_BYTES}"
+
+# Documents extracted per segment, so an interrupted build keeps its progress
+BATCH_DOCUMENTS = 256
+
+# Segments are merged into one when there are more than this many, or when
+# this share of their postings belongs to removed or changed documents
+MAX_SEGMENTS = 8
+MAX_DEAD_RATIO = 0.25
+
+# Seconds between rescans by the background indexer
+DEFAULT_INTERVAL = 60.0
+
+# Minimum normalised score for a match to be trusted without asking the LLM
+CONFIDENT_SCORE = 0.5
+# Minimum lead of the best match over the runner-up
+CONFIDENT_MARGIN = 0.15
+
+def index_terms(text: str) -> List[bytes]:
+    """Split text into the UTF-8 encoded terms it is indexed and queried by.
+
+    Words in any script are kept whole ("Müller", not "ller"). Stopwords
+    and single characters are dropped and a plural "s" is stripped, so
+    "receipts" finds a document about a receipt.
+    """
+    terms = []
+    for token in re.findall(r"\w+", text.casefold()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        term = token.encode("utf-8")
+        if len(term) <= MAX_TERM_BYTES:
+            terms.append(term)
+    return terms
+
+# Text caches of extraction worker processes, by cache directory
+_worker_caches: Dict[str, PDFTextCache] = {}
+
+def _extract_terms(path: str, cache_dir: Optional[str]) -> Optional[Dict[bytes, int]]:
+    """Return the term counts of a PDF, or None if its text can't be extracted."""
+    # Background indexing stays on one core per worker rather than spawning a pool per document
+    reader = partial(read_pdf, workers=1)
+    if cache_dir is None:
+        result = reader(path)
+    else:
+        if cache_dir not in _worker_caches:
+            _worker_caches[cache_dir] = PDFTextCache(Path(cache_dir))
+        result = _worker_caches[cache_dir].read(path, reader=reader)
+    if result.get("status") != "success":
+        logger.debug(f"Not indexing {path}: {result.get('error')}")
+        return None
+    return Counter(index_terms(result["text"]))
+
+class _Segment:
+    """Immutable postings for a batch of documents, memory-mapped from a directory.
+
+    terms.npy    sorted vocabulary, fixed-width bytes
+    offsets.npy  int64, postings of terms[i] are at [offsets[i], offsets[i + 1])
+    docs.npy     uint32 document ids, ascending within each term
+    tfs.npy      uint16 term frequencies
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.terms = np.load(directory / "terms.npy", mmap_mode="r")
+        self.offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        self.docs = np.load(directory / "docs.npy", mmap_mode="r")
+        self.tfs = np.load(directory / "tfs.npy", mmap_mode="r")
+
+    def postings(self, term: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        i = int(np.searchsorted(self.terms, term))
+        if i == len(self.terms) or self.terms[i] != term:
+            return self.docs[:0], self.tfs[:0]
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:stop], self.tfs[start:stop]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @classmethod
+    def write(cls, directory: Path, terms: np.ndarray, docs: np.ndarray, tfs: np.ndarray) -> "_Segment":
+        """Write postings given as parallel (term, doc, tf) arrays and open the result."""
+        vocabulary, inverse = np.unique(terms, return_inverse=True)
+        order = np.lexsort((docs, inverse))
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(vocabulary)), out=offsets[1:])
+
+        # Written under a temporary name and renamed, so a crash never leaves half a segment
+        tmp_dir = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".tmp-"))
+        np.save(tmp_dir / "terms.npy", vocabulary.astype(TERM_DTYPE))
+        np.save(tmp_dir / "offsets.npy", offsets)
+        np.save(tmp_dir / "docs.npy", docs[order].astype(np.uint32))
+        np.save(tmp_dir / "tfs.npy", tfs[order].astype(np.uint16))
+        os.rename(tmp_dir, directory)
+        return cls(directory)
+
+class ContentIndex:
+    """Rank PDFs in the search directories by BM25 relevance of their text to a query.
+
+    The index lives under ~/.vox/index/content as a manifest of documents and
+    a few immutable segments of postings. refresh() stats every PDF, extracts
+    text (through PDFTextCache) only for new or modified ones, and writes
+    them as new segments; removed and replaced documents are masked out
+    until segments are merged. Queries read the memory-mapped postings of
+    their terms only, so they take milliseconds however large the corpus is.
+
+    search() does not refresh, so it stays fast; one process (the daemon)
+    runs start() to keep the index current in the background, and every
+    other instance picks up its changes when the manifest changes.
+    """
+
+    def __init__(
+        self,
+        search_dirs: Optional[List[str]] = None,
+        index_dir: Optional[Path] = None,
+        cache: Optional[PDFTextCache] = None,
+        use_cache: bool = True,
+        workers: int = 1,
+        isolate: bool = False
+    ):
+        """Open the index, creating it if needed.
+
+        workers: processes extracting text in parallel during a refresh.
+        isolate: extract in worker processes even with one worker, so PyPDF2
+            never holds this process's GIL. Used by the daemon, whose requests
+            would otherwise wait on background indexing.
+        """
+        self.search_dirs = [os.path.realpath(os.path.expanduser(d)) for d in (search_dirs or DEFAULT_SEARCH_DIRS)]
+        self.index_dir = Path(index_dir or state_dir("index") / "content")
+        self.segments_dir = self.index_dir / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.index_dir / "manifest.json"
+        if cache is None and use_cache:
+            cache = PDFTextCache()
+        self.cache_dir = str(cache.store.directory) if cache is not None else None
+        self.workers = max(1, workers)
+        self.isolate = isolate
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # path -> [doc id (-1 if unreadable), mtime_ns, size, length, unique terms]
+        self._docs: Dict[str, List[int]] = {}
+        self._segments: List[_Segment] = []
+        self._next_id = 0
+        self._next_segment = 0
+        self._manifest_mtime: Optional[int] = None
+        self._load()
+
+    def _manifest_changed(self) -> bool:
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns != self._manifest_mtime
+        except OSError:
+            return False
+
+    def _load(self) -> None:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") != INDEX_VERSION:
+                raise ValueError(f"index version {manifest.get('version')} is not {INDEX_VERSION}")
+            state = (
+                manifest["docs"],
+                [_Segment(self.segments_dir / name) for name in manifest["segments"]],
+                manifest["next_id"],
+                manifest["next_segment"],
+            )
+        except (OSError, ValueError, KeyError) as e:
+            if self.manifest_path.exists():
+                logger.warning(f"Rebuilding content index: {str(e)}")
+            mtime = None
+            state = ({}, [], 0, 0)
+        with self._lock:
+            self._manifest_mtime = mtime
+            self._docs, self._segments, self._next_id, self._next_segment = state
+            self._update_arrays()
+
+    def _remove_orphans(self) -> None:
+        """Delete segments left behind by an interrupted write or merge."""
+        used = {segment.directory.name for segment in self._segments}
+        for entry in os.scandir(self.segments_dir):
+            if entry.name not in used:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _save(self) -> None:
+        manifest = {
+            "version": INDEX_VERSION,
+            "next_id": self._next_id,
+            "next_segment": self._next_segment,
+            "segments": [segment.directory.name for segment in self._segments],
+            "docs": self._docs,
+        }
+        write_json(self.manifest_path, manifest)
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def _update_arrays(self) -> None:
+        """Rebuild the per-document arrays queries use from the manifest."""
+        live = np.zeros(self._next_id, dtype=bool)
+        lengths = np.zeros(self._next_id, dtype=np.float32)
+        paths: List[Optional[str]] = [None] * self._next_id
+        live_postings = 0
+        for path, (doc_id, _, _, length, unique) in self._docs.items():
+            if doc_id >= 0:
+                live[doc_id] = True
+                lengths[doc_id] = length
+                paths[doc_id] = path
+                live_postings += unique
+        count = int(live.sum())
+        self._live, self._lengths, self._paths, self._count = live, lengths, paths, count
+        self._average_length = float(lengths.sum()) / count if count else 0.0
+        self._dead_postings = sum(len(segment) for segment in self._segments) - live_postings
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} for every PDF in the search directories."""
+        found = {}
+        for directory in self.search_dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf"):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return found
+
+    def _extract(self, paths: List[str]) -> List[Optional[Dict[bytes, int]]]:
+        if not self.isolate and (self.workers == 1 or len(paths) == 1):
+            return [_extract_terms(path, self.cache_dir) for path in paths]
+        # Forking a process with other threads running (the daemon) can hand
+        # the worker a lock some thread held, so isolated workers are spawned
+        context = multiprocessing.get_context("spawn") if self.isolate else None
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(paths)), mp_context=context) as pool:
+            return list(pool.map(_extract_terms, paths, repeat(self.cache_dir), chunksize=4))
+
+    def _add_batch(self, batch: List[str], found: Dict[str, Tuple[int, int]]) -> None:
+        """Extract a batch of new or modified documents and commit them as one segment."""
+        terms: List[bytes] = []
+        docs: List[int] = []
+        tfs: List[int] = []
+        entries = {}
+        doc_id = self._next_id
+        for path, counts in zip(batch, self._extract(batch)):
+            mtime, size = found[path]
+            if counts is None:
+                # Remembered so an unreadable file isn't re-extracted until it changes
+                entries[path] = [-1, mtime, size, 0, 0]
+                continue
+            terms.extend(counts)
+            docs.extend([doc_id] * len(counts))
+            tfs.extend(min(tf, 65535) for tf in counts.values())
+            entries[path] = [doc_id, mtime, size, sum(counts.values()), len(counts)]
+            doc_id += 1
+
+        segment = None
+        if terms:
+            segment = _Segment.write(
+                self.segments_dir / f"{self._next_segment:06d}",
+                np.array(terms, dtype=TERM_DTYPE),
+                np.array(docs, dtype=np.uint32),
+                np.array(tfs, dtype=np.uint16)
+            )
+        with self._lock:
+            if segment is not None:
+                self._segments = self._segments + [segment]
+                self._next_segment += 1
+            self._next_id = doc_id
+            self._docs.update(entries)
+            self._save()
+            self._update_arrays()
+
+    def _merge(self) -> None:
+        """Rewrite all segments as one, dropping postings of removed documents."""
+        with self._lock:
+            segments, live = self._segments, self._live
+        terms, docs, tfs = [], [], []
+        for segment in segments:
+            keep = live[segment.docs]
+            terms.append(np.repeat(segment.terms, np.diff(segment.offsets))[keep])
+            docs.append(segment.docs[keep])
+            tfs.append(segment.tfs[keep])
+        merged = _Segment.write(
+            self.segments_dir / f"{self._next_segment:06d}",
+            np.concatenate(terms),
+            np.concatenate(docs),
+            np.concatenate(tfs)
+        )
+        with self._lock:
+            self._segments = [merged]
+            self._next_segment += 1
+            self._save()
+            self._update_arrays()
+        # Queries still holding the old segments keep their mappings after the files go
+        for segment in segments:
+            shutil.rmtree(segment.directory, ignore_errors=True)
+        logger.debug(f"Merged {len(segments)} content index segments into one")
+
+    def refresh(self) -> Dict[str, int]:
+        """Index new and modified PDFs and forget removed ones.
+
+        Returns the number of documents added, updated and removed.
+        """
+        with self._refresh_lock, open(self.index_dir / "lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.debug("Content index is being refreshed by another process")
+                return {"added": 0, "updated": 0, "removed": 0}
+            # Pick up documents another process indexed since this one loaded
+            self._load()
+            self._remove_orphans()
+
+            found = self._scan()
+            with self._lock:
+                known = dict(self._docs)
+            removed = [
+                path for path in known
+                if path not in found and os.path.dirname(path) in self.search_dirs
+            ]
+            changed = sorted(
+                path for path, (mtime, size) in found.items()
+                if path not in known or known[path][1:3] != [mtime, size]
+            )
+            if removed:
+                with self._lock:
+                    for path in removed:
+                        del self._docs[path]
+                    self._save()
+                    self._update_arrays()
+
+            for start in range(0, len(changed), BATCH_DOCUMENTS):
+                if self._stopping.is_set():
+                    break
+                self._add_batch(changed[start:start + BATCH_DOCUMENTS], found)
+                if len(self._segments) > MAX_SEGMENTS:
+                    self._merge()
+
+            total = sum(len(segment) for segment in self._segments)
+            if self._segments and self._dead_postings > MAX_DEAD_RATIO * total:
+                self._merge()
+
+            updated = sum(1 for path in changed if path in known)
+            if changed or removed:
+                logger.info(
+                    f"Content index: {len(changed) - updated} added, {updated} updated, "
+                    f"{len(removed)} removed, {self._count} documents"
+                )
+            return {"added": len(changed) - updated, "updated": updated, "removed": len(removed)}
+
+    def start(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Refresh on a daemon thread now and every interval seconds, unless already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+
+            def run():
+                while not self._stopping.is_set():
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        logger.warning(f"Content index refresh failed: {str(e)}")
+                    self._stopping.wait(interval)
+
+            self._thread = threading.Thread(target=run, name="vox-content-index", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the background indexer after the batch it is extracting.
+
+        Without wait, return at once; the batch in progress is discarded if
+        the process exits first, which leaves the index consistent.
+        """
+        self._stopping.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to limit (path, score) pairs for documents matching query, best first.
+
+        Scores are BM25 divided by the most the query's terms could score,
+        so they fall in [0, 1) and a document matching only some of the
+        terms scores proportionally less. Terms no document contains are
+        ignored.
+        """
+        terms = list(dict.fromkeys(index_terms(query)))
+        if self._manifest_changed():
+            # Another instance, usually the daemon's indexer, updated the index
+            self._load()
+        with self._lock:
+            segments, live, lengths, paths = self._segments, self._live, self._lengths, self._paths
+            count, average_length = self._count, self._average_length
+        if not terms or not count:
+            return []
+
+        scores = np.zeros(len(live), dtype=np.float32)
+        best_possible = 0.0
+        for term in terms:
+            hits = [segment.postings(term) for segment in segments]
+            docs = np.concatenate([d for d, _ in hits]) if hits else np.zeros(0, dtype=np.uint32)
+            tfs = np.concatenate([t for _, t in hits]).astype(np.float32) if hits else np.zeros(0, dtype=np.float32)
+            keep = live[docs]
+            docs, tfs = docs[keep], tfs[keep]
+            if not len(docs):
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / average_length)
+            # Each document appears once per term, so fancy-index addition is safe
+            scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+            best_possible += idf * (BM25_K1 + 1)
+        if not best_possible:
+            return []
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        ranked = sorted(matched.tolist(), key=lambda i: (-scores[i], paths[i]))
+        return [(paths[i], round(float(scores[i]) / best_possible, 4)) for i in ranked]
+
+    def best_match(self, query: str) -> Optional[str]:
+        """Return the best matching path if the match is confident, else None."""
+        return self.confident_match(self.search(query, limit=2))
+
+    @staticmethod
+    def confident_match(matches: List[Tuple[str, float]]) -> Optional[str]:
+        """Return the top path from ranked search results if it is a confident match."""
+        return ranking.confident_match(matches, CONFIDENT_SCORE, CONFIDENT_MARGIN)
+
+    def stats(self) -> Dict[str, int]:
+        """Return document, segment and posting counts and the size of the index on disk."""
+        with self._lock:
+            segments = list(self._segments)
+            documents = self._count
+        size = self.manifest_path.stat().st_size if self.manifest_path.exists() else 0
+        for segment in segments:
+            size += sum(entry.stat().st_size for entry in os.scandir(segment.directory))
+        return {
+            "documents": documents,
+            "segments": len(segments),
+            "postings": sum(len(segment) for segment in segments),
+            "bytes": size,
+        }
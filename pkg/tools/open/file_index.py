@@ -0,0 +1,177 @@
+"""
+Persistent fuzzy index over filenames in the search directories.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pkg.utils import ranking
+from pkg.utils.files import write_json
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+DEFAULT_SEARCH_DIRS = ["~/Downloads", "~/Documents", "."]
+
+# Words that describe the request rather than the file being asked for
+STOPWORDS = {
+    "a", "an", "the", "my", "me", "i", "of", "on", "in", "for", "to", "and", "about",
+    "please", "can", "you", "could", "would", "find", "open", "read", "summarize",
+    "summarise", "summary", "pdf", "pdfs", "file", "document", "doc", "called", "named",
+    "that", "this", "is", "with", "from", "give", "what", "whats", "tell", "it",
+}
+
+# Minimum score for a match to be trusted without asking the LLM
+CONFIDENT_SCORE = 0.6
+# Minimum lead of the best match over the runner-up
+CONFIDENT_MARGIN = 0.1
+# Minimum trigram similarity for two tokens to count as the same word
+TOKEN_MATCH = 0.5
+
+def tokenize(text: str) -> List[str]:
+    """Split a filename or request into lowercase word and number tokens."""
+    return re.findall(r"[a-z]+|\d+", text.lower())
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+class FilenameIndex:
+    """Rank files in the search directories by fuzzy similarity to a request.
+
+    The index is stored under ~/.vox/index. A directory is only re-listed when
+    its mtime changes, which happens whenever entries are added, removed or
+    renamed, so keeping the index current costs one stat per directory.
+    """
+
+    def __init__(
+        self,
+        search_dirs: Optional[List[str]] = None,
+        extensions: Iterable[str] = (".pdf",),
+        index_path: Optional[Path] = None
+    ):
+        self.search_dirs = [os.path.realpath(os.path.expanduser(d)) for d in (search_dirs or DEFAULT_SEARCH_DIRS)]
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.index_path = Path(index_path or state_dir("index") / "filenames.json")
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, Dict] = self._load()
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._tokens: Dict[str, List[Tuple[str, Set[str]]]] = {}
+        for directory in self.search_dirs:
+            for name in self._dirs.get(directory, {}).get("files", []):
+                self._add(os.path.join(directory, name))
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        write_json(self.index_path, self._dirs)
+
+    def _add(self, path: str) -> None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        tokens = [(token, trigrams(token)) for token in tokenize(stem)]
+        self._tokens[path] = tokens
+        for _, grams in tokens:
+            for gram in grams:
+                self._postings[gram].add(path)
+
+    def _remove(self, path: str) -> None:
+        for _, grams in self._tokens.pop(path, []):
+            for gram in grams:
+                self._postings[gram].discard(path)
+
+    def refresh(self) -> None:
+        """Re-list any search directory whose mtime changed since it was indexed."""
+        with self._lock:
+            changed = False
+            for directory in self.search_dirs:
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                entry = self._dirs.get(directory)
+                if entry and entry["mtime"] == mtime:
+                    continue
+
+                names = sorted(
+                    e.name for e in os.scandir(directory)
+                    if e.name.lower().endswith(self.extensions) and e.is_file()
+                )
+                old = set(entry["files"]) if entry else set()
+                for name in old - set(names):
+                    self._remove(os.path.join(directory, name))
+                for name in set(names) - old:
+                    self._add(os.path.join(directory, name))
+                self._dirs[directory] = {"mtime": mtime, "files": names}
+                changed = True
+                logger.debug(f"Indexed {len(names)} files in {directory}")
+
+            if changed:
+                try:
+                    self._save()
+                except OSError as e:
+                    logger.warning(f"Failed to save filename index: {str(e)}")
+
+    def _score(self, query: List[Tuple[str, Set[str]]], path: str) -> float:
+        """Score a file by how well its name tokens and the query tokens cover each other."""
+        name = self._tokens[path]
+        if not name:
+            return 0.0
+
+        matched_query = set()
+        name_weight = name_hits = 0.0
+        for token, grams in name:
+            # Numbers such as years or invoice ids say less about intent
+            weight = 0.5 if token.isdigit() else 1.0
+            name_weight += weight
+            best, best_i = 0.0, None
+            for i, (_, query_grams) in enumerate(query):
+                similarity = _similarity(grams, query_grams)
+                if similarity > best:
+                    best, best_i = similarity, i
+            if best >= TOKEN_MATCH:
+                name_hits += weight * best
+                matched_query.add(best_i)
+
+        name_coverage = name_hits / name_weight
+        query_coverage = len(matched_query) / len(query)
+        return 0.7 * name_coverage + 0.3 * query_coverage
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to limit (path, score) pairs for files matching query, best first."""
+        self.refresh()
+        tokens = [t for t in tokenize(query) if t not in STOPWORDS] or tokenize(query)
+        if not tokens:
+            return []
+        query_grams = [(token, trigrams(token)) for token in tokens]
+
+        # Held while reading the postings, which a concurrent refresh mutates
+        with self._lock:
+            candidates: Set[str] = set()
+            for _, grams in query_grams:
+                for gram in grams:
+                    candidates |= self._postings.get(gram, set())
+            scored = [(path, self._score(query_grams, path)) for path in candidates]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return [item for item in scored[:limit] if item[1] > 0]
+
+    def best_match(self, query: str) -> Optional[str]:
+        """Return the best matching path if the match is confident, else None."""
+        return self.confident_match(self.search(query, limit=2))
+
+    @staticmethod
+    def confident_match(matches: List[Tuple[str, float]]) -> Optional[str]:
+        """Return the top path from ranked search results if it is a confident match."""
+        return ranking.confident_match(matches, CONFIDENT_SCORE, CONFIDENT_MARGIN)
@@ -0,0 +1,89 @@
+"""
+Persistent cache of text extracted from PDF files.
+"""
+import hashlib
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from pkg.tools.open.pdf_reader import read_pdf
+from pkg.utils.cache import DiskCache
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class PDFTextCache:
+    """Cache extracted PDF text on disk, keyed by file identity.
+
+    A lookup first tries the file's path, size and mtime, which needs only a
+    stat. If that misses (the file was touched, copied or moved) the content
+    hash is computed and checked before falling back to a full parse, so an
+    unchanged document is never parsed twice.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = DiskCache(directory or state_dir("pdf_text"), max_bytes)
+
+    @staticmethod
+    def _identity_key(path: str, stat: os.stat_result) -> str:
+        return f"identity:{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def _content_key(digest: str) -> str:
+        return f"content:{digest}"
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_text(self, digest: str) -> Optional[str]:
+        value = self.store.get(self._content_key(digest))
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+    def read(self, filepath: str, reader: Callable[[str], Dict[str, str]] = read_pdf) -> Dict[str, str]:
+        """Return the text of a PDF, parsing it with reader only on a cache miss."""
+        path = os.path.realpath(os.path.expanduser(filepath))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Let the reader produce its usual "not found" error
+            return reader(filepath)
+
+        identity_key = self._identity_key(path, stat)
+        try:
+            digest = self.store.get(identity_key)
+            if digest is not None:
+                text = self._load_text(digest.decode("ascii"))
+                if text is not None:
+                    logger.debug(f"PDF text cache hit for {path}")
+                    return {"text": text, "status": "success"}
+
+            digest = self._hash_file(path)
+            text = self._load_text(digest)
+            if text is not None:
+                logger.debug(f"PDF text cache hit by content hash for {path}")
+                self.store.set(identity_key, digest.encode("ascii"))
+                return {"text": text, "status": "success"}
+        except Exception as e:
+            logger.warning(f"PDF text cache lookup failed for {path}: {str(e)}")
+            return reader(filepath)
+
+        logger.debug(f"PDF text cache miss for {path}")
+        result = reader(filepath)
+        if result.get("status") == "success":
+            try:
+                self.store.set(self._content_key(digest), zlib.compress(result["text"].encode("utf-8"), 1))
+                self.store.set(identity_key, digest.encode("ascii"))
+            except Exception as e:
+                logger.warning(f"Failed to cache PDF text for {path}: {str(e)}")
+        return result
@@ -2,12 +2,87 @@
 PDF reading and processing tool.
 """
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import PyPDF2
+from pkg.tools.open.file_index import FilenameIndex
+from pkg.utils.tracing import traced
 
-def read_pdf(filepath: str) -> Dict[str, str]:
-    """Read a PDF file and return its text content."""
+# Documents with fewer pages than this are extracted in-process; below it the
+# cost of spawning workers and re-opening the file outweighs the parallelism.
+PARALLEL_MIN_PAGES = 64
+
+# Number of page ranges handed to each worker, so slow pages even out.
+RANGES_PER_WORKER = 4
+
+# Most extraction processes ever running. Every read shares one pool of this
+# size, so concurrent reads (vox batch) queue for workers instead of each
+# starting a pool of their own.
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Filename indexes by search directories, kept so find_pdf doesn't reload one per call
+_filename_indexes: Dict[Tuple[str, ...], FilenameIndex] = {}
+_indexes_lock = threading.Lock()
+
+# Separator placed between pages of extracted text, so downstream tools can
+# split documents on page boundaries.
+PAGE_BREAK = "\f"
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from a PDF file."""
+    with open(filepath, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [(reader.pages[i].extract_text() or "") + "\n" for i in range(start, stop)]
+
+def _split_pages(num_pages: int, num_ranges: int) -> List[Tuple[int, int]]:
+    """Split page indices into contiguous, roughly equal ranges."""
+    num_ranges = max(1, min(num_ranges, num_pages))
+    size, extra = divmod(num_pages, num_ranges)
+    ranges = []
+    start = 0
+    for i in range(num_ranges):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    """Return the number of extraction processes to use."""
+    if workers is None:
+        return MAX_WORKERS
+    return max(1, min(workers, MAX_WORKERS))
+
+def _shared_pool() -> ProcessPoolExecutor:
+    """Return the extraction pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so the next read starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+@traced("pdf.read")
+def read_pdf(filepath: str, workers: Optional[int] = None) -> Dict[str, str]:
+    """Read a PDF file and return its text content.
+
+    Large documents are split into workers * RANGES_PER_WORKER page ranges
+    and extracted on a process pool shared by all reads, which never runs
+    more than MAX_WORKERS processes. Pass workers=1 to force single-process
+    extraction.
+    """
     try:
         # Handle ~ in filepath
         filepath = os.path.expanduser(filepath)
@@ -27,14 +102,33 @@ def read_pdf(filepath: str) -> Dict[str, str]:
                 "error": "File is not a PDF"
             }
         
-        text = ""
         with open(path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        
+            num_pages = len(reader.pages)
+            workers = _resolve_workers(workers)
+
+            if workers == 1 or num_pages < PARALLEL_MIN_PAGES:
+                pages = [(page.extract_text() or "") + "\n" for page in reader.pages]
+                return {
+                    "text": PAGE_BREAK.join(pages),
+                    "status": "success"
+                }
+
+        # Each worker re-opens the file, so only the path crosses processes
+        ranges = _split_pages(num_pages, workers * RANGES_PER_WORKER)
+        pool = _shared_pool()
+        try:
+            futures = [
+                pool.submit(_extract_page_range, str(path), start, stop)
+                for start, stop in ranges
+            ]
+            pages = [page for future in futures for page in future.result()]
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+
         return {
-            "text": text,
+            "text": PAGE_BREAK.join(pages),
             "status": "success"
         }
         
@@ -45,8 +139,19 @@ def read_pdf(filepath: str) -> Dict[str, str]:
             "error": str(e)
         }
 
-def find_pdf(filename: str, search_dirs: Optional[list[str]] = None) -> str:
-    """Find a PDF file in common directories."""
+def _filename_index(search_dirs: List[str]) -> FilenameIndex:
+    key = tuple(search_dirs)
+    with _indexes_lock:
+        if key not in _filename_indexes:
+            _filename_indexes[key] = FilenameIndex(search_dirs=search_dirs)
+        return _filename_indexes[key]
+
+def find_pdf(filename: str, search_dirs: Optional[list[str]] = None, fuzzy: bool = True) -> str:
+    """Find a PDF file in common directories.
+
+    Exact names are probed first; with fuzzy set, an approximate name is
+    then resolved through the filename index if the match is confident.
+    """
     if not search_dirs:
         search_dirs = [
             "~/Downloads",
@@ -63,4 +168,7 @@ def find_pdf(filename: str, search_dirs: Optional[list[str]] = None) -> str:
         if os.path.exists(path):
             return path
     
+    if fuzzy:
+        return _filename_index(search_dirs).best_match(filename[:-len('.pdf')]) or ""
+
     return "" 
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Local directory of Slack channel names and IDs.
+"""
+import difflib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pkg.utils.files import write_json
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+LIST_ACTION = "SLACK_LIST_ALL_SLACK_TEAM_CHANNELS_WITH_VARIOUS_FILTERS"
+
+DEFAULT_TTL = 60 * 60
+PAGE_SIZE = 1000
+# Pages fetched per refresh, as a guard against a cursor that never ends
+MAX_PAGES = 50
+# Wait before retrying after a failed background refresh
+RETRY_DELAY = 60
+
+Executor = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+def normalize(name: str) -> str:
+    """Normalize a channel name for lookup: no leading #, lowercase, no spaces."""
+    return name.strip().lstrip("#").lower().replace(" ", "-")
+
+class ChannelDirectory:
+    """Map Slack channel names to IDs without a network call per lookup.
+
+    The directory is persisted under ~/.vox/slack so it is available
+    immediately on the next run. Lookups never block on the network; when the
+    data is older than ttl seconds a refresh is started on a background thread.
+    """
+
+    def __init__(self, executor: Executor, path: Optional[Path] = None, ttl: float = DEFAULT_TTL):
+        self.executor = executor
+        self.path = Path(path or state_dir("slack") / "channels.json")
+        self.ttl = ttl
+        self.channels: Dict[str, str] = {}
+        self.updated = 0.0
+        self._lock = threading.Lock()
+        self._refreshing: Optional[threading.Thread] = None
+        self._retry_at = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.channels = data.get("channels", {})
+            self.updated = data.get("updated", 0.0)
+        except (OSError, ValueError):
+            pass
+
+    def _save(self) -> None:
+        write_json(self.path, {"updated": self.updated, "channels": self.channels})
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.channels)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.updated > self.ttl
+
+    def _fetch(self) -> Dict[str, str]:
+        channels: Dict[str, str] = {}
+        cursor = None
+        for _ in range(MAX_PAGES):
+            params: Dict[str, Any] = {"limit": PAGE_SIZE, "exclude_archived": True}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.executor(LIST_ACTION, params)
+            if response.get("successfull") is False or response.get("successful") is False:
+                raise Exception(f"Listing Slack channels failed: {response.get('error')}")
+            data = response.get("data") or {}
+            # Some Composio versions nest the Slack payload one level deeper
+            data = data.get("response_data", data)
+            for channel in data.get("channels", []):
+                if channel.get("name") and channel.get("id"):
+                    channels[normalize(channel["name"])] = channel["id"]
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
+        return channels
+
+    def refresh(self) -> None:
+        """Fetch the channel list from Slack and persist it."""
+        channels = self._fetch()
+        with self._lock:
+            self.channels = channels
+            self.updated = time.time()
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Failed to save Slack channel directory: {str(e)}")
+        logger.debug(f"Loaded {len(channels)} Slack channels")
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return
+
+            def run():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self._retry_at = time.time() + min(self.ttl, RETRY_DELAY)
+                    logger.warning(f"Slack channel directory refresh failed: {str(e)}")
+
+            self._refreshing = threading.Thread(target=run, name="vox-slack-channels", daemon=True)
+            self._refreshing.start()
+
+    def _maybe_refresh(self) -> None:
+        if self.is_stale() and time.time() >= self._retry_at:
+            self.refresh_in_background()
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Return the channel ID for a name, or None if it is not in the directory."""
+        self._maybe_refresh()
+        return self.channels.get(normalize(name))
+
+    def suggest(self, name: str, limit: int = 3, cutoff: float = 0.6) -> List[str]:
+        """Return known channel names close to name, best first."""
+        self._maybe_refresh()
+        return difflib.get_close_matches(normalize(name), list(self.channels), n=limit, cutoff=cutoff)
+
+    def correct(self, name: str, cutoff: float = 0.8) -> Optional[str]:
+        """Return the known channel name matching name, allowing for a small typo."""
+        if normalize(name) in self.channels:
+            return normalize(name)
+        matches = self.suggest(name, limit=2, cutoff=cutoff)
+        if len(matches) == 1:
+            return matches[0]
+        return None
@@ -1,15 +1,30 @@
 from composio_openai import ComposioToolSet, App
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, List, Tuple
+import asyncio
 import logging
-import json
+import time
+from pkg.tools.open.slack_queue import SlackSendQueue, DeliveryMetrics, TokenBucket, SEND_ACTION
+from pkg.tools.open.slack_channels import ChannelDirectory
+from pkg.utils.logging import LazyJSON
+from pkg.utils.tracing import span
 
 logger = logging.getLogger("vox")
 
+# Seconds between checks that Composio still reports the Slack connection as active
+CONNECTION_CHECK_INTERVAL = 300.0
+
 class SlackMessagerTool:
     def __init__(self, api_key: Optional[str] = None):
         logger.debug("Initializing SlackMessagerTool")
         self.toolset = ComposioToolSet(entity_id="default")
+        # Shared across send_many calls so rate limits and counters persist
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.metrics = DeliveryMetrics()
         self._setup_connection()
+        self.channels = ChannelDirectory(self._execute)
+        # Load or refresh the name -> ID index without delaying startup
+        if self.channels.is_stale():
+            self.channels.refresh_in_background()
         logger.debug("SlackMessagerTool initialization complete")
 
     def _setup_connection(self):
@@ -22,6 +37,8 @@ class SlackMessagerTool:
             )
             # Store connection details
             self.connected_account_id = connection_request.connectedAccountId
+            self._connection_active = True
+            self._connection_checked_at = time.monotonic()
             logger.debug(f"Connection established. Account ID: {self.connected_account_id}")
             
             # Get available tools for debugging
@@ -32,11 +49,41 @@ class SlackMessagerTool:
             logger.error(f"Connection setup failed: {str(e)}", exc_info=True)
             raise Exception(f"Failed to setup Slack connection: {str(e)}")
 
+    def connection_active(self) -> bool:
+        """Whether the Slack connection is still usable, e.g. its token hasn't expired or been revoked.
+
+        Composio is asked at most every CONNECTION_CHECK_INTERVAL seconds,
+        or on the next call after a send failed.
+        """
+        now = time.monotonic()
+        if now - self._connection_checked_at < CONNECTION_CHECK_INTERVAL:
+            return self._connection_active
+        try:
+            account = self.toolset.get_connected_account(id=self.connected_account_id)
+            status = str(getattr(account, "status", "")).upper()
+            self._connection_active = status == "ACTIVE"
+            if not self._connection_active:
+                logger.warning(f"Slack connection {self.connected_account_id} is {status or 'unknown'}")
+        except Exception as e:
+            logger.warning(f"Failed to check Slack connection: {str(e)}")
+            self._connection_active = False
+        self._connection_checked_at = now
+        return self._connection_active
+
     def get_channels(self) -> Dict:
         """
-        Get all channels from Slack
+        Get all channels from Slack as a name -> ID mapping
+
+        Served from the local channel directory, which is refreshed in the
+        background once it is older than its TTL.
         """
-        return self.toolset.get_channels(apps=[App.SLACK])
+        if not self.channels.loaded:
+            self.channels.refresh()
+        return dict(self.channels.channels)
+
+    def _channel_target(self, channel: str) -> str:
+        """Return the channel ID if known, else the normalized #name."""
+        return self.channels.resolve(channel) or f"#{channel.lstrip('#')}"
 
     def send_message(self, channel: str, text: str) -> Dict:
         """
@@ -50,11 +97,11 @@ class SlackMessagerTool:
             dict: Response from Slack API
         """
         logger.debug(f"Attempting to send message to channel: {channel}")
-        logger.debug(f"Message text: {text}")
+        logger.debug("Message text: %s", LazyJSON(text))
         
-        # Normalize channel name (ensure it has #)
-        channel = f"#{channel.lstrip('#')}"
-        logger.debug(f"Normalized channel name: {channel}")
+        # Use the channel ID when known so Slack doesn't resolve the name
+        channel = self._channel_target(channel)
+        logger.debug(f"Resolved channel: {channel}")
         
         try:
             logger.debug("Preparing to execute Slack action")
@@ -62,17 +109,51 @@ class SlackMessagerTool:
                 'channel': channel,
                 'text': text
             }
-            logger.debug(f"Action parameters: {json.dumps(params, indent=2)}")
+            logger.debug("Action parameters: %s", LazyJSON(params))
             
             # Using the correct action name from the tools list
-            response = self.toolset.execute_action(
-                action="SLACK_SENDS_A_MESSAGE_TO_A_SLACK_CHANNEL",
-                params=params
-            )
-            logger.debug(f"Slack API response: {json.dumps(response, indent=2)}")
+            with span("slack.send"):
+                response = self.toolset.execute_action(
+                    action=SEND_ACTION,
+                    params=params
+                )
+            logger.debug("Slack API response: %s", LazyJSON(response))
             return response
             
         except Exception as e:
             logger.error(f"Failed to send message: {str(e)}", exc_info=True)
-            logger.error(f"Parameters used: {json.dumps(params, indent=2)}")
-            raise Exception(f"Failed to send Slack message: {str(e)}")
\ No newline at end of file
+            logger.error("Parameters used: %s", LazyJSON(params))
+            # The connection may have gone stale; check it before the next request
+            self._connection_checked_at = float("-inf")
+            raise Exception(f"Failed to send Slack message: {str(e)}")
+
+    def _execute(self, action: str, params: Dict) -> Dict:
+        return self.toolset.execute_action(action=action, params=params)
+
+    async def asend_many(self, messages: Iterable[Tuple[str, str]], **queue_options) -> List[Dict]:
+        """
+        Send many messages through a rate-limited, coalescing send queue
+
+        Args:
+            messages: (channel, text) pairs; channels with or without #
+            **queue_options: Overrides for SlackSendQueue (channel_rate, burst,
+                max_concurrency, max_retries, coalesce)
+
+        Returns:
+            list: One {"channel", "status", "response" or "error"} dict per message
+        """
+        queue = SlackSendQueue(
+            self._execute,
+            buckets=self.buckets,
+            metrics=self.metrics,
+            **queue_options
+        )
+        normalized = [(self._channel_target(channel), text) for channel, text in messages]
+        logger.debug(f"Queueing {len(normalized)} Slack messages")
+        results = await queue.send_many(normalized)
+        logger.debug(f"Slack delivery metrics: {self.metrics.as_dict()}")
+        return results
+
+    def send_many(self, messages: Iterable[Tuple[str, str]], **queue_options) -> List[Dict]:
+        """Blocking variant of asend_many."""
+        return asyncio.run(self.asend_many(messages, **queue_options))
@@ -0,0 +1,266 @@
+"""
+Rate-limit-aware queue for sending many Slack messages.
+"""
+import asyncio
+import logging
+import re
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pkg.utils.tracing import span
+
+logger = logging.getLogger("vox")
+
+SEND_ACTION = "SLACK_SENDS_A_MESSAGE_TO_A_SLACK_CHANNEL"
+
+# Slack allows roughly one message per second per channel
+DEFAULT_CHANNEL_RATE = 1.0
+DEFAULT_BURST = 3
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+# Delay used when Slack reports a rate limit without a Retry-After value
+DEFAULT_RETRY_AFTER = 1.0
+# Coalesced messages are split before reaching Slack's message length limit
+MAX_MESSAGE_CHARS = 4000
+COALESCE_SEPARATOR = "\n\n"
+
+Executor = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+class TokenBucket:
+    """Allow `rate` events per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> bool:
+        """Take a token, waiting for one if needed. Return whether it had to wait."""
+        waited = False
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                waited = True
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            waited = True
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket for a server-imposed cooldown and drop saved-up tokens."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class DeliveryMetrics:
+    """Counters and latencies for messages sent through a SlackSendQueue."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.latencies: List[float] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        summary = {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+        if latencies:
+            summary["latency_p50_ms"] = round(statistics.median(latencies) * 1000, 1)
+            summary["latency_max_ms"] = round(latencies[-1] * 1000, 1)
+        return summary
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+def rate_limit_delay(outcome: Any) -> Optional[float]:
+    """Return how long to wait if a response or exception is a rate limit, else None."""
+    if isinstance(outcome, BaseException):
+        response = getattr(outcome, "response", None)
+        status = getattr(response, "status_code", None) or getattr(outcome, "status_code", None)
+        if status == 429:
+            headers = getattr(response, "headers", None) or {}
+            return _parse_seconds(headers.get("Retry-After")) or DEFAULT_RETRY_AFTER
+        if re.search(r"\b429\b|rate.?limit", str(outcome), re.IGNORECASE):
+            return DEFAULT_RETRY_AFTER
+        return None
+
+    if not isinstance(outcome, dict):
+        return None
+    for payload in (outcome, outcome.get("data") or {}):
+        if not isinstance(payload, dict):
+            continue
+        error = str(payload.get("error") or "")
+        if payload.get("status_code") == 429 or re.search(r"rate.?limit", error, re.IGNORECASE):
+            headers = payload.get("headers") or {}
+            for value in (payload.get("retry_after"), headers.get("Retry-After")):
+                delay = _parse_seconds(value)
+                if delay is not None:
+                    return delay
+            return DEFAULT_RETRY_AFTER
+    return None
+
+def _raise_for_failure(response: Any) -> None:
+    """Raise if a Composio response reports a failed action."""
+    if not isinstance(response, dict):
+        return
+    # Composio spells the flag "successfull"; accept either spelling
+    for key in ("successfull", "successful"):
+        if response.get(key) is False:
+            raise Exception(f"Slack action failed: {response.get('error') or response.get('data')}")
+
+class SlackSendQueue:
+    """Send Slack messages concurrently while respecting per-channel rate limits.
+
+    Each channel has its own token bucket and a worker that drains its pending
+    messages. Messages that pile up for a channel while it is throttled are
+    coalesced into a single post; while the channel has tokens to spare,
+    each message is posted on its own. Rate-limit responses pause the channel for
+    the server's Retry-After and are retried.
+
+    executor is called as executor(action, params), matching
+    ComposioToolSet.execute_action, so a local fake can stand in for Composio.
+    Pass shared buckets and metrics to keep limits and counters across queues.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        channel_rate: float = DEFAULT_CHANNEL_RATE,
+        burst: int = DEFAULT_BURST,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+        action: str = SEND_ACTION,
+        buckets: Optional[Dict[str, TokenBucket]] = None,
+        metrics: Optional[DeliveryMetrics] = None
+    ):
+        self.executor = executor
+        self.channel_rate = channel_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self.action = action
+        self.buckets = buckets if buckets is not None else {}
+        self.metrics = metrics or DeliveryMetrics()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def _bucket(self, channel: str) -> TokenBucket:
+        if channel not in self.buckets:
+            self.buckets[channel] = TokenBucket(self.channel_rate, self.burst)
+        return self.buckets[channel]
+
+    def submit(self, channel: str, text: str) -> asyncio.Future:
+        """Queue a message and return a future resolving to the Slack response."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(channel, []).append((text, future))
+        self.metrics.submitted += 1
+        if channel not in self._workers:
+            self._workers[channel] = asyncio.create_task(self._drain(channel))
+        return future
+
+    def _take_batch(self, channel: str, coalesce: bool) -> List[Tuple[str, asyncio.Future]]:
+        pending = self._pending[channel]
+        if not coalesce:
+            return [pending.pop(0)]
+        batch = [pending.pop(0)]
+        length = len(batch[0][0])
+        while pending and length + len(COALESCE_SEPARATOR) + len(pending[0][0]) <= MAX_MESSAGE_CHARS:
+            length += len(COALESCE_SEPARATOR) + len(pending[0][0])
+            batch.append(pending.pop(0))
+        return batch
+
+    async def _drain(self, channel: str) -> None:
+        try:
+            while self._pending.get(channel):
+                throttled = await self._bucket(channel).acquire()
+                # Merge messages only when the rate limit held them back
+                batch = self._take_batch(channel, self.coalesce and throttled)
+                if len(batch) > 1:
+                    self.metrics.coalesced += len(batch) - 1
+                text = COALESCE_SEPARATOR.join(text for text, _ in batch)
+                started = time.monotonic()
+                try:
+                    async with self._semaphore:
+                        response = await self._deliver(channel, text)
+                except Exception as e:
+                    self.metrics.failed += len(batch)
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                self.metrics.sent += len(batch)
+                self.metrics.latencies.append(time.monotonic() - started)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(response)
+        finally:
+            self._workers.pop(channel, None)
+            self._pending.pop(channel, None)
+
+    async def _deliver(self, channel: str, text: str) -> Dict[str, Any]:
+        params = {"channel": channel, "text": text}
+        for attempt in range(self.max_retries + 1):
+            try:
+                with span("slack.send", attempt=attempt):
+                    response = await asyncio.to_thread(self.executor, self.action, params)
+                delay = rate_limit_delay(response)
+                if delay is None:
+                    _raise_for_failure(response)
+                    return response
+                error: Exception = RateLimited(delay)
+            except Exception as e:
+                delay = rate_limit_delay(e)
+                if delay is None:
+                    raise
+                error = e
+
+            self.metrics.rate_limited += 1
+            if attempt == self.max_retries:
+                raise error
+            self.metrics.retries += 1
+            logger.debug(f"Slack rate limited on {channel}, retrying in {delay}s")
+            self._bucket(channel).pause(delay)
+            await self._bucket(channel).acquire()
+
+    async def send_many(self, messages: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Send (channel, text) pairs and return one result dict per message, in order."""
+        messages = list(messages)
+        futures = [self.submit(channel, text) for channel, text in messages]
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        results = []
+        for (channel, _), outcome in zip(messages, outcomes):
+            if isinstance(outcome, BaseException):
+                results.append({"channel": channel, "status": "error", "error": str(outcome)})
+            else:
+                results.append({"channel": channel, "status": "success", "response": outcome})
+        return results
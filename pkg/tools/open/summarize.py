@@ -1,39 +1,349 @@
 """
 Text summarization tool using GPT-4.
 """
-import openai
-from typing import Dict
+import asyncio
+import logging
+import re
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from pkg.tools.open.pdf_reader import PAGE_BREAK
+from pkg.tools.open.summary_cache import SummaryCache
+from pkg.utils import openai_client
+from pkg.utils.tokens import count_tokens
+from pkg.utils.tracing import record_stream, record_usage, span, traced
+
+logger = logging.getLogger("vox")
+
+SUMMARY_MODEL = "gpt-4-turbo-preview"
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that creates clear, concise summaries. "
+    "Focus on the key points and main ideas."
+)
+
+# Documents above this many tokens are summarized with map-reduce
+LONG_TEXT_TOKENS = 8000
+
+# Token budget for each chunk sent in the map step, and for the combined
+# summaries sent in each reduce step.
+CHUNK_TOKENS = 4000
+
+# Maximum number of summarization requests in flight at once
+DEFAULT_CONCURRENCY = 4
+
+# Length of the intermediate summary produced for each chunk
+CHUNK_SUMMARY_WORDS = 150
+
+# Smallest reduce group: two intermediate summaries at their token cap plus a
+# separator, so every reduce level at least halves the number of summaries
+MIN_REDUCE_TOKENS = 2 * (CHUNK_SUMMARY_WORDS * 2 + 2)
+
+# Bumped whenever the chunk or reduce prompt changes, to invalidate cached summaries
+CHUNK_PROMPT_VERSION = 1
+REDUCE_PROMPT_VERSION = 1
+
+# A paragraph ends a chunk early when its checksum is divisible by this, once
+# the chunk is at least half full. See split_text.
+BOUNDARY_DIVISOR = 4
+
+def _messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+async def _acomplete(prompt: str, max_tokens: int = 500) -> str:
+    """Run one summarization prompt and return the response text."""
+    with span("llm.summarize", model=SUMMARY_MODEL) as stage:
+        response = await openai_client.achat_completion(
+            model=SUMMARY_MODEL,
+            messages=_messages(prompt),
+            temperature=0.7,
+            max_tokens=max_tokens
+        )
+        record_usage(stage, response)
+    return response.choices[0].message.content.strip()
+
+async def _astream_complete(prompt: str, max_tokens: int = 500) -> AsyncIterator[str]:
+    """Run one summarization prompt, yielding the response text as it is generated."""
+    stream = openai_client.stream_chat_completion(
+        model=SUMMARY_MODEL,
+        messages=_messages(prompt),
+        temperature=0.7,
+        max_tokens=max_tokens
+    )
+    with span("llm.summarize", model=SUMMARY_MODEL, stream=True) as stage:
+        async for text in stream:
+            yield text
+        record_stream(stage, stream)
+    logger.info(f"Summary stream: {stream.describe()}")
 
 def summarize_text(text: str, max_words: int = 300) -> Dict[str, str]:
     """Summarize text using GPT-4."""
+    return openai_client.run(asummarize_text(text, max_words))
+
+@traced("summarize")
+async def asummarize_text(text: str, max_words: int = 300) -> Dict[str, str]:
+    """Summarize text using GPT-4 without blocking the event loop.
+
+    Text over LONG_TEXT_TOKENS is handed to map-reduce rather than sent whole.
+    """
+    # Tokenizing a whole document takes long enough to stall other requests on the loop
+    if await asyncio.to_thread(count_tokens, text) > LONG_TEXT_TOKENS:
+        logger.info("Text exceeds a single prompt, summarizing with map-reduce")
+        return await asummarize_long_text(text, max_words)
+    return await _summarize_whole(text, max_words)
+
+def _whole_prompt(text: str, max_words: int) -> str:
+    return f"Please summarize this text in {max_words} words or less:\n\n{text}"
+
+async def _summarize_whole(text: str, max_words: int) -> Dict[str, str]:
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that creates clear, concise summaries. "
-                        "Focus on the key points and main ideas."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"Please summarize this text in {max_words} words or less:\n\n{text}"
-                }
-            ],
-            temperature=0.7,
-            max_tokens=500
+        summary = await _acomplete(_whole_prompt(text, max_words))
+
+        return {
+            "summary": summary,
+            "status": "success"
+        }
+
+    except Exception as e:
+        return {
+            "summary": "",
+            "status": "error",
+            "error": str(e)
+        }
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """Split a single paragraph that exceeds the budget on lines, then characters."""
+    pieces = []
+    for line in unit.split("\n"):
+        if count_tokens(line) <= max_tokens:
+            pieces.append(line)
+            continue
+        # Character fallback for text without any line breaks
+        step = max(1, len(line) * max_tokens // count_tokens(line))
+        pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+    return _pack(pieces, max_tokens, "\n")
+
+def _is_boundary(unit: str) -> bool:
+    return zlib.crc32(unit.encode("utf-8")) % BOUNDARY_DIVISOR == 0
+
+def _pack(units: List[str], max_tokens: int, separator: str, content_defined: bool = False) -> List[str]:
+    """Greedily join consecutive units into chunks of at most max_tokens."""
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    separator_tokens = count_tokens(separator)
+    for unit in units:
+        unit_tokens = count_tokens(unit)
+        if current and current_tokens + separator_tokens + unit_tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        if current:
+            current_tokens += separator_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+        if content_defined and current_tokens >= max_tokens // 2 and _is_boundary(unit):
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+def split_text(text: str, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """Split text into chunks of at most max_tokens on page and paragraph boundaries.
+
+    Chunks are also cut after paragraphs picked by their checksum, so an edit
+    early in a document only shifts chunk boundaries until the next such
+    paragraph and later chunks stay byte-identical across versions.
+    """
+    units = []
+    for page in text.split(PAGE_BREAK):
+        for paragraph in re.split(r"\n\s*\n", page):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if count_tokens(paragraph) > max_tokens:
+                units.extend(_split_oversized(paragraph, max_tokens))
+            else:
+                units.append(paragraph)
+    return _pack(units, max_tokens, "\n\n", content_defined=True)
+
+async def _summarize_chunk(chunk: str, limit: asyncio.Semaphore) -> str:
+    # The prompt deliberately omits the chunk's position so that cached
+    # summaries stay valid when sections are inserted or removed
+    async with limit:
+        return await _acomplete(
+            "This is one section of a longer document. "
+            f"Summarize it in {CHUNK_SUMMARY_WORDS} words or less, keeping names, figures and dates:\n\n{chunk}",
+            max_tokens=CHUNK_SUMMARY_WORDS * 2
+        )
+
+async def _cached_summaries(
+    texts: List[str],
+    summarize: Callable[[str], Awaitable[str]],
+    cache: Optional[SummaryCache],
+    kind: str,
+    **params
+) -> List[str]:
+    """Summarize each text with summarize, reusing cached summaries where available."""
+    if cache is None:
+        return list(await asyncio.gather(*(summarize(text) for text in texts)))
+
+    def lookup():
+        keys = [SummaryCache.key(text, model=SUMMARY_MODEL, words=CHUNK_SUMMARY_WORDS, **params) for text in texts]
+        return keys, [cache.get(key) for key in keys]
+
+    def store(entries):
+        for key, summary in entries:
+            cache.set(key, summary)
+
+    # The cache is on disk, so hashing and file access stay off the event loop
+    keys, summaries = await asyncio.to_thread(lookup)
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    logger.info(f"{kind} summary cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+
+    fresh = await asyncio.gather(*(summarize(texts[i]) for i in missing))
+    for i, summary in zip(missing, fresh):
+        summaries[i] = summary
+    await asyncio.to_thread(store, [(keys[i], summaries[i]) for i in missing])
+    return summaries
+
+async def _map_chunks(chunks: List[str], limit: asyncio.Semaphore, cache: Optional[SummaryCache]) -> List[str]:
+    """Summarize each chunk, reusing cached summaries where available."""
+    return await _cached_summaries(
+        chunks, lambda chunk: _summarize_chunk(chunk, limit), cache, "Chunk",
+        prompt_version=CHUNK_PROMPT_VERSION
+    )
+
+async def _reduce_group(group: str, limit: asyncio.Semaphore) -> str:
+    async with limit:
+        return await _acomplete(
+            "These are summaries of consecutive sections of one document. "
+            f"Combine them into one summary of {CHUNK_SUMMARY_WORDS} words or less:\n\n{group}",
+            max_tokens=CHUNK_SUMMARY_WORDS * 2
         )
-        
+
+def _final_prompt(group: str, max_words: int) -> str:
+    return (
+        "These are summaries of consecutive sections of one document. "
+        f"Combine them into a single summary of {max_words} words or less:\n\n{group}"
+    )
+
+async def _reduce_to_group(
+    summaries: List[str],
+    limit: asyncio.Semaphore,
+    max_tokens: int,
+    cache: Optional[SummaryCache] = None
+) -> str:
+    """Combine section summaries level by level until they fit in one final prompt.
+
+    With a cache, each group is keyed by the summaries it combines, so groups
+    whose chunks did not change are not reduced again.
+    """
+    max_tokens = max(max_tokens, MIN_REDUCE_TOKENS)
+    while True:
+        groups = _pack(summaries, max_tokens, "\n\n")
+        if len(groups) == 1:
+            return groups[0]
+        if len(groups) >= len(summaries):
+            # Summaries longer than asked for; pair them up so the loop still ends
+            groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        logger.debug(f"Reducing {len(summaries)} summaries in {len(groups)} groups")
+        summaries = await _cached_summaries(
+            groups, lambda group: _reduce_group(group, limit), cache, "Reduce",
+            prompt_version=REDUCE_PROMPT_VERSION, step="reduce"
+        )
+
+async def _reduce(
+    summaries: List[str],
+    limit: asyncio.Semaphore,
+    max_words: int,
+    max_tokens: int,
+    cache: Optional[SummaryCache] = None
+) -> str:
+    """Combine section summaries level by level until one summary remains."""
+    group = await _reduce_to_group(summaries, limit, max_tokens, cache)
+    return await _acomplete(_final_prompt(group, max_words))
+
+def summarize_long_text(
+    text: str,
+    max_words: int = 300,
+    chunk_tokens: int = CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[SummaryCache] = None
+) -> Dict[str, str]:
+    """Summarize text larger than one context window with concurrent map-reduce."""
+    return openai_client.run(asummarize_long_text(text, max_words, chunk_tokens, concurrency, cache))
+
+@traced("summarize.long")
+async def asummarize_long_text(
+    text: str,
+    max_words: int = 300,
+    chunk_tokens: int = CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[SummaryCache] = None
+) -> Dict[str, str]:
+    """Summarize text larger than one context window with concurrent map-reduce.
+
+    The text is split into chunks of at most chunk_tokens, each chunk is
+    summarized with up to `concurrency` requests in flight, and the chunk
+    summaries are then merged hierarchically into the final summary. With a
+    cache, only chunks and reduce groups not summarized before are sent to
+    the model, so an unchanged document costs just the final reduce.
+    """
+    try:
+        chunks = await asyncio.to_thread(split_text, text, chunk_tokens)
+        if len(chunks) <= 1:
+            return await _summarize_whole(text, max_words)
+
+        logger.info(f"Summarizing {len(chunks)} chunks with concurrency {concurrency}")
+        limit = asyncio.Semaphore(max(1, concurrency))
+        summaries = await _map_chunks(chunks, limit, cache)
+        summary = await _reduce(summaries, limit, max_words, chunk_tokens, cache)
+
         return {
-            "summary": response.choices[0].message.content.strip(),
+            "summary": summary,
             "status": "success"
         }
-        
+
     except Exception as e:
         return {
             "summary": "",
             "status": "error",
             "error": str(e)
-        } 
\ No newline at end of file
+        }
+
+def _stream_chunks(text: str, long_text_tokens: int, chunk_tokens: int) -> List[str]:
+    return split_text(text, chunk_tokens) if count_tokens(text) > long_text_tokens else [text]
+
+async def astream_summary(
+    text: str,
+    max_words: int = 300,
+    long_text_tokens: int = LONG_TEXT_TOKENS,
+    chunk_tokens: int = CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[SummaryCache] = None
+) -> AsyncIterator[str]:
+    """Summarize text, yielding the summary as it is generated.
+
+    Long text is mapped and reduced as in asummarize_long_text, and only the
+    final combining step is streamed. Errors are raised rather than returned.
+    """
+    with span("summarize", stream=True):
+        chunks = await asyncio.to_thread(_stream_chunks, text, long_text_tokens, chunk_tokens)
+        if len(chunks) <= 1:
+            prompt = _whole_prompt(text, max_words)
+        else:
+            logger.info(f"Summarizing {len(chunks)} chunks with concurrency {concurrency}, streaming the final summary")
+            limit = asyncio.Semaphore(max(1, concurrency))
+            summaries = await _map_chunks(chunks, limit, cache)
+            prompt = _final_prompt(await _reduce_to_group(summaries, limit, chunk_tokens, cache), max_words)
+        async for piece in _astream_complete(prompt):
+            yield piece
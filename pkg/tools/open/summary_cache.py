@@ -0,0 +1,41 @@
+"""
+Persistent memoization of chunk and reduce-group summaries.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+from pkg.utils.cache import DiskCache
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+class SummaryCache:
+    """Cache summaries keyed by the summarized text, model and prompt parameters.
+
+    Re-summarizing an edited document then only sends the chunks whose text
+    changed, and the reduce groups that combine them, to the model.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = DiskCache(directory or state_dir("chunk_summaries"), max_bytes)
+
+    @staticmethod
+    def key(chunk: str, **params) -> str:
+        """Build the cache key for text summarized with the given parameters."""
+        digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+        return f"{digest}:{json.dumps(params, sort_keys=True)}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.store.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, summary: str) -> None:
+        try:
+            self.store.set(key, summary.encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Failed to cache summary: {str(e)}")
@@ -0,0 +1,104 @@
+"""
+Size-capped on-disk key/value cache with LRU eviction.
+"""
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pkg.utils.files import atomic_write
+
+logger = logging.getLogger("vox")
+
+class DiskCache:
+    """Store byte blobs as files in a directory, evicting least recently used.
+
+    Each entry is a single file named after the hash of its key. A hit touches
+    the file's mtime, so eviction can order entries by mtime without keeping a
+    separate index that would need rewriting on every read.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store value under key, evicting old entries if over the size cap."""
+        if len(value) > self.max_bytes:
+            logger.debug(f"Not caching {len(value)} byte entry, larger than cache cap {self.max_bytes}")
+            return
+
+        path = self._path(key)
+        # An overwritten entry only grows the cache by the difference
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        with atomic_write(path, "wb") as f:
+            f.write(value)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(value) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under key, if any."""
+        try:
+            self._path(key).unlink()
+            self._size = None
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                yield entry
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the size cap."""
+        entries = sorted(
+            ((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in self._entries()),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._size = total
+        logger.debug(f"Evicted {removed} entries from cache at {self.directory}")
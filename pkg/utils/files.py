@@ -0,0 +1,40 @@
+"""
+Atomic writes for files that other processes may be reading.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Union
+
+@contextmanager
+def atomic_path(path: Union[str, Path], suffix: str = ".tmp") -> Iterator[str]:
+    """Yield a temporary path next to path, moved over it if the block succeeds.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. The temporary file is removed if the block raises.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+@contextmanager
+def atomic_write(path: Union[str, Path], mode: str = "w") -> Iterator[IO]:
+    """Open a file whose contents replace path once the block succeeds."""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
+
+def write_json(path: Union[str, Path], value: Any) -> None:
+    """Atomically replace path with value serialized as JSON."""
+    with atomic_write(path) as f:
+        json.dump(value, f)
@@ -1,35 +1,133 @@
 """
 Logging configuration for the application.
+
+Records are handed to a queue and written to a rotating file by a background
+listener thread, so logging never blocks a request on disk I/O. Large
+payloads should be logged through LazyJSON, which is only serialized (and
+truncated) if the record is actually emitted.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+# Longest string kept inside a logged payload, and longest payload overall
+MAX_FIELD_CHARS = 500
+MAX_PAYLOAD_CHARS = 4000
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+def truncate(text: str, limit: int = MAX_PAYLOAD_CHARS) -> str:
+    """Cut text to limit characters, noting how much was dropped."""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+def _shrink(value: Any, limit: int) -> Any:
+    """Truncate long strings inside nested dicts and lists before serializing."""
+    if isinstance(value, str):
+        return truncate(value, limit)
+    if isinstance(value, dict):
+        return {k: _shrink(v, limit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shrink(v, limit) for v in value]
+    return value
+
+class LazyJSON:
+    """Serialize an object for logging only when the message is formatted.
+
+    Usage: logger.debug("Reader result: %s", LazyJSON(result))
+    """
+
+    def __init__(self, value: Any, field_limit: int = MAX_FIELD_CHARS, limit: int = MAX_PAYLOAD_CHARS, indent: Optional[int] = 2):
+        self.value = value
+        self.field_limit = field_limit
+        self.limit = limit
+        self.indent = indent
+
+    def __str__(self) -> str:
+        try:
+            text = json.dumps(_shrink(self.value, self.field_limit), indent=self.indent, default=str)
+        except (TypeError, ValueError, RuntimeError):
+            # RuntimeError: a container changed size while it was being serialized
+            text = repr(self.value)
+        return truncate(text, self.limit)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records with their message rendered, leaving formatting and I/O to the listener thread.
+
+    Records below the logger's level never reach the handler, so LazyJSON
+    payloads are still only serialized for emitted records.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments may be live objects other threads keep changing, so
+        # render them now as they were at the call
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference live frames, so render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logger(
+    log_file: Optional[str] = "run.log",
+    level: Optional[str] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    when: Optional[str] = None
+) -> logging.Logger:
+    """Configure and return the application logger.
+
+    level defaults to the VOX_LOG_LEVEL environment variable, else DEBUG.
+    Files rotate at max_bytes, or on a schedule if `when` is given (e.g.
+    "midnight"), keeping backup_count old files. Calling this again returns
+    the already configured logger instead of adding more handlers.
+    """
+    # Create logger
+    logger = logging.getLogger("vox")
+    if getattr(logger, "_vox_listener", None) is not None:
+        return logger
 
-def setup_logger(log_file: Optional[str] = "run.log") -> logging.Logger:
-    """Configure and return the application logger."""
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
-    
-    # Create logger
-    logger = logging.getLogger("vox")
-    logger.setLevel(logging.DEBUG)
-    
+
+    logger.setLevel((level or os.getenv("VOX_LOG_LEVEL", "DEBUG")).upper())
+
     # Create formatter for file logging
     file_formatter = logging.Formatter(
         fmt='%(asctime)s | %(levelname)8s | %(filename)s:%(lineno)d | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # File handler
-    file_handler = logging.FileHandler(log_dir / log_file)
-    file_handler.setLevel(logging.DEBUG)
+
+    # Rotating file handler, driven by the listener thread
+    if when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_dir / log_file, when=when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_dir / log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
     file_handler.setFormatter(file_formatter)
-    
-    # Add only file handler (no console handler)
-    logger.addHandler(file_handler)
-    
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Add only the queue handler (no console handler)
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    logger._vox_listener = listener
+
     # Prevent logging from propagating to root logger
     logger.propagate = False
-    
-    return logger 
\ No newline at end of file
+
+    return logger
@@ -0,0 +1,264 @@
+"""
+Shared, connection-pooled OpenAI client.
+
+All model calls go through one AsyncOpenAI client whose HTTP connection pool
+lives on a dedicated event loop thread. Async callers on any loop await work
+scheduled onto that loop, and sync callers block on it, so both share the same
+pooled connections without one thread per call.
+
+Calls are retried, hedged and circuit-broken by pkg.utils.resilience under
+the default policy, or one passed with policy=.
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+import openai
+
+from pkg.utils.resilience import RetryPolicy, breaker, call
+
+logger = logging.getLogger("vox")
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("VOX_OPENAI_MAX_CONNECTIONS", "20"))
+DEFAULT_TIMEOUT = float(os.getenv("VOX_OPENAI_TIMEOUT", "60"))
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_ATTEMPTS = int(os.getenv("VOX_OPENAI_ATTEMPTS", "4"))
+DEFAULT_DEADLINE = float(os.getenv("VOX_OPENAI_DEADLINE", "120"))
+# Percentile of recent latency after which to send a duplicate request, unset to never hedge
+DEFAULT_HEDGE_PERCENTILE = float(os.getenv("VOX_OPENAI_HEDGE_PERCENTILE")) if os.getenv("VOX_OPENAI_HEDGE_PERCENTILE") else None
+
+_settings: Dict[str, Any] = {
+    "api_key": None,
+    "base_url": None,
+    "max_connections": DEFAULT_MAX_CONNECTIONS,
+    "timeout": DEFAULT_TIMEOUT,
+    "connect_timeout": DEFAULT_CONNECT_TIMEOUT,
+}
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_client: Optional[openai.AsyncOpenAI] = None
+_policy = RetryPolicy(attempts=DEFAULT_ATTEMPTS, deadline=DEFAULT_DEADLINE, hedge_percentile=DEFAULT_HEDGE_PERCENTILE)
+
+def configure(**settings) -> None:
+    """Update client settings (api_key, base_url, max_connections, timeout, connect_timeout).
+
+    The shared client is rebuilt on next use if any setting changed.
+    """
+    global _client
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown OpenAI client settings: {sorted(unknown)}")
+
+    with _lock:
+        changed = {k: v for k, v in settings.items() if _settings[k] != v}
+        if not changed:
+            return
+        _settings.update(changed)
+        old_client, _client = _client, None
+
+    logger.debug(f"OpenAI client reconfigured: {sorted(changed)}")
+    if old_client is not None and _loop is not None:
+        asyncio.run_coroutine_threadsafe(old_client.close(), _loop)
+
+def set_default_policy(policy: RetryPolicy) -> None:
+    """Set the retry policy used by calls that don't pass their own."""
+    global _policy
+    _policy = policy
+
+def default_policy() -> RetryPolicy:
+    return _policy
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="vox-openai-client", daemon=True)
+            _thread.start()
+        return _loop
+
+def get_client() -> openai.AsyncOpenAI:
+    """Return the shared async client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=_settings["max_connections"],
+                    max_keepalive_connections=_settings["max_connections"]
+                ),
+                timeout=httpx.Timeout(_settings["timeout"], connect=_settings["connect_timeout"])
+            )
+            _client = openai.AsyncOpenAI(
+                api_key=_settings["api_key"] or openai.api_key or os.getenv("OPENAI_API_KEY"),
+                base_url=_settings["base_url"] or os.getenv("OPENAI_BASE_URL"),
+                http_client=http_client,
+                # Retries are done by pkg.utils.resilience, with deadlines and a circuit breaker
+                max_retries=0
+            )
+            logger.debug(f"Created OpenAI client with pool size {_settings['max_connections']}")
+        return _client
+
+def run(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the client loop and block until it completes."""
+    loop = _get_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run() cannot be called from the OpenAI client loop")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+async def arun(coro: Awaitable[T]) -> T:
+    """Await a coroutine on the client loop from any event loop."""
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+async def _guarded(endpoint: str, create, kwargs: Dict[str, Any], policy: Optional[RetryPolicy]):
+    # Breakers and latency history are per endpoint and model
+    key = f"{endpoint}:{kwargs.get('model')}"
+    return await call(lambda: create(**kwargs), policy or _policy, key=key, breaker=breaker(key))
+
+async def achat_completion(policy: Optional[RetryPolicy] = None, **kwargs):
+    """Create a chat completion with the shared client."""
+    return await arun(_guarded("chat", get_client().chat.completions.create, kwargs, policy))
+
+def chat_completion(policy: Optional[RetryPolicy] = None, **kwargs):
+    """Blocking variant of achat_completion."""
+    return run(_guarded("chat", get_client().chat.completions.create, kwargs, policy))
+
+async def atranscription(policy: Optional[RetryPolicy] = None, **kwargs):
+    """Create an audio transcription with the shared client.
+
+    The file must be given as bytes or a (name, bytes[, mime type]) tuple,
+    so that retries can send it again.
+    """
+    return await arun(_guarded("transcription", get_client().audio.transcriptions.create, kwargs, policy))
+
+def transcription(policy: Optional[RetryPolicy] = None, **kwargs):
+    """Blocking variant of atranscription."""
+    return run(_guarded("transcription", get_client().audio.transcriptions.create, kwargs, policy))
+
+
+# Marks the end of a ChatStream
+_DONE = object()
+
+class ChatStream:
+    """The text of a streamed chat completion, delivered as it is generated.
+
+    Iterate it once, with for or async for, to get text deltas. Afterwards
+    text, usage, time_to_first_token and tokens_per_second describe the call.
+    The policy applies to opening the stream; once text has been delivered, a
+    failure is raised to the caller rather than retried.
+    """
+
+    def __init__(self, kwargs: Dict[str, Any], policy: Optional[RetryPolicy] = None):
+        self.kwargs = {**kwargs, "stream": True, "stream_options": {"include_usage": True}}
+        self.policy = policy
+        self.text = ""
+        self.usage: Any = None
+        self.started_at: Optional[float] = None
+        # Seconds from sending the request to the first text, and to the last chunk
+        self.time_to_first_token: Optional[float] = None
+        self.duration: Optional[float] = None
+        self._future = None
+
+    async def _pump(self, put: Callable[[Any], None]) -> None:
+        try:
+            stream = await _guarded("chat", get_client().chat.completions.create, self.kwargs, self.policy)
+            try:
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        self.usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        put(chunk.choices[0].delta.content)
+            finally:
+                await stream.close()
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    def _start(self, put: Callable[[Any], None]) -> None:
+        if self._future is not None:
+            raise RuntimeError("A ChatStream can only be iterated once")
+        self.started_at = time.perf_counter()
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(put), _get_loop())
+
+    def _receive(self, item: Any) -> Optional[str]:
+        """Account for one item from the pump, returning its text or None at the end."""
+        if isinstance(item, Exception):
+            raise item
+        if item is _DONE:
+            self.duration = time.perf_counter() - self.started_at
+            return None
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.started_at
+        self.text += item
+        return item
+
+    def __iter__(self) -> Iterator[str]:
+        if threading.current_thread() is _thread:
+            raise RuntimeError("Iterate a ChatStream with async for on the OpenAI client loop")
+        items: "queue.Queue[Any]" = queue.Queue()
+        self._start(items.put)
+        try:
+            while True:
+                text = self._receive(items.get())
+                if text is None:
+                    return
+                yield text
+        finally:
+            self._future.cancel()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        items: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._start(lambda item: loop.call_soon_threadsafe(items.put_nowait, item))
+        try:
+            while True:
+                text = self._receive(await items.get())
+                if text is None:
+                    return
+                yield text
+        finally:
+            self._future.cancel()
+
+    @property
+    def completion_tokens(self) -> Optional[int]:
+        return getattr(self.usage, "completion_tokens", None)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed after the first token."""
+        if not self.completion_tokens or self.time_to_first_token is None or self.duration is None:
+            return None
+        generating = self.duration - self.time_to_first_token
+        return (self.completion_tokens - 1) / generating if generating > 0 else None
+
+    def describe(self) -> str:
+        """Timing summary for logs; a stream may end without any text, e.g. on a content filter stop."""
+        if self.time_to_first_token is None:
+            return "no text streamed"
+        return (
+            f"first token after {self.time_to_first_token * 1000:.0f} ms, "
+            f"{self.tokens_per_second or 0:.1f} tokens/s"
+        )
+
+def stream_chat_completion(policy: Optional[RetryPolicy] = None, **kwargs) -> ChatStream:
+    """Create a chat completion whose text is streamed; see ChatStream.
+
+    The request is sent when iteration starts.
+    """
+    return ChatStream(kwargs, policy)
@@ -0,0 +1,20 @@
+"""
+Filesystem locations for persistent Vox state.
+"""
+import os
+from pathlib import Path
+
+def vox_home() -> Path:
+    """Return the directory holding caches, indexes and other local state.
+
+    Defaults to ~/.vox and can be moved with the VOX_HOME environment variable.
+    """
+    home = Path(os.path.expanduser(os.getenv("VOX_HOME", "~/.vox")))
+    home.mkdir(parents=True, exist_ok=True)
+    return home
+
+def state_dir(name: str) -> Path:
+    """Return (and create) a named subdirectory of the Vox home directory."""
+    path = vox_home() / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
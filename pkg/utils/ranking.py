@@ -0,0 +1,16 @@
+"""
+Deciding when a ranked search result is good enough to act on.
+"""
+from typing import List, Optional, Tuple
+
+def confident_match(matches: List[Tuple[str, float]], min_score: float, min_margin: float) -> Optional[str]:
+    """Return the top item of ranked (item, score) pairs if it is a confident match.
+
+    It must score at least min_score and lead the runner-up by min_margin;
+    otherwise None, leaving the choice to the caller.
+    """
+    if not matches or matches[0][1] < min_score:
+        return None
+    if len(matches) > 1 and matches[0][1] - matches[1][1] < min_margin:
+        return None
+    return matches[0][0]
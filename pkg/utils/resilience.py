@@ -0,0 +1,296 @@
+"""
+Retries, deadlines, hedged requests and circuit breaking for outbound calls.
+
+Every model call goes through call(), which runs a request factory under a
+RetryPolicy and an optional CircuitBreaker:
+
+    result = await call(lambda: client.chat.completions.create(**kwargs), policy, key="chat:gpt-4o")
+
+Breakers and latency history are kept per key, so one overloaded model or
+endpoint does not trip the others.
+"""
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+
+import openai
+
+from pkg.utils.tracing import percentile
+
+logger = logging.getLogger("vox")
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Recent successful latencies kept per key for hedging decisions
+LATENCY_WINDOW = 200
+
+# Consecutive retryable failures that open a breaker, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call and its retries run past the policy deadline."""
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the backend while its circuit breaker is open."""
+
+class RetryPolicy:
+    """How one outbound call is retried, timed out and hedged.
+
+    attempts counts the first try. Delays between attempts grow exponentially
+    from base_delay up to max_delay with full jitter, or follow Retry-After
+    when the server sends a longer one. deadline bounds the whole call
+    including retries, and attempt_timeout each try. With hedge_percentile
+    set, a duplicate request is sent once the first has run longer than that
+    percentile of recent latencies for the same key, and whichever finishes
+    first wins.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: Optional[float] = 120.0,
+        attempt_timeout: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.hedge_percentile = hedge_percentile
+        # Hedging waits for this much latency history, so early guesses don't double traffic
+        self.hedge_min_samples = hedge_min_samples
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait after the given failed attempt (1-based)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds after which to hedge a request for key, or None to not hedge."""
+        if self.hedge_percentile is None:
+            return None
+        with _lock:
+            samples = list(_latencies.get(key, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return percentile(samples, self.hedge_percentile)
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(attempts={self.attempts}, deadline={self.deadline}, "
+            f"attempt_timeout={self.attempt_timeout}, hedge_percentile={self.hedge_percentile})"
+        )
+
+# Single attempt, no deadline, no hedging
+NO_RETRY = RetryPolicy(attempts=1, deadline=None)
+
+class CircuitBreaker:
+    """Fail fast after repeated backend failures, probing again after a cool-down.
+
+    After failure_threshold consecutive retryable failures the circuit opens
+    and calls raise CircuitOpenError at once. Each time reset_timeout passes,
+    one trial call is let through: success closes the circuit, failure keeps
+    it open for another cool-down.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"{self.name} is failing ({self._failures} errors in a row), "
+                    f"not retrying for {self.reset_timeout - waited:.0f}s"
+                )
+            # Let this call through as the trial and hold the rest for another cool-down
+            self._opened_at = time.monotonic()
+        logger.info(f"Circuit {self.name} half-open, sending a trial request")
+
+    def record_success(self) -> None:
+        with self._lock:
+            reopened = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+        if reopened:
+            logger.info(f"Circuit {self.name} closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            opening = self._failures >= self.failure_threshold
+            if opening:
+                self._opened_at = time.monotonic()
+        if opening:
+            logger.warning(f"Circuit {self.name} open after {self._failures} consecutive failures")
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, Deque[float]] = {}
+
+def breaker(key: str) -> CircuitBreaker:
+    """Return the shared breaker for key, creating it on first use."""
+    with _lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(key)
+        return _breakers[key]
+
+def _record_latency(key: str, seconds: float) -> None:
+    with _lock:
+        if key not in _latencies:
+            _latencies[key] = deque(maxlen=LATENCY_WINDOW)
+        _latencies[key].append(seconds)
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient: a timeout, a dropped connection or a retryable status."""
+    # asyncio.TimeoutError is only an alias of TimeoutError from Python 3.11
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, openai.APIConnectionError)):
+        return True
+    return getattr(error, "status_code", None) in RETRY_STATUSES
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After(-Ms) headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+async def _release(result: Any) -> None:
+    """Close a result that won't be used, like the open stream of a losing hedge."""
+    close = getattr(result, "aclose", None) or getattr(result, "close", None)
+    if not callable(close):
+        return
+    try:
+        closing = close()
+        if inspect.isawaitable(closing):
+            await closing
+    except Exception as e:
+        logger.debug(f"Failed to close an unused result: {str(e)}")
+
+async def _race(factory: Callable[[], Awaitable[T]], key: str, timeout: Optional[float], hedge_after: Optional[float]) -> T:
+    """Run one attempt, hedging it after hedge_after seconds, within timeout."""
+    async def timed() -> T:
+        started = time.perf_counter()
+        result = await factory()
+        _record_latency(key, time.perf_counter() - started)
+        return result
+
+    now = time.monotonic()
+    deadline = now + timeout if timeout is not None else None
+    hedge_at = now + hedge_after if hedge_after is not None else None
+    pending: Set[asyncio.Future] = {asyncio.ensure_future(timed())}
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            now = time.monotonic()
+            waits = [t - now for t in (deadline, hedge_at) if t is not None]
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, min(waits)) if waits else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            winners = [task for task in done if task.exception() is None]
+            if winners:
+                # The primary and the hedge can finish in the same wakeup
+                for task in winners[1:]:
+                    await _release(task.result())
+                return winners[0].result()
+            for task in done:
+                error = task.exception()
+            if not pending:
+                raise error
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                logger.info(f"{key} slower than {hedge_after:.2f}s, sending a hedged request")
+                pending.add(asyncio.ensure_future(timed()))
+            elif deadline is not None and now >= deadline:
+                raise TimeoutError(f"{key} timed out after {timeout:.1f}s")
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def call(
+    factory: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    key: str = "default",
+    breaker: Optional[CircuitBreaker] = None
+) -> T:
+    """Await factory() under policy, retrying transient failures.
+
+    factory must start a fresh request each time it is called. Errors that
+    are not transient are raised at once, as is the last error once attempts
+    run out. DeadlineExceeded is raised when the deadline leaves no time for
+    another attempt, and CircuitOpenError while breaker is open.
+    """
+    started = time.monotonic()
+    deadline = started + policy.deadline if policy.deadline is not None else None
+    for attempt in range(1, policy.attempts + 1):
+        if breaker is not None:
+            breaker.allow()
+        timeout = policy.attempt_timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            result = await _race(factory, key, timeout, policy.hedge_delay(key))
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                # Any answer other than a transient error means the backend is up
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not retryable or attempt == policy.attempts:
+                raise
+            delay = policy.backoff(attempt, retry_after(e))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise DeadlineExceeded(
+                    f"{key} gave up after {attempt} attempts in {time.monotonic() - started:.1f}s: {str(e)}"
+                ) from e
+            logger.warning(f"{key} attempt {attempt} failed ({type(e).__name__}: {str(e)}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
@@ -0,0 +1,121 @@
+"""
+Token counting and prompt compaction helpers.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough characters-per-token ratio for English text, used when tiktoken is
+# not installed.
+CHARS_PER_TOKEN = 4
+
+# Tokens the chat format adds around each message (role and separators)
+MESSAGE_OVERHEAD = 4
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count the tokens in text, estimating from its length if tiktoken is unavailable."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Count the prompt tokens of a chat message list."""
+    return sum(count_tokens(str(message.get("content") or ""), model) + MESSAGE_OVERHEAD for message in messages)
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to about max_tokens, keeping its start and end around a marker."""
+    total = count_tokens(text, model)
+    if total <= max_tokens:
+        return text
+    marker = f" ... [{total - max_tokens} tokens omitted] ... "
+    keep = max(0, max_tokens - count_tokens(marker, model))
+    head, tail = keep * 3 // 4, keep // 4
+    encoding = _encoding(model)
+    if encoding is None:
+        head_text = text[:head * CHARS_PER_TOKEN]
+        tail_text = text[len(text) - tail * CHARS_PER_TOKEN:] if tail else ""
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        head_text = encoding.decode(tokens[:head])
+        tail_text = encoding.decode(tokens[len(tokens) - tail:]) if tail else ""
+    return head_text + marker + tail_text
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+def compact_list(items: List[Any], max_tokens: int, query: str = "", model: Optional[str] = None) -> List[Any]:
+    """Fit a list into max_tokens.
+
+    Duplicates are dropped, then items are ranked by word overlap with query
+    (if given) and kept best first until the budget is spent. A note saying
+    how many items were left out is appended.
+    """
+    seen = set()
+    unique = []
+    for item in items:
+        key = str(item)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+
+    if query:
+        wanted = _words(query)
+        # Stable sort, so ties keep their original order
+        unique.sort(key=lambda item: -len(_words(str(item)) & wanted))
+
+    kept = []
+    # Leave room for the omission note
+    budget = max_tokens - MESSAGE_OVERHEAD * 2
+    for item in unique:
+        cost = count_tokens(str(item), model) + 1
+        if cost > budget:
+            break
+        kept.append(item)
+        budget -= cost
+    if len(kept) < len(unique):
+        kept.append(f"... {len(unique) - len(kept)} more omitted")
+    return kept
+
+def _compact_value(value: Any, max_tokens: int, query: str, model: Optional[str]) -> Any:
+    if isinstance(value, dict):
+        return compact_context(value, max_tokens, query, model)[0]
+    if isinstance(value, (list, tuple, set)):
+        return compact_list(list(value), max_tokens, query, model)
+    return truncate_tokens(str(value), max_tokens, model)
+
+def compact_context(context: Dict[str, Any], max_tokens: int, query: str = "", model: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+    """Shrink a context dict to about max_tokens, returning (context, compacted).
+
+    Values that fit their fair share of the budget are kept as is; the budget
+    they leave unused is split among the larger ones, which are compacted:
+    lists are deduplicated and ranked against query, strings are truncated.
+    """
+    sizes = {key: count_tokens(str(value), model) for key, value in context.items()}
+    if sum(sizes.values()) <= max_tokens:
+        return context, False
+
+    compacted = {}
+    remaining = max_tokens
+    ordered = sorted(context, key=lambda key: sizes[key])
+    for i, key in enumerate(ordered):
+        share = max(0, remaining // (len(ordered) - i))
+        if sizes[key] <= share:
+            compacted[key] = context[key]
+            remaining -= sizes[key]
+        else:
+            compacted[key] = _compact_value(context[key], share, query, model)
+            remaining -= count_tokens(str(compacted[key]), model)
+    # Keep the caller's key order
+    return {key: compacted[key] for key in context}, True
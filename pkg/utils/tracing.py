@@ -0,0 +1,187 @@
+"""
+Lightweight span tracing for per-stage latency.
+
+Spans are appended as JSON lines to ~/.vox/traces/spans.jsonl, tagged with a
+per-process session ID, and summarized by `vox stats`. Set VOX_TRACE=0 to
+disable recording.
+"""
+import asyncio
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from pkg.utils.paths import state_dir
+
+logger = logging.getLogger("vox")
+
+SESSION_ID = uuid.uuid4().hex[:12]
+
+# The trace file is rotated to spans.jsonl.1 once it grows past this size
+MAX_TRACE_BYTES = 20 * 1024 * 1024
+
+_lock = threading.Lock()
+_file = None
+
+def enabled() -> bool:
+    return os.getenv("VOX_TRACE", "1") != "0"
+
+def trace_path() -> Path:
+    return state_dir("traces") / "spans.jsonl"
+
+def _write(record: Dict[str, Any]) -> None:
+    global _file
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        if _file is None:
+            path = trace_path()
+            if path.exists() and path.stat().st_size > MAX_TRACE_BYTES:
+                os.replace(path, path.with_suffix(".jsonl.1"))
+            _file = open(path, "a", buffering=1, encoding="utf-8")
+        _file.write(line)
+        # Long-running processes (the daemon) rotate as they go; the size
+        # includes lines other processes appended, and once another process
+        # has rotated, the handle still points at the old, oversized file
+        if os.fstat(_file.fileno()).st_size > MAX_TRACE_BYTES:
+            _file.close()
+            _file = None
+
+class Span:
+    """A timed stage. Attributes set during the span are stored with it."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Time the enclosed block and record it as a span named name."""
+    current = Span(name, attrs)
+    status = "ok"
+    try:
+        yield current
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        if enabled():
+            record = {
+                "session": SESSION_ID,
+                "ts": time.time(),
+                "name": name,
+                "duration_ms": round((time.perf_counter() - current.start) * 1000, 3),
+                "status": status,
+            }
+            if current.attrs:
+                record["attrs"] = current.attrs
+            try:
+                _write(record)
+            except OSError as e:
+                logger.debug(f"Failed to record span {name}: {str(e)}")
+
+def traced(name: str):
+    """Decorate a sync or async function so each call is recorded as a span."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_usage(current: Span, response: Any) -> None:
+    """Copy token usage from an OpenAI response onto a span."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        current.set(
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None)
+        )
+
+def record_stream(current: Span, stream: Any) -> None:
+    """Copy token usage, time to first token and generation speed from a ChatStream onto a span."""
+    record_usage(current, stream)
+    if stream.time_to_first_token is not None:
+        current.set(ttft_ms=round(stream.time_to_first_token * 1000, 1))
+    if stream.tokens_per_second is not None:
+        current.set(tokens_per_second=round(stream.tokens_per_second, 1))
+
+def read_spans(path: Optional[Path] = None, sessions: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Load recorded spans, optionally only those from the most recent sessions."""
+    path = path or trace_path()
+    spans = []
+    for candidate in (path.with_suffix(".jsonl.1"), path):
+        if not candidate.exists():
+            continue
+        with open(candidate, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+
+    if sessions:
+        last_seen: Dict[str, float] = {}
+        for record in spans:
+            last_seen[record["session"]] = max(last_seen.get(record["session"], 0), record["ts"])
+        recent = set(sorted(last_seen, key=last_seen.get)[-sessions:])
+        spans = [record for record in spans if record["session"] in recent]
+    return spans
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Aggregate span durations per stage into count, mean and p50/p95/p99.
+
+    Streamed stages also get the median time to first token and mean
+    generation speed.
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    tokens: Dict[str, int] = defaultdict(int)
+    ttfts: Dict[str, List[float]] = defaultdict(list)
+    speeds: Dict[str, List[float]] = defaultdict(list)
+    for record in spans:
+        durations[record["name"]].append(record["duration_ms"])
+        attrs = record.get("attrs") or {}
+        tokens[record["name"]] += (attrs.get("prompt_tokens") or 0) + (attrs.get("completion_tokens") or 0)
+        if attrs.get("ttft_ms") is not None:
+            ttfts[record["name"]].append(attrs["ttft_ms"])
+        if attrs.get("tokens_per_second") is not None:
+            speeds[record["name"]].append(attrs["tokens_per_second"])
+
+    summary = {}
+    for name, values in sorted(durations.items()):
+        summary[name] = {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "tokens": tokens[name],
+            "ttft_p50_ms": percentile(ttfts[name], 50) if ttfts[name] else None,
+            "tokens_per_second": sum(speeds[name]) / len(speeds[name]) if speeds[name] else None,
+        }
+    return summary
@@ -0,0 +1,26 @@
+"""
+Encoded audio shared by the recorder and the transcriber.
+"""
+
+# Compressed formats, as (soundfile format, subtype, MIME type)
+COMPRESSED_FORMATS = {
+    "flac": ("FLAC", "PCM_16", "audio/flac"),
+    "ogg": ("OGG", "OPUS", "audio/ogg"),
+}
+
+class AudioPayload:
+    """An encoded recording held in memory, ready to upload."""
+
+    def __init__(self, data: bytes, format: str, mime_type: str, encode_ms: float):
+        self.data = data
+        self.format = format
+        self.mime_type = mime_type
+        self.encode_ms = encode_ms
+
+    @property
+    def filename(self) -> str:
+        return f"recording.{self.format}"
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
@@ -1,73 +1,242 @@
 """
 Voice recorder module for capturing audio input.
 """
+import io
 import logging
 import tempfile
+import threading
+import time
+import wave
 from pathlib import Path
+from typing import Optional
 import sounddevice as sd
 import numpy as np
 import wavio
 from rich.console import Console
+from pkg.utils.tracing import span
+from pkg.voice.audio import COMPRESSED_FORMATS, AudioPayload
 
 logger = logging.getLogger("vox")
 console = Console()
 
+# Whisper resamples to 16 kHz internally, so recording faster only adds bytes
+DEFAULT_SAMPLE_RATE = 16000
+# Longest utterance recorded; sizes the sample buffer
+MAX_DURATION = 30.0
+# Length of each VAD analysis frame
+FRAME_DURATION = 0.03
+# Trailing silence that ends a recording once speech has been heard
+SILENCE_DURATION = 1.2
+# Give up if no speech starts within this long
+NO_SPEECH_TIMEOUT = 8.0
+# Speech must be this many times louder than the measured noise floor
+SPEECH_RATIO = 3.0
+# RMS floor for int16 audio, so a silent room doesn't make any noise "speech"
+MIN_SPEECH_RMS = 300.0
+# Leading frames used to estimate the noise floor
+CALIBRATION_FRAMES = 10
+# Percentile of the calibration frames taken as the floor, so speech that
+# starts at once still leaves some quieter frames to measure
+CALIBRATION_PERCENTILE = 10
+# Highest noise floor accepted, so a loud start can't put the speech
+# threshold out of reach
+MAX_NOISE_FLOOR = 2 * MIN_SPEECH_RMS
+# How quickly the floor follows quieter frames after calibration
+FLOOR_DECAY = 0.1
+
+class SampleBuffer:
+    """Preallocated int16 sample buffer that keeps the first capacity samples."""
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.written = 0
+
+    def write(self, samples: np.ndarray) -> int:
+        """Append samples, dropping any beyond capacity, and return how many were kept."""
+        samples = samples[:self.capacity - self.written]
+        self.data[self.written:self.written + len(samples)] = samples
+        self.written += len(samples)
+        return len(samples)
+
+    def contents(self) -> np.ndarray:
+        """Return a copy of the buffered samples."""
+        return self.data[:self.written].copy()
+
+class EnergyVAD:
+    """Energy-based voice activity detector over fixed-length frames.
+
+    The first frames calibrate a noise floor from their quieter end, and
+    the floor then follows any quieter frames; a frame counts as speech when
+    its RMS is well above that floor. Once speech has been heard, a run of
+    silent frames ends the utterance.
+    """
+
+    def __init__(self, sample_rate: int, silence_duration: float = SILENCE_DURATION, no_speech_timeout: float = NO_SPEECH_TIMEOUT):
+        self.frame_size = int(sample_rate * FRAME_DURATION)
+        self.silence_frames = int(silence_duration / FRAME_DURATION)
+        self.timeout_frames = int(no_speech_timeout / FRAME_DURATION)
+        self.noise_floor: Optional[float] = None
+        self._calibration = []
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.frames = 0
+        self.speech_started = False
+        self.silent_run = 0
+
+    def _is_speech(self, rms: float) -> bool:
+        if self.noise_floor is None:
+            self._calibration.append(rms)
+            if len(self._calibration) >= CALIBRATION_FRAMES:
+                floor = float(np.percentile(self._calibration, CALIBRATION_PERCENTILE))
+                self.noise_floor = min(floor, MAX_NOISE_FLOOR)
+            return False
+        if rms < self.noise_floor:
+            self.noise_floor += FLOOR_DECAY * (rms - self.noise_floor)
+        return rms > max(MIN_SPEECH_RMS, self.noise_floor * SPEECH_RATIO)
+
+    def feed(self, samples: np.ndarray) -> bool:
+        """Process new samples and return True once the utterance has ended."""
+        samples = np.concatenate((self._pending, samples))
+        whole = len(samples) // self.frame_size * self.frame_size
+        self._pending = samples[whole:]
+        if whole == 0:
+            return False
+
+        frames = samples[:whole].astype(np.float32).reshape(-1, self.frame_size)
+        for rms in np.sqrt(np.mean(frames ** 2, axis=1)):
+            self.frames += 1
+            if self._is_speech(rms):
+                self.speech_started = True
+                self.silent_run = 0
+            elif self.speech_started:
+                self.silent_run += 1
+                if self.silent_run >= self.silence_frames:
+                    return True
+            elif self.frames >= self.timeout_frames:
+                return True
+        return False
+
 class VoiceRecorder:
-    def __init__(self, sample_rate=44100):
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, max_duration=MAX_DURATION, vad=True):
         self.sample_rate = sample_rate
+        self.max_duration = max_duration
+        self.vad = vad
         self.recording = None
         self.temp_dir = Path(tempfile.gettempdir())
         logger.debug(f"Initialized VoiceRecorder with sample rate: {sample_rate}")
         self._recording_complete = False
-    
+
     def record(self, duration=None):
         """Record audio from microphone.
-        If duration is None, records until stop_recording is called."""
+        If duration is None, records until trailing silence is detected or
+        Ctrl+C is pressed. Only the captured samples are kept."""
         logger.info("Starting audio recording")
         console.print("[bold yellow]🎤 Recording...[/bold yellow] Press Ctrl+C to stop")
+        limit = duration or self.max_duration
+        buffer = SampleBuffer(int(limit * self.sample_rate))
+        detector = EnergyVAD(self.sample_rate) if self.vad and not duration else None
+        done = threading.Event()
+        self._recording_complete = False
+
+        def callback(indata, frames, time_info, status):
+            if status:
+                logger.debug(f"Audio input status: {status}")
+            if buffer.written >= buffer.capacity:
+                return
+            # Stop at capacity rather than overwrite the start of the utterance
+            kept = buffer.write(indata[:, 0])
+            samples = indata[:kept, 0]
+            if detector is not None and detector.feed(samples):
+                logger.info("End of speech detected")
+                done.set()
+            if buffer.written >= buffer.capacity:
+                done.set()
+
         try:
             if duration:
                 logger.debug(f"Recording for fixed duration: {duration}s")
-                self.recording = sd.rec(
-                    int(duration * self.sample_rate),
-                    samplerate=self.sample_rate,
-                    channels=1,
-                    dtype=np.int16
-                )
-                sd.wait()
             else:
-                logger.debug("Recording until interrupted")
-                self.recording = sd.rec(
-                    int(30 * self.sample_rate),  # Max 30 seconds
+                logger.debug("Recording until silence or interrupt")
+
+            with span("voice.record", vad=detector is not None) as stage:
+                with sd.InputStream(
                     samplerate=self.sample_rate,
                     channels=1,
-                    dtype=np.int16
-                )
-                
-                # Wait for Ctrl+C
-                try:
-                    while not self._recording_complete:
-                        sd.sleep(100)
-                except KeyboardInterrupt:
-                    # Stop recording on first Ctrl+C
-                    sd.stop()
-                    self._recording_complete = True
-                    logger.info("Recording stopped by user")
-                
+                    dtype=np.int16,
+                    blocksize=int(self.sample_rate * FRAME_DURATION),
+                    callback=callback
+                ):
+                    try:
+                        while not done.wait(0.1):
+                            pass
+                    except KeyboardInterrupt:
+                        # Stop recording on first Ctrl+C
+                        logger.info("Recording stopped by user")
+
+                self._recording_complete = True
+                samples = buffer.contents()
+                if duration:
+                    samples = samples[:int(duration * self.sample_rate)]
+                self.recording = samples.reshape(-1, 1)
+                stage.set(audio_seconds=round(len(samples) / self.sample_rate, 3))
+            logger.debug(f"Captured {len(samples) / self.sample_rate:.2f}s of audio")
+
         except Exception as e:
             logger.error(f"Error during recording: {str(e)}", exc_info=True)
             console.print(f"[bold red]Recording error:[/bold red] {str(e)}")
             raise
-    
+
+    def _encode_wav(self) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(self.recording.astype(np.int16).tobytes())
+        return buffer.getvalue()
+
+    def encode(self, format: str = "flac") -> AudioPayload:
+        """Encode the recording in memory, without a temporary file.
+
+        "flac" and "ogg" (Opus) need the optional soundfile package and fall
+        back to uncompressed WAV when it or the codec is unavailable.
+        """
+        if self.recording is None:
+            logger.error("No recording available to encode")
+            raise ValueError("No recording available")
+
+        started = time.perf_counter()
+        mime_type = "audio/wav"
+        if format in COMPRESSED_FORMATS:
+            sf_format, subtype, mime_type = COMPRESSED_FORMATS[format]
+            try:
+                import soundfile
+
+                buffer = io.BytesIO()
+                soundfile.write(buffer, self.recording, self.sample_rate, format=sf_format, subtype=subtype)
+                data = buffer.getvalue()
+            except Exception as e:
+                logger.debug(f"Cannot encode {format} ({str(e)}), falling back to WAV")
+                format, mime_type = "wav", "audio/wav"
+                data = self._encode_wav()
+        elif format == "wav":
+            data = self._encode_wav()
+        else:
+            raise ValueError(f"Unsupported audio format: {format}")
+
+        encode_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Encoded recording as {format}: {len(data)} bytes in {encode_ms:.1f} ms")
+        return AudioPayload(data, format, mime_type, encode_ms)
+
     def save(self) -> Path:
         """Save recording to temporary WAV file and return path."""
         if self.recording is None:
             logger.error("No recording available to save")
             raise ValueError("No recording available")
-        
+
         output_path = self.temp_dir / f"vox_recording_{id(self)}.wav"
         logger.debug(f"Saving recording to: {output_path}")
-        
+
         try:
             wavio.write(
                 str(output_path),
@@ -77,7 +246,7 @@ class VoiceRecorder:
             )
             logger.info("Recording saved successfully")
             return output_path
-            
+
         except Exception as e:
             logger.error(f"Error saving recording: {str(e)}", exc_info=True)
-            raise 
\ No newline at end of file
+            raise
@@ -1,14 +1,231 @@
 """
 Text-to-speech module using system commands.
+
+Text can be fed to a SpeechPipeline as it is generated; complete sentences
+are spoken by a background worker while later text is still arriving.
 """
+import logging
+import os
+import queue
+import re
+import shutil
 import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Type
 from rich.console import Console
+from pkg.utils.tracing import span
 
+logger = logging.getLogger("vox")
 console = Console()
 
-def speak(text: str):
-    """Use macOS say command for TTS."""
+class TTSBackend(ABC):
+    """Speak one piece of text, blocking until playback has finished."""
+
+    name = "base"
+
+    @abstractmethod
+    def speak(self, text: str) -> None:
+        ...
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+class CommandBackend(TTSBackend):
+    """Backend that runs a command-line speech engine once per sentence."""
+
+    command: List[str] = []
+
+    def speak(self, text: str) -> None:
+        subprocess.run([*self.command, text], check=False)
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which(cls.command[0]) is not None
+
+class SayBackend(CommandBackend):
+    """macOS `say`."""
+
+    name = "say"
+    command = ["say"]
+
+class EspeakBackend(CommandBackend):
+    """eSpeak NG, the common Linux command-line engine."""
+
+    name = "espeak"
+    command = ["espeak-ng"]
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which("espeak-ng") is not None or shutil.which("espeak") is not None
+
+    def speak(self, text: str) -> None:
+        binary = "espeak-ng" if shutil.which("espeak-ng") else "espeak"
+        subprocess.run([binary, text], check=False)
+
+class SpdSayBackend(CommandBackend):
+    """speech-dispatcher's `spd-say`, waiting for each sentence to finish."""
+
+    name = "spd-say"
+    command = ["spd-say", "--wait"]
+
+class NullBackend(TTSBackend):
+    """Silent backend that records what would have been spoken, for tests."""
+
+    name = "null"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.spoken: List[str] = []
+
+    def speak(self, text: str) -> None:
+        if self.delay:
+            time.sleep(self.delay)
+        self.spoken.append(text)
+
+BACKENDS: Dict[str, Type[TTSBackend]] = {
+    backend.name: backend for backend in (SayBackend, EspeakBackend, SpdSayBackend, NullBackend)
+}
+
+def get_backend(name: Optional[str] = None) -> TTSBackend:
+    """Return a TTS backend by name, or the best available one.
+
+    The VOX_TTS_BACKEND environment variable overrides the default choice.
+    """
+    name = name or os.getenv("VOX_TTS_BACKEND")
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend {name!r}, choose from {sorted(BACKENDS)}")
+        return BACKENDS[name]()
+
+    candidates = [SayBackend] if sys.platform == "darwin" else []
+    candidates += [EspeakBackend, SpdSayBackend]
+    for backend in candidates:
+        if backend.available():
+            return backend()
+    logger.warning("No text-to-speech engine found, speech output disabled")
+    return NullBackend()
+
+# Abbreviations that end with a period without ending the sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "inc", "fig"}
+# Abbreviations only before a number: "No. 5", but "The answer is no."
+NUMBER_ABBREVIATIONS = {"no"}
+
+SENTENCE_END = re.compile(r"([.!?]+[\"')\]]*)\s+|\n\s*\n")
+
+class SentenceSplitter:
+    """Turn a stream of text chunks into complete sentences."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def _is_abbreviation(self, text: str, following: str) -> Optional[bool]:
+        """Whether text ends with an abbreviation, or None if that depends on text still to come."""
+        words = text.rstrip(".").rsplit(None, 1)
+        word = words[-1].lower() if words else ""
+        if word in NUMBER_ABBREVIATIONS:
+            return following[0].isdigit() if following else None
+        return word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add text and return any sentences it completed."""
+        self.buffer += chunk
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            if match.group(1) and match.group(1).startswith("."):
+                abbreviation = self._is_abbreviation(self.buffer[start:match.start()], self.buffer[match.end():])
+                if abbreviation is None:
+                    break
+                if abbreviation:
+                    continue
+            if candidate:
+                sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left as a final sentence."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+class SpeechPipeline:
+    """Speak text as it streams in, one sentence at a time, on a worker thread.
+
+    Usage:
+        with SpeechPipeline() as speech:
+            for chunk in stream:
+                speech.feed(chunk)
+    """
+
+    def __init__(self, backend: Optional[TTSBackend] = None):
+        self.backend = backend or get_backend()
+        self.splitter = SentenceSplitter()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        # Seconds from start() until the first sentence began playing
+        self.time_to_first_audio: Optional[float] = None
+
+    def start(self) -> "SpeechPipeline":
+        self.started_at = time.perf_counter()
+        self._worker = threading.Thread(target=self._run, name="vox-speech", daemon=True)
+        self._worker.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            sentence = self._queue.get()
+            if sentence is None:
+                return
+            if self.time_to_first_audio is None:
+                self.time_to_first_audio = time.perf_counter() - self.started_at
+                logger.debug(f"Time to first audio: {self.time_to_first_audio * 1000:.0f} ms")
+            try:
+                with span("tts.sentence", backend=self.backend.name, chars=len(sentence)):
+                    self.backend.speak(sentence)
+            except Exception as e:
+                console.print(f"[bold red]Error speaking:[/bold red] {str(e)}")
+
+    def feed(self, chunk: str) -> None:
+        """Add generated text; complete sentences are queued for playback."""
+        if self._worker is None:
+            self.start()
+        for sentence in self.splitter.feed(chunk):
+            self._queue.put(sentence)
+
+    def finish(self) -> None:
+        """Queue any remaining text and wait until everything has been spoken."""
+        if self._worker is None:
+            self.start()
+        for sentence in self.splitter.flush():
+            self._queue.put(sentence)
+        self._queue.put(None)
+        self._worker.join()
+
+    def speak_stream(self, chunks: Iterable[str]) -> None:
+        """Speak a stream of text chunks, returning when playback is done."""
+        if self._worker is None:
+            self.start()
+        for chunk in chunks:
+            self.feed(chunk)
+        self.finish()
+
+    def __enter__(self) -> "SpeechPipeline":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.finish()
+
+def speak(text: str, backend: Optional[TTSBackend] = None):
+    """Speak text sentence by sentence with the system TTS engine."""
     try:
-        subprocess.run(["say", text])
+        with span("tts.speak", chars=len(text)):
+            SpeechPipeline(backend).speak_stream([text])
     except Exception as e:
         console.print(f"[bold red]Error speaking:[/bold red] {str(e)}")
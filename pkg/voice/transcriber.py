@@ -1,29 +1,65 @@
 """
 Transcription service using OpenAI's Whisper API.
 """
+import logging
+import os
+import time
 from pathlib import Path
-import openai
+from typing import Dict, Optional, Union
 from rich.console import Console
+from pkg.utils import openai_client
+from pkg.utils.resilience import RetryPolicy
+from pkg.utils.tracing import span
+from pkg.voice.audio import AudioPayload
 
+logger = logging.getLogger("vox")
 console = Console()
 
 class WhisperTranscriber:
-    def __init__(self, api_key: str = None):
-        """Initialize transcriber with optional API key."""
+    def __init__(self, api_key: str = None, retry_policy: Optional[RetryPolicy] = None):
+        """Initialize transcriber with optional API key and retry policy."""
         if api_key:
-            openai.api_key = api_key
+            openai_client.configure(api_key=api_key)
+        self.retry_policy = retry_policy
+        # Size and timing of the most recent upload
+        self.last_upload: Dict[str, float] = {}
     
-    def transcribe(self, audio_path: Path) -> str:
-        """Transcribe audio file using Whisper API."""
+    def transcribe(self, audio: Union[Path, AudioPayload]) -> str:
+        """Transcribe audio using Whisper API.
+
+        Accepts an in-memory AudioPayload from VoiceRecorder.encode, or the
+        path of an audio file as written by VoiceRecorder.save.
+        """
         console.print("[bold yellow]🎯 Transcribing audio...[/bold yellow]")
         
         try:
-            with open(audio_path, "rb") as audio_file:
-                transcript = openai.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
+            started = time.perf_counter()
+            with span("voice.transcribe") as stage:
+                if isinstance(audio, AudioPayload):
+                    transcript = openai_client.transcription(
+                        policy=self.retry_policy,
+                        model="whisper-1",
+                        file=(audio.filename, audio.data, audio.mime_type),
+                        response_format="text"
+                    )
+                    self.last_upload = {"bytes": audio.size, "encode_ms": audio.encode_ms}
+                else:
+                    # Read into memory so a retry can send the file again
+                    with open(audio, "rb") as audio_file:
+                        data = audio_file.read()
+                    transcript = openai_client.transcription(
+                        policy=self.retry_policy,
+                        model="whisper-1",
+                        file=(Path(audio).name, data),
+                        response_format="text"
+                    )
+                    self.last_upload = {"bytes": os.path.getsize(audio), "encode_ms": 0.0}
+                stage.set(bytes=self.last_upload["bytes"])
+            self.last_upload["upload_ms"] = (time.perf_counter() - started) * 1000
+            logger.info(
+                f"Transcribed {self.last_upload['bytes']} bytes "
+                f"(encode {self.last_upload['encode_ms']:.1f} ms, upload {self.last_upload['upload_ms']:.1f} ms)"
+            )
             console.print(f"[bold green]✓ Transcribed:[/bold green] {transcript}")
             return transcript
             
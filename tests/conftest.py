@@ -0,0 +1,10 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def vox_home(tmp_path, monkeypatch):
+    """Keep caches, indexes and memory of each test in its own directory."""
+    home = tmp_path / "vox"
+    monkeypatch.setenv("VOX_HOME", str(home))
+    monkeypatch.setenv("VOX_TRACE", "0")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return home
@@ -0,0 +1,54 @@
+import io
+import json
+
+from pkg.kernel.agent import Agent
+from pkg.kernel.batch import BatchRunner, load_checkpoint
+
+class FakeSlackCrew:
+    def __init__(self, reply="Message sent"):
+        self.reply = reply
+
+    def process_request(self, request, channel=None, message=None):
+        return self.reply
+
+def run(lines, tmp_path, resume=False, crew=None):
+    agent = Agent(use_memory=False)
+    crew = crew or FakeSlackCrew()
+    agent.crews.get = lambda name: crew
+    checkpoint = tmp_path / "results.checkpoint"
+    runner = BatchRunner(agent, concurrency=2, checkpoint=checkpoint)
+    output = io.StringIO()
+    stats = runner.run(io.StringIO("".join(json.dumps(line) + "\n" for line in lines)), output, resume=resume)
+    results = {result["id"]: result for result in map(json.loads, output.getvalue().splitlines())}
+    return stats, results, load_checkpoint(checkpoint)
+
+def test_clarifying_question_is_not_a_success(tmp_path):
+    stats, results, done = run([
+        {"id": "a", "request": "send a slack message", "crew": "slack"},
+        {"id": "b", "request": "send a slack message to #general: hi", "crew": "slack"},
+    ], tmp_path)
+
+    assert results["a"]["status"] == "needs_input"
+    assert results["a"]["error"] == "Which Slack channel should I send that to?"
+    assert results["b"]["status"] == "success"
+    assert stats == {"succeeded": 1, "failed": 0, "needs_input": 1, "skipped": 0}
+    assert done == {"b"}
+
+def test_requests_needing_input_are_retried_on_resume(tmp_path):
+    lines = [
+        {"id": "a", "request": "send a slack message", "crew": "slack"},
+        {"id": "b", "request": "send a slack message to #general: hi", "crew": "slack"},
+    ]
+    run(lines, tmp_path)
+    stats, results, _ = run(lines, tmp_path, resume=True)
+
+    assert set(results) == {"a"}
+    assert stats["skipped"] == 1
+
+def test_crew_error_reply_is_a_failure(tmp_path):
+    crew = FakeSlackCrew("Invalid message format. Please use: Send a Slack message to #channel: message")
+    stats, results, done = run([{"id": "a", "request": "send a slack message to #general: hi", "crew": "slack"}], tmp_path, crew=crew)
+
+    assert results["a"]["status"] == "error"
+    assert stats["failed"] == 1
+    assert done == set()
@@ -0,0 +1,10 @@
+from pkg.utils.cache import DiskCache
+
+def test_overwriting_an_entry_counts_it_once(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1000)
+    cache.set("kept", b"k" * 100)
+    for _ in range(50):
+        cache.set("rewritten", b"r" * 300)
+
+    assert cache._size == 400
+    assert cache.get("kept") == b"k" * 100
@@ -0,0 +1,43 @@
+import threading
+
+from pkg.tools.open import pdf_reader
+from pkg.tools.open.file_index import FilenameIndex
+
+def test_refresh_during_search_waits(tmp_path, monkeypatch):
+    for name in ("quarterly report a.pdf", "quarterly report b.pdf"):
+        (tmp_path / name).touch()
+    index = FilenameIndex(search_dirs=[str(tmp_path)], index_path=tmp_path / "filenames.json")
+    index.refresh()
+    score = index._score
+    refreshes = []
+
+    def score_during_refresh(query, path):
+        # Remove every file and re-index from another thread mid-search
+        if not refreshes:
+            for pdf in tmp_path.glob("*.pdf"):
+                pdf.unlink()
+            refresh = threading.Thread(target=index.refresh)
+            refresh.start()
+            refresh.join(timeout=0.2)
+            refreshes.append(refresh)
+        return score(query, path)
+
+    monkeypatch.setattr(index, "_score", score_during_refresh)
+    assert len(index.search("quarterly report")) == 2
+    refreshes[0].join()
+    assert index.search("quarterly report") == []
+
+def test_find_pdf_reuses_filename_index(tmp_path, monkeypatch):
+    (tmp_path / "annual-tax-receipts-2023.pdf").touch()
+    built = []
+
+    class CountingIndex(FilenameIndex):
+        def __init__(self, *args, **kwargs):
+            built.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_reader, "FilenameIndex", CountingIndex)
+    monkeypatch.setattr(pdf_reader, "_filename_indexes", {})
+    for _ in range(3):
+        assert pdf_reader.find_pdf("annual tax receipts 2023", search_dirs=[str(tmp_path)]).endswith("annual-tax-receipts-2023.pdf")
+    assert len(built) == 1
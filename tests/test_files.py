@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from pkg.utils.files import atomic_write, write_json
+from pkg.utils.ranking import confident_match
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / "state.json"
+    write_json(path, {"version": 1})
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("{partial")
+            raise RuntimeError("interrupted")
+    assert json.loads(path.read_text()) == {"version": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+def test_confident_match():
+    assert confident_match([("a", 0.9), ("b", 0.5)], 0.6, 0.1) == "a"
+    assert confident_match([("a", 0.9), ("b", 0.85)], 0.6, 0.1) is None
+    assert confident_match([("a", 0.5)], 0.6, 0.1) is None
+    assert confident_match([], 0.6, 0.1) is None
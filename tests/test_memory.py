@@ -0,0 +1,22 @@
+from pkg.kernel.agent import Agent
+from pkg.kernel.memory import refers_back
+from pkg.kernel.router import Route, extract_slots
+
+def test_refers_back():
+    assert refers_back("the same one again")
+    assert refers_back("it")
+    assert not refers_back("tax receipts")
+    assert not refers_back("")
+    assert not refers_back(None)
+
+def test_request_without_hint_does_not_reuse_last_document(tmp_path):
+    agent = Agent(memory_path=str(tmp_path / "memory"))
+    agent.memory.add("summarize the tax receipts pdf", "pdf", {"path": "/downloads/tax.pdf"}, "Summary", "success")
+
+    for request in ("summarize a pdf", "summarize the pdf"):
+        _, _, kwargs = agent.prepare(Route("pdf", 1.0, extract_slots("pdf", request), "menu"), request)
+        assert "path" not in kwargs
+
+    for request in ("summarize the same pdf again", "summarize it"):
+        _, _, kwargs = agent.prepare(Route("pdf", 1.0, extract_slots("pdf", request), "menu"), request)
+        assert kwargs["path"] == "/downloads/tax.pdf"
@@ -0,0 +1,38 @@
+import asyncio
+
+from pkg.utils import resilience
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+def test_hedge_finishing_with_primary_is_closed():
+    streams = []
+
+    async def main():
+        ready = asyncio.Event()
+
+        async def factory():
+            stream = FakeStream()
+            streams.append(stream)
+            await ready.wait()
+            return stream
+
+        async def release_both():
+            # Let the hedge start, then finish both requests at once
+            while len(streams) < 2:
+                await asyncio.sleep(0.005)
+            ready.set()
+
+        releaser = asyncio.ensure_future(release_both())
+        result = await resilience._race(factory, "test", timeout=5.0, hedge_after=0.01)
+        await releaser
+        return result
+
+    result = asyncio.run(main())
+    assert len(streams) == 2
+    assert not result.closed
+    assert [stream.closed for stream in streams if stream is not result] == [True]
@@ -0,0 +1,39 @@
+import pytest
+
+from pkg.kernel.agent import Agent
+from pkg.kernel.router import Route, extract_slots
+
+def test_prepare_passes_slots_with_colons_through():
+    request = "send a slack message to #general: meeting at 10:30"
+    agent = Agent(use_memory=False)
+    crew, _, kwargs = agent.prepare(Route("slack", 1.0, extract_slots("slack", request), "input"), request)
+    assert crew == "slack"
+    assert kwargs == {"channel": "general", "message": "meeting at 10:30"}
+
+class FakeSlackTool:
+    class channels:
+        loaded = False
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, channel, text):
+        self.sent.append((channel, text))
+        return {"successful": True}
+
+@pytest.fixture
+def crew():
+    pytest.importorskip("composio_openai")
+    from pkg.agents.open.crew_ai.slack_messager.slack_messager_crew import SlackCrew
+
+    crew = SlackCrew.__new__(SlackCrew)
+    crew.slack_tool = FakeSlackTool()
+    return crew
+
+def test_message_with_colon_is_sent_whole(crew):
+    assert crew.process_request("Send a Slack message to #general: meeting at 10:30") == "Message sent to #general"
+    assert crew.slack_tool.sent == [("general", "meeting at 10:30")]
+
+def test_slots_are_used_as_given(crew):
+    crew.process_request("Send a Slack message to #general: ignored", channel="design", message="review at 10:30")
+    assert crew.slack_tool.sent == [("design", "review at 10:30")]
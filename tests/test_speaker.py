@@ -0,0 +1,30 @@
+import pytest
+
+from pkg.voice.speaker import NullBackend, SentenceSplitter, TTSBackend
+
+def split(*chunks):
+    splitter = SentenceSplitter()
+    sentences = []
+    for chunk in chunks:
+        sentences += splitter.feed(chunk)
+    return sentences + splitter.flush()
+
+def test_no_ends_a_sentence():
+    assert split("The answer is no. ", "Try again later.") == ["The answer is no.", "Try again later."]
+    assert split("Dr. Smith said no. Really.") == ["Dr. Smith said no.", "Really."]
+
+def test_no_before_a_number_is_an_abbreviation():
+    assert split("See item No. 5 on the list. Done.") == ["See item No. 5 on the list.", "Done."]
+
+def test_waits_for_the_next_chunk_after_no():
+    splitter = SentenceSplitter()
+    assert splitter.feed("See item No. ") == []
+    assert splitter.feed("5 on the list. ") == ["See item No. 5 on the list."]
+
+def test_backend_must_implement_speak():
+    class Silent(TTSBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Silent()
+    NullBackend().speak("ok")
@@ -0,0 +1,73 @@
+import hashlib
+
+import pytest
+
+from pkg.tools.open import summarize
+from pkg.tools.open.summary_cache import SummaryCache
+
+def make_document(sections: int, edited: int = -1) -> str:
+    paragraphs = []
+    for i in range(sections):
+        topic = "revised" if i == edited else "original"
+        paragraphs.append(" ".join(f"section{i} {topic} word{j}" for j in range(150)))
+    return "\n\n".join(paragraphs)
+
+class FakeModel:
+    """Answer every prompt with a summary of summary_words words, recording the prompts."""
+
+    def __init__(self):
+        self.calls = []
+        self.summary_words = 100
+
+    async def complete(self, prompt, max_tokens=500):
+        self.calls.append(prompt)
+        if len(self.calls) > 1000:
+            raise RuntimeError("summarization does not terminate")
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return " ".join([digest[:8]] * self.summary_words)
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(summarize, "_acomplete", model.complete)
+    return model
+
+def reduce_calls(calls):
+    return [prompt for prompt in calls if "into one summary" in prompt]
+
+def final_calls(calls):
+    return [prompt for prompt in calls if "into a single summary" in prompt]
+
+def test_unchanged_document_only_runs_final_reduce(model, tmp_path):
+    cache = SummaryCache(tmp_path / "summaries")
+    text = make_document(40)
+
+    first = summarize.summarize_long_text(text, chunk_tokens=600, cache=cache)
+    assert first["status"] == "success"
+    assert reduce_calls(model.calls), "document should need intermediate reduce levels"
+
+    model.calls.clear()
+    second = summarize.summarize_long_text(text, chunk_tokens=600, cache=cache)
+    assert second == first
+    assert len(model.calls) == 1 and final_calls(model.calls) == model.calls
+
+def test_edited_chunk_only_reruns_its_reduce_path(model, tmp_path):
+    cache = SummaryCache(tmp_path / "summaries")
+    summarize.summarize_long_text(make_document(40), chunk_tokens=600, cache=cache)
+    first_run = len(model.calls)
+
+    model.calls.clear()
+    summarize.summarize_long_text(make_document(40, edited=20), chunk_tokens=600, cache=cache)
+    assert len(model.calls) < first_run // 2
+
+def test_oversized_summaries_still_reduce(model):
+    # Every summary is longer than a whole reduce group, so packing alone never shrinks the list
+    model.summary_words = 400
+    chunks = 16
+    result = summarize.summarize_long_text(make_document(chunks), chunk_tokens=600)
+
+    assert result["status"] == "success", result.get("error")
+    chunk_count = len(summarize.split_text(make_document(chunks), 600))
+    # Pairing at least halves every level, so there are fewer reduces than chunks
+    assert len(reduce_calls(model.calls)) < chunk_count
+    assert len(final_calls(model.calls)) == 1